@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import json
+import time
+import platform
+import resource
+import subprocess
+import multiprocessing
+import numpy as np
+
+from pathlib import Path
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+
+from pypuf.io import random_inputs
+
+from aux_funcs.simulation_funcs import det_no_resp_flips, T1_1_bflip_1_inst, T2_1_bflip_r_inst
+from aux_funcs.spec_funcs import puf_spec, build_puf_instance
+
+
+""" Functions to benchmark the hot paths of the simulations and to track their performance over time.
+
+    Each benchmark case times one of det_no_resp_flips, T1_1_bflip_1_inst or T2_1_bflip_r_inst for
+    one PUF family and one choice of n, N, k (no. of loops l for FF Arbiter PUFs) and n_jobs. Every
+    case runs in a fresh process, such that its peak RSS is not inflated by earlier cases.
+    The throughput is given in challenge evaluations per second, counting the evaluations of the
+    initial and all flipped challenges, i.e. N for det_no_resp_flips, N*(n+1) for Test 1 and
+    r*N*(n+1) for Test 2, irrespective of how many evaluations an engine actually performs.
+    The results of each run are appended to a JSON history, which allows to compare a run to a baseline.
+"""
+
+
+BENCH_FUNCS     = ['det_no_resp_flips', 'T1_1_bflip_1_inst', 'T2_1_bflip_r_inst']
+BENCH_FAMILIES  = ['Arbiter', 'XOR', 'FF', 'BR']
+
+
+def ff_benchmark_loops(n, l):
+    """ Function to create a loop structure of l evenly spaced, non-overlapping loops for benchmarks
+
+        n:              int             - challenge length
+        l:              int             - number of loops
+
+        feed_forwards:  list of tuples  - loops (arbiter point, feed point)
+    """
+
+    gap = max(1, n // (2 * (l + 1)))
+
+    return [((i + 1) * n // (l + 1), (i + 1) * n // (l + 1) + gap) for i in range(l)]
+
+
+def benchmark_specs(family, n, k, r):
+    """ Function to create the specs of the instances of a benchmark case
+
+        family:         string          - 'Arbiter', 'XOR' (k-XOR Arbiter), 'FF' (with k loops) or 'BR' (k-XOR Bistable Ring)
+        n:              int             - challenge length
+        k:              int             - no. of chains (XOR, BR) or loops (FF), ignored for 'Arbiter'
+        r:              int             - no. of instances
+
+        specs:          list of dicts   - specs of the instances, cf. spec_funcs.puf_spec
+    """
+
+    if family == 'Arbiter':
+        return [puf_spec('XORArbiterPUF', n=n, k=1, seed=i, noisiness=0) for i in range(r)]
+    if family == 'XOR':
+        return [puf_spec('XORArbiterPUF', n=n, k=k, seed=i, noisiness=0) for i in range(r)]
+    if family == 'FF':
+        return [puf_spec('FeedForwardArbiterPUF', n=n, ff=ff_benchmark_loops(n, k), seed=i, noisiness=0) for i in range(r)]
+    if family == 'BR':
+        return [puf_spec('XORBistableRingPUF', n=n, k=k, weights_seed=i) for i in range(r)]
+
+    raise ValueError(f'Unknown PUF family {family}, expected one of {BENCH_FAMILIES}.')
+
+
+def peak_rss_mb():
+    """ Function to determine the peak resident set size of the current process
+
+        peak_rss:       float           - peak RSS in MB
+    """
+
+    # ru_maxrss is given in kB on Linux, in bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return max_rss / 2**20 if sys.platform == 'darwin' else max_rss / 2**10
+
+
+def run_benchmark_case(case):
+    """ Function to run a single benchmark case (in the current process)
+
+        case:           dict            - func, family, n, N, k, n_jobs, r, engine, repeat (cf. benchmark_grid)
+
+        result:         dict            - case with the best time over the repetitions 'seconds',
+                                          'evals_per_s' and 'peak_rss_mb' added
+    """
+
+    challenges  = random_inputs(n=case['n'], N=case['N'], seed=1)
+    specs       = benchmark_specs(case['family'], case['n'], case['k'], case['r'] if case['func'] == 'T2_1_bflip_r_inst' else 1)
+    instances   = [build_puf_instance(spec) for spec in specs]
+
+    if case['func'] == 'det_no_resp_flips':
+        responses   = instances[0].eval(challenges)
+        bench       = lambda: det_no_resp_flips(instances[0], responses, challenges, [0])
+        no_evals    = case['N']
+    elif case['func'] == 'T1_1_bflip_1_inst':
+        bench       = lambda: T1_1_bflip_1_inst(instances[0], challenges, case['engine'])
+        no_evals    = case['N'] * (case['n'] + 1)
+    elif case['func'] == 'T2_1_bflip_r_inst':
+        bench       = lambda: T2_1_bflip_r_inst(instances, challenges, case['n_jobs'], case['engine'])
+        no_evals    = case['r'] * case['N'] * (case['n'] + 1)
+    else:
+        raise ValueError(f'Unknown benchmark function {case["func"]}, expected one of {BENCH_FUNCS}.')
+
+    times = []
+    for _ in range(case['repeat']):
+        start = time.perf_counter()
+        bench()
+        times.append(time.perf_counter() - start)
+
+    return dict(case, seconds=min(times), evals_per_s=no_evals / min(times), peak_rss_mb=peak_rss_mb())
+
+
+def run_benchmark_case_isolated(case):
+    """ Function to run a single benchmark case in a fresh (spawned) process
+
+        case:           dict            - cf. run_benchmark_case
+
+        result:         dict            - cf. run_benchmark_case
+    """
+
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return executor.submit(run_benchmark_case, case).result()
+
+
+def benchmark_grid(funcs, families, ns, Ns, ks, n_jobs_list, r=8, engine='auto', repeat=3):
+    """ Function to create the benchmark cases of a grid of parameters. Since k is ignored for
+        Arbiter PUFs and n_jobs is only used by Test 2, redundant combinations are omitted.
+
+        funcs:          list of strings - functions to be timed, cf. BENCH_FUNCS
+        families:       list of strings - PUF families, cf. BENCH_FAMILIES
+        ns:             list of int     - challenge lengths
+        Ns:             list of int     - numbers of challenges
+        ks:             list of int     - no. of chains (XOR, BR) or loops (FF)
+        n_jobs_list:    list of int     - no. of cores used for Test 2
+        r:              int             - no. of instances for Test 2
+        engine:         string          - engine of Test 1, cf. simulation_funcs.T1_1_bflip_1_inst
+        repeat:         int             - no. of repetitions per case, the best time is reported
+
+        cases:          list of dicts   - benchmark cases
+    """
+
+    cases = []
+    for func in funcs:
+        for family in families:
+            for n in ns:
+                for N in Ns:
+                    for k in (ks if family != 'Arbiter' else [1]):
+                        for n_jobs in (n_jobs_list if func == 'T2_1_bflip_r_inst' else [1]):
+                            cases.append({'func': func, 'family': family, 'n': n, 'N': N, 'k': k, 'n_jobs': n_jobs,
+                                          'r': r, 'engine': engine, 'repeat': repeat})
+
+    return cases
+
+
+def case_id(case):
+    """ Function to identify a benchmark case across runs
+
+        case:           dict            - benchmark case
+
+        case_id:        string          - identifier of the case, independent of the results
+    """
+
+    return '{func}/{family}/n{n}/N{N}/k{k}/jobs{n_jobs}/r{r}/{engine}'.format(**case)
+
+
+def run_info(label=None):
+    """ Function to describe the environment of a benchmark run
+
+        label:          string or None  - label of the run, e.g. the name of a change
+
+        info:           dict            - label, time, git commit and versions
+    """
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {'label': label, 'time': datetime.now(timezone.utc).isoformat(timespec='seconds'), 'commit': commit,
+            'python': platform.python_version(), 'numpy': np.__version__, 'machine': platform.machine(),
+            'cpus': multiprocessing.cpu_count()}
+
+
+def load_history(path):
+    """ Function to load the benchmark history
+
+        path:           string          - path of the JSON history
+
+        history:        list of dicts   - runs with their info and results, oldest first
+    """
+
+    if not Path(path).exists():
+        return []
+
+    with open(path) as source_file:
+        return json.load(source_file)
+
+
+def save_history(path, history):
+    """ Function to save the benchmark history
+
+        path:           string          - path of the JSON history
+        history:        list of dicts   - runs with their info and results, oldest first
+    """
+
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+    with open(path, 'w') as target_file:
+        json.dump(history, target_file, indent=1)
+
+
+def find_baseline(history, baseline=None):
+    """ Function to select the baseline run from the history
+
+        history:        list of dicts   - runs, oldest first
+        baseline:       string or None  - label or commit of the baseline, by default the latest run
+
+        run:            dict or None    - latest run matching the baseline, None if there is none
+    """
+
+    for run in reversed(history):
+        if baseline is None or baseline in (run['info']['label'], run['info']['commit']):
+            return run
+
+    return None
+
+
+def compare_results(results, baseline_results, threshold=1.1):
+    """ Function to compare the results of a run to those of a baseline run, case by case
+
+        results:            list of dicts   - results of the run
+        baseline_results:   list of dicts   - results of the baseline run
+        threshold:          float           - a case is a regression if it is slower by more than this factor
+
+        comparison:         list of tuples  - (case id, seconds, baseline seconds, ratio, regression) for all
+                                              cases present in both runs
+    """
+
+    baseline_seconds = {case_id(result): result['seconds'] for result in baseline_results}
+
+    comparison = []
+    for result in results:
+        if case_id(result) in baseline_seconds:
+            ratio = result['seconds'] / baseline_seconds[case_id(result)]
+            comparison.append((case_id(result), result['seconds'], baseline_seconds[case_id(result)], ratio, ratio > threshold))
+
+    return comparison
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from aux_funcs.challenge_funcs import random_inputs_chunks
+
+
+""" Functions for a bit-packed challenge and response representation.
+
+    pypuf represents challenge and response bits as int8 values in {-1,1}. For challenges
+    of up to 64 bits the packed representation stores one uint64 per challenge, where bit i
+    is set iff challenge bit i equals -1 (i.e. bit value 1 in {0,1} notation). Flipping
+    challenge bits then amounts to XOR-ing a mask, and responses are packed into bit vectors
+    (one bit per challenge, 8 per byte) so that response flips can be counted with popcount.
+"""
+
+
+""" Number of set bits for every possible byte value """
+POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def is_packed(challenges):
+    """ Function to determine whether challenges are given in the packed representation
+
+        challenges:     numpy.ndarray   - challenges, either packed or in pypuf {-1,1} representation
+
+        packed:         bool            - True iff challenges is a one-dimensional uint64 array
+    """
+
+    return challenges.dtype == np.uint64 and challenges.ndim == 1
+
+
+def pack_challenges(challenges):
+    """ Function to convert challenges from the pypuf {-1,1} representation to the packed one
+
+        challenges:     numpy.ndarray   - challenges of shape (N, n) with entries in {-1,1} and n <= 64
+
+        packed:         numpy.ndarray   - uint64 array of shape (N,)
+    """
+
+    no_bits = challenges.shape[1]
+    if no_bits > 64:
+        raise ValueError(f'Packed challenges support at most 64 bits, but {no_bits} bits were given.')
+
+    bits    = (challenges == -1).astype(np.uint64)
+    packed  = np.bitwise_or.reduce(bits << np.arange(no_bits, dtype=np.uint64), axis=1)
+
+    return packed
+
+
+def unpack_challenges(packed, n):
+    """ Function to convert packed challenges back to the pypuf {-1,1} representation
+
+        packed:         numpy.ndarray   - uint64 array of shape (N,)
+        n:              int             - challenge length
+
+        challenges:     numpy.ndarray   - int8 array of shape (N, n) with entries in {-1,1}
+    """
+
+    bits        = (packed[:, np.newaxis] >> np.arange(n, dtype=np.uint64)) & np.uint64(1)
+    challenges  = 1 - 2 * bits.astype(np.int8)
+
+    return challenges
+
+
+def flip_mask(flip_pos):
+    """ Function to build the XOR mask flipping the challenge bits at the positions in flip_pos.
+        As for det_no_resp_flips, an even number of flips at the same position cancels out.
+
+        flip_pos:       list of int     - positions of bits to be flipped (may include multiples of the same position)
+
+        mask:           numpy.uint64    - mask to be XOR-ed with packed challenges
+    """
+
+    mask = np.uint64(0)
+    for flip in flip_pos:
+        mask ^= np.uint64(1) << np.uint64(flip)
+
+    return mask
+
+
+def pack_responses(responses):
+    """ Function to pack responses in the pypuf {-1,1} representation into a bit vector
+
+        responses:      numpy.ndarray   - responses of shape (..., N) with entries in {-1,1}
+
+        packed:         numpy.ndarray   - uint8 array of shape (..., ceil(N/8)), bits set where the response is -1
+    """
+
+    return np.packbits(responses == -1, axis=-1)
+
+
+def popcount(packed, axis=None):
+    """ Function to count the set bits of a packed bit vector
+
+        packed:         numpy.ndarray   - uint8 array, e.g. the XOR of two packed response vectors
+        axis:           int or None     - axis along which to count, None counts all bits
+
+        count:          int or numpy.ndarray - number of set bits
+    """
+
+    return np.sum(POPCOUNT_TABLE[packed], axis=axis, dtype=np.int64)
+
+
+def random_inputs_packed(n, N, seed, chunk_size=2**16):
+    """ Function to create the same challenges as pypuf.io.random_inputs(n, N, seed), but in
+        the packed representation. The challenges are drawn and packed in chunks, hence the
+        {-1,1} representation is never held in memory for all N challenges at once.
+
+        n:              int             - challenge length (n <= 64)
+        N:              int             - number of challenges
+        seed:           int             - seed as for pypuf.io.random_inputs
+        chunk_size:     int             - number of challenges drawn at once
+
+        packed:         numpy.ndarray   - uint64 array of shape (N,)
+    """
+
+    packed  = np.empty(N, dtype=np.uint64)
+    start   = 0
+
+    for challenges in random_inputs_chunks(n, N, seed, chunk_size):
+        packed[start:start+challenges.shape[0]] = pack_challenges(challenges)
+        start += challenges.shape[0]
+
+    return packed
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from functools import lru_cache
+from numpy.random import RandomState
+
+
+""" Functions to create challenges chunk by chunk, reproducing pypuf.io.random_inputs,
+    and to share challenges between workers
+"""
+
+
+def random_inputs_chunks(n, N, seed, chunk_size=2**16):
+    """ Generator yielding the challenges of pypuf.io.random_inputs(n, N, seed) in consecutive
+        chunks. Concatenating all chunks gives exactly the challenges of a single call.
+
+        n:              int             - challenge length
+        N:              int             - number of challenges
+        seed:           int             - seed as for pypuf.io.random_inputs
+        chunk_size:     int             - number of challenges per chunk (rounded down to a multiple of 4)
+
+        challenges:     numpy.ndarray   - int8 array of shape (<= chunk_size, n) with entries in {-1,1}
+    """
+
+    """ RandomState draws the int8 challenge bits from buffered 32-bit words, hence the chunks
+        reproduce the stream of a single draw only if each chunk comprises a multiple of 4 bits.
+    """
+    chunk_size  = max(4, chunk_size - chunk_size % 4)
+
+    prng        = RandomState(seed)
+
+    for start in range(0, N, chunk_size):
+        no_Cs_chunk = min(chunk_size, N - start)
+
+        yield 2 * prng.randint(0, 2, (no_Cs_chunk, n), dtype=np.int8) - 1
+
+
+class ChallengeStream:
+    """ Lightweight, re-iterable stand-in for the challenge matrix of pypuf.io.random_inputs(n, N, seed).
+        Only the parameters are stored (and pickled when sent to workers), the challenges are
+        generated chunk by chunk whenever the stream is iterated.
+
+        n:              int             - challenge length
+        N:              int             - number of challenges
+        seed:           int             - seed as for pypuf.io.random_inputs
+        chunk_size:     int             - number of challenges per chunk
+    """
+
+    def __init__(self, n, N, seed, chunk_size=2**16):
+        self.n          = n
+        self.N          = N
+        self.seed       = seed
+        self.chunk_size = chunk_size
+
+    @property
+    def shape(self):
+        return (self.N, self.n)
+
+    def __iter__(self):
+        return random_inputs_chunks(self.n, self.N, self.seed, self.chunk_size)
+
+    def __repr__(self):
+        return f'ChallengeStream(n={self.n}, N={self.N}, seed={self.seed}, chunk_size={self.chunk_size})'
+
+
+def iter_challenge_chunks(challenges, chunk_size):
+    """ Generator yielding consecutive chunks of challenges, irrespective of their representation
+
+        challenges:     numpy.ndarray   - challenges in pypuf {-1,1} or packed representation (sliced along the first axis),
+                        ChallengeStream - or a stream (re-generated with the given chunk size)
+        chunk_size:     int             - number of challenges per chunk (rounded down to a multiple of 4 for streams)
+
+        challenges:     numpy.ndarray   - chunk of the challenges in the same representation
+    """
+
+    if isinstance(challenges, ChallengeStream):
+        yield from random_inputs_chunks(challenges.n, challenges.N, challenges.seed, chunk_size)
+    else:
+        for start in range(0, challenges.shape[0], chunk_size):
+            yield challenges[start:start+chunk_size]
+
+
+class ChallengeFile:
+    """ Lightweight handle of challenges stored in a .npy file (cf. share_challenges). Only the
+        path is pickled when sent to workers, each worker memory-maps the file once (cf. load_challenges),
+        hence all workers share the same pages of the challenges without copying.
+
+        path:           string          - path of the .npy file
+        shape:          tuple           - shape of the stored challenges
+    """
+
+    def __init__(self, path, shape):
+        self.path   = path
+        self.shape  = tuple(shape)
+
+    def __repr__(self):
+        return f'ChallengeFile(path={self.path!r}, shape={self.shape})'
+
+
+def share_challenges(challenges, path):
+    """ Function to store challenges once in a .npy file to be memory-mapped by all workers
+
+        challenges:     numpy.ndarray   - challenges in pypuf {-1,1} or packed representation
+        path:           string          - path of the .npy file
+
+        handle:         ChallengeFile   - handle to be passed instead of the challenges
+    """
+
+    np.save(path, challenges)
+
+    return ChallengeFile(path, challenges.shape)
+
+
+@lru_cache(maxsize=4)
+def _map_challenge_file(path):
+    return np.load(path, mmap_mode='r')
+
+
+def load_challenges(challenges):
+    """ Function to resolve a ChallengeFile handle to the (memory-mapped) challenges, mapping each file
+        only once per process. Challenges in other representations are returned unchanged.
+
+        challenges:     ChallengeFile   - handle of shared challenges,
+                        numpy.ndarray   - or challenges in pypuf {-1,1} or packed representation,
+                        ChallengeStream - or a stream of challenge chunks
+
+        challenges:     numpy.ndarray   - memory-mapped challenges (or the unchanged input)
+                        ChallengeStream
+    """
+
+    if isinstance(challenges, ChallengeFile):
+        return _map_challenge_file(challenges.path)
+
+    return challenges
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import json
+import time
+import itertools
+
+from joblib import effective_n_jobs
+
+from pypuf.io import random_inputs
+
+from aux_funcs.simulation_funcs import produce_loop_structure
+from aux_funcs.schedule_funcs import T1_task
+from aux_funcs.spec_funcs import PUF_CLASSES, puf_spec, spec_key
+from aux_funcs.progress_funcs import format_seconds
+
+
+""" Functions to describe the experiments of run_simulations.py declaratively and to plan their evaluation.
+
+    A config (JSON, cf. experiments.json) holds the defaults 'n' (challenge length), 'N' (no. of challenges),
+    'challenge_seed' and 'output_dir', and a list of experiments. Each experiment holds
+        'name':         name of the store the results are saved to (in output_dir, as read by create_plots.py),
+        'puf':          name of the pypuf class, cf. spec_funcs.PUF_CLASSES,
+        'params':       parameters shared by all instances, e.g. {"noisiness": 0},
+        'grid':         lists of parameters, one group of instances per combination (in the given order), e.g.
+                        {"k": [1, 2, 3]}; loops 'ff' are given as lists of [arbiter point, feed point], and
+                        'last_loops_no' as [[a, b], l], the last loop and the number of loops l, from which the
+                        loop structure of l overlapping loops of equal length is constructed (cf.
+                        simulation_funcs.produce_loop_structure),
+        'r':            no. of instances per group,
+    and optionally
+        'seeds':        {"start": s, "group_step": d}, the instances of group g use the seeds s + g*d, ..., s + g*d + r-1
+                        (default start 0, group_step 0), 'weights_seed' for Bistable Ring PUFs, 'seed' otherwise,
+        'n', 'N', 'challenge_seed': overriding the defaults,
+        'single':       whether the experiment consists of a single group, stored without the group level,
+        'chain_pool':   whether the experiment is derived from the chains of r pools with the largest k in
+                        chain-pool mode (cf. pool_funcs, run_simulations.py --chain-pool), stored under the name
+                        with the suffix CHAIN_POOL_SUFFIX, since its instances differ from independent ones,
+        'noisy':        whether the experiment is additionally evaluated with noise (cf. run_simulations.py --noisiness),
+        'description':  shown in the plan.
+
+    The planner expands the experiments into groups of instance specs, groups the experiments by their
+    challenge sets, such that each set is created once, and counts the instances evaluated only once
+    since their specs occur in several experiments (cf. schedule_funcs.T2_1_bflip_sched). The cost of
+    each group is estimated from the wall time of Test 1 on its first instance for a few challenges.
+"""
+
+
+CONFIG_DEFAULTS     = {'n': 64, 'N': 100000, 'challenge_seed': 1, 'output_dir': './simulations/'}
+EXPERIMENT_KEYS     = ['name', 'puf', 'params', 'grid', 'r', 'seeds', 'n', 'N', 'challenge_seed', 'single', 'chain_pool', 'noisy', 'description']
+
+# Suffix of the names of experiments derived in chain-pool mode, whose k-XOR PUFs share their chains across k
+CHAIN_POOL_SUFFIX   = '_chain_pool'
+
+# Keys of the seeds in the specs and in the metas of the stores
+SEED_KEYS           = {'XORBistableRingPUF': ('weights_seed', 'weight_seeds')}
+DEFAULT_SEED_KEYS   = ('seed', 'seeds')
+
+
+def load_config(path):
+    """ Function to load and validate a config of experiments
+
+        path:           string          - path of the JSON config
+
+        config:         dict            - config with the defaults filled in
+    """
+
+    with open(path) as source_file:
+        config = dict(CONFIG_DEFAULTS, **json.load(source_file))
+
+    names = [experiment.get('name') for experiment in config.get('experiments', [])]
+    if not names:
+        raise ValueError(f'The config {path} contains no experiments.')
+    if len(set(names)) != len(names):
+        raise ValueError(f'The names of the experiments in {path} are not unique.')
+
+    for experiment in config['experiments']:
+        missing = [key for key in ['name', 'puf', 'grid', 'r'] if key not in experiment]
+        unknown = [key for key in experiment if key not in EXPERIMENT_KEYS]
+        if missing or unknown:
+            raise ValueError(f'Experiment {experiment.get("name")!r}: missing keys {missing}, unknown keys {unknown}.')
+        if experiment['puf'] not in PUF_CLASSES:
+            raise ValueError(f'Experiment {experiment["name"]!r}: unknown PUF class {experiment["puf"]}, expected one of {list(PUF_CLASSES)}.')
+        if experiment.get('noisy', False) and experiment.get('chain_pool', False):
+            raise ValueError(f'Experiment {experiment["name"]!r}: noisy experiments cannot be derived from chain pools.')
+
+    return config
+
+
+def expand_grid(grid):
+    """ Function to expand a parameter grid into the parameters of the groups
+
+        grid:           dict            - lists of parameters, cf. above
+
+        params:         list of dicts   - parameters per group, the combinations in the order of the grid
+    """
+
+    keys    = list(grid)
+    params  = []
+    for values in itertools.product(*(grid[key] for key in keys)):
+        group = {}
+        for key, value in zip(keys, values):
+            if key == 'last_loops_no':
+                group['ff'] = produce_loop_structure((tuple(value[0]), value[1]))
+            elif key == 'ff':
+                group['ff'] = [tuple(loop) for loop in value]
+            else:
+                group[key] = value
+        params.append(group)
+
+    return params
+
+
+def expand_experiment(experiment, config, chain_pool=False, N=None):
+    """ Function to expand an experiment into the specs of its instances
+
+        experiment:     dict            - experiment of the config
+        config:         dict            - config, cf. load_config
+        chain_pool:     bool            - if True, experiments with 'chain_pool' are derived from pools of chains
+        N:              int or None     - if given, no. of challenges overriding the config
+
+        expanded:       dict            - 'name', 'description', 'single', 'noisy', the challenge set 'n', 'N', 'challenge_seed',
+                                          'groups' (list of lists of specs, empty in chain-pool mode), 'pool' (list of specs
+                                          or None) and 'meta' (PUF type, parameters and seeds stored with the results)
+    """
+
+    puf                 = experiment['puf']
+    n                   = experiment.get('n', config['n'])
+    r                   = experiment['r']
+    seeds               = dict({'start': 0, 'group_step': 0}, **experiment.get('seeds', {}))
+    seed_key, meta_key  = SEED_KEYS.get(puf, DEFAULT_SEED_KEYS)
+    params_in_g         = expand_grid(experiment['grid'])
+
+    if experiment.get('single', False) and len(params_in_g) != 1:
+        raise ValueError(f'Experiment {experiment["name"]!r} is single, but its grid has {len(params_in_g)} groups.')
+
+    expanded = {'name': experiment['name'], 'description': experiment.get('description', experiment['name']),
+                'single': experiment.get('single', False), 'noisy': experiment.get('noisy', False),
+                'n': n, 'N': N or experiment.get('N', config['N']), 'challenge_seed': experiment.get('challenge_seed', config['challenge_seed'])}
+
+    if chain_pool and experiment.get('chain_pool', False):
+        """ The k-XOR PUF with index i is formed by the first k chains of the K-XOR PUF with seed start + i (K the largest k) """
+        pool_k              = max(params['k'] for params in params_in_g)
+        pool_seeds          = list(range(seeds['start'], seeds['start'] + r))
+        expanded['name']    = experiment['name'] + CHAIN_POOL_SUFFIX
+        expanded['groups']  = []
+        expanded['pool']    = [puf_spec(puf, n=n, **dict(experiment.get('params', {}), k=pool_k, **{seed_key: seed})) for seed in pool_seeds]
+        expanded['meta']    = {'puf': puf, 'params': params_in_g, 'chain_pool': {'k': pool_k, meta_key: pool_seeds}}
+    else:
+        seeds_in_g          = [list(range(seeds['start'] + g * seeds['group_step'], seeds['start'] + g * seeds['group_step'] + r)) for g in range(len(params_in_g))]
+        expanded['groups']  = [[puf_spec(puf, n=n, **dict(experiment.get('params', {}), **params, **{seed_key: seed})) for seed in group_seeds]
+                               for params, group_seeds in zip(params_in_g, seeds_in_g)]
+        expanded['pool']    = None
+        expanded['meta']    = {'puf': puf, 'params': params_in_g, meta_key: seeds_in_g}
+
+    return expanded
+
+
+def plan_experiments(config, chain_pool=False, N=None):
+    """ Function to expand all experiments of a config
+
+        config:         dict            - config, cf. load_config
+        chain_pool:     bool            - cf. expand_experiment
+        N:              int or None     - cf. expand_experiment
+
+        plan:           list of dicts   - expanded experiments, cf. expand_experiment
+    """
+
+    return [expand_experiment(experiment, config, chain_pool, N) for experiment in config['experiments']]
+
+
+def challenge_set(expanded):
+    """ Function to identify the challenge set of an expanded experiment
+
+        expanded:       dict            - cf. expand_experiment
+
+        key:            tuple           - (n, N, challenge_seed)
+    """
+
+    return (expanded['n'], expanded['N'], expanded['challenge_seed'])
+
+
+def challenge_sets(plan):
+    """ Function to group the experiments by their challenge sets, such that each set is created once
+
+        plan:           list of dicts   - cf. plan_experiments
+
+        sets:           dict            - indices of the experiments per challenge set (n, N, challenge_seed)
+    """
+
+    sets = {}
+    for e, expanded in enumerate(plan):
+        sets.setdefault(challenge_set(expanded), []).append(e)
+
+    return sets
+
+
+def count_unique_instances(plan):
+    """ Function to count the instances which are evaluated, i.e. whose specs did not occur before on the same challenges
+
+        plan:           list of dicts   - cf. plan_experiments
+
+        unique:         list of lists   - no. of unique instances per experiment and group (the pool for chain-pool mode)
+    """
+
+    seen    = set()
+    unique  = []
+    for expanded in plan:
+        unique_in_g = []
+        for instances in (expanded['groups'] or [expanded['pool']]):
+            keys = [(challenge_set(expanded), spec_key(spec)) for spec in instances]
+            unique_in_g.append(len(set(keys) - seen))
+            seen.update(keys)
+        unique.append(unique_in_g)
+
+    return unique
+
+
+def calibrate_T1(spec, n, engine='auto', N_cal=2000, seed=0):
+    """ Function to measure the wall time of Test 1 on an instance per challenge
+
+        spec:           dict            - spec of the instance, cf. spec_funcs.puf_spec
+        n:              int             - challenge length
+        engine:         string          - engine name, cf. simulation_funcs.T1_1_bflip_1_inst
+        N_cal:          int             - no. of challenges of the calibration run
+        seed:           int             - seed of the calibration challenges
+
+        seconds:        float           - wall time per challenge (best of two runs)
+    """
+
+    challenges  = random_inputs(n=n, N=N_cal, seed=seed)
+    times       = []
+    for _ in range(2):
+        start = time.perf_counter()
+        T1_task(spec, challenges, list(range(n)), engine)
+        times.append(time.perf_counter() - start)
+
+    return min(times) / N_cal
+
+
+def estimate_plan(plan, engine='auto', n_jobs=1, N_cal=2000, noisiness=0, repetitions=11):
+    """ Function to estimate the wall time of each experiment from a calibration run per group
+
+        plan:           list of dicts   - cf. plan_experiments
+        engine:         string          - engine name, cf. simulation_funcs.T1_1_bflip_1_inst
+        n_jobs:         int             - no. of cores used
+        N_cal:          int             - no. of challenges of the calibration runs
+        noisiness:      float           - if > 0, the noisy experiments are evaluated again with repetitions repeated
+                                          responses per challenge, estimated as (repetitions + 1) noise-free evaluations
+        repetitions:    int             - cf. simulation_funcs.T2_1_bflip_r_inst_noisy
+
+        estimates:      list of dicts   - per experiment 'groups', 'instances', 'unique' (instances evaluated, cf.
+                                          count_unique_instances) and 'seconds' (estimated wall time on n_jobs cores)
+    """
+
+    cores       = effective_n_jobs(n_jobs)
+    unique      = count_unique_instances(plan)
+    estimates   = []
+    for expanded, unique_in_g in zip(plan, unique):
+        seconds = 0.
+        for instances, no_unique in zip(expanded['groups'] or [expanded['pool']], unique_in_g):
+            seconds += calibrate_T1(instances[0], expanded['n'], engine, N_cal) * expanded['N'] * no_unique
+
+        if noisiness > 0 and expanded['noisy']:
+            seconds += calibrate_T1(expanded['groups'][0][0], expanded['n'], engine, N_cal) * expanded['N'] * len(expanded['groups'][0]) * (repetitions + 1)
+
+        estimates.append({'groups': len(expanded['meta']['params']), 'instances': sum(len(instances) for instances in (expanded['groups'] or [expanded['pool']])),
+                          'unique': sum(unique_in_g), 'seconds': seconds / cores})
+
+    return estimates
+
+
+def print_plan(plan, estimates, stream=sys.stdout):
+    """ Function to print the plan with the estimated wall times per experiment and challenge set
+
+        plan:           list of dicts   - cf. plan_experiments
+        estimates:      list of dicts   - cf. estimate_plan
+        stream:         file object     - stream the plan is written to
+    """
+
+    for key, exps in challenge_sets(plan).items():
+        print(f'Challenge set n={key[0]}, N={key[1]}, seed={key[2]}:', file=stream)
+        for e in exps:
+            expanded, estimate = plan[e], estimates[e]
+            mode = ' (chain pool)' if expanded['pool'] is not None else ''
+            print(f'  {expanded["description"]}{mode}\n'
+                  f'    -> {expanded["name"]}: {estimate["groups"]} groups, {estimate["instances"]} instances, '
+                  f'{estimate["unique"]} evaluated, ETA {format_seconds(estimate["seconds"])}', file=stream)
+
+    instances   = sum(estimate['instances'] for estimate in estimates)
+    evaluated   = sum(estimate['unique'] for estimate in estimates)
+    print(f'Total: {len(plan)} experiments, {instances} instances, {evaluated} evaluated ({instances - evaluated} shared), '
+          f'ETA {format_seconds(sum(estimate["seconds"] for estimate in estimates))}', file=stream)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+
+from aux_funcs.simulation_funcs import T2_from_T1_results
+from aux_funcs.storage_funcs import store_path, load_T2_store, convert_T2_pickle
+from aux_funcs.index_funcs import T2PrefixIndex
+from aux_funcs.uncertainty_funcs import T2_bootstrap_ci, T2_binomial_ci
+
+
+""" Lazy access to the stored results of the simulations for the plots and tables.
+
+    A store (cf. storage_funcs) is only opened when a figure first needs one of its groups (values
+    of k/l), and its arrays are memory-mapped, such that only the S_j(P)s of the groups used are read.
+    The results of a group and its prefix-sum index (cf. index_funcs), from which the subselections of
+    the first n instances (cf. simulation_funcs.T2_sel_from_T2_bflip_r_inst) follow in constant time,
+    and their confidence intervals (cf. uncertainty_funcs) are computed on first use and memoized.
+"""
+
+
+class SimulationData:
+    """ Memoized results of the simulations in a folder
+
+        sub_dir:        string          - folder of the simulation results, e.g. './simulations/'
+    """
+
+    def __init__(self, sub_dir):
+        self.sub_dir            = sub_dir
+        self.store_cache        = {}
+        self.group_cache        = {}
+        self.index_cache        = {}
+        self.selection_cache    = {}
+        self.ci_cache           = {}
+
+    def store(self, name):
+        """ Method to open the store of an experiment (pickled result files of earlier versions are converted first)
+
+            name:           string          - name of the experiment, e.g. 'Test_2_on_20_1000_XORArbiterPUF_inst'
+
+            S_i_r:          numpy.ndarray   - memory-mapped S_j(P)s of shape (k, r, n)
+            I2O_1_r:        numpy.ndarray   - memory-mapped I2O_1(P)s of shape (k, r)
+            meta:           dict            - metadata of the experiment
+        """
+
+        if name not in self.store_cache:
+            path = self.sub_dir + name
+            if not os.path.isdir(store_path(path)):
+                convert_T2_pickle(path)
+            self.store_cache[name] = load_T2_store(store_path(path))
+
+        return self.store_cache[name]
+
+    def no_groups(self, name):
+        """ Method to determine the number of groups (values of k/l) of an experiment """
+
+        return self.store(name)[0].shape[0]
+
+    def group(self, name, g=0):
+        """ Method to get the results of Test 2 on all instances of a group
+
+            name:           string          - name of the experiment
+            g:              int             - index of the group, e.g. k-1
+
+            Test_2_r_inst:  tuple           - return of simulation_funcs.T2_1_bflip_r_inst
+        """
+
+        if (name, g) not in self.group_cache:
+            S_i_r, I2O_1_r, _ = self.store(name)
+            self.group_cache[(name, g)] = T2_from_T1_results(S_i_r[g], I2O_1_r[g])
+
+        return self.group_cache[(name, g)]
+
+    def index(self, name, g=None):
+        """ Method to get the prefix-sum index over the instances of a group, or of all groups
+
+            name:           string          - name of the experiment
+            g:              int or None     - index of the group, e.g. k-1, None for all groups (e.g. for convergence curves)
+
+            index:          T2PrefixIndex   - index of the group (group index 0), or of all groups
+        """
+
+        if (name, g) not in self.index_cache:
+            S_i_r, I2O_1_r, _ = self.store(name)
+            self.index_cache[(name, g)] = T2PrefixIndex(S_i_r, I2O_1_r) if g is None else T2PrefixIndex(S_i_r[g], I2O_1_r[g])
+
+        return self.index_cache[(name, g)]
+
+    def selection(self, name, g, n):
+        """ Method to get the results of Test 2 on the first n instances of a group
+
+            name:           string          - name of the experiment
+            g:              int             - index of the group, e.g. k-1
+            n:              int             - number of instances
+
+            Test_2_n_inst:  tuple           - return of simulation_funcs.T2_1_bflip_r_inst for the n instances
+        """
+
+        if (name, g, n) not in self.selection_cache:
+            S_i_r, I2O_1_r, _ = self.store(name)
+            S_i_avg, I2O_1_avg, A2O_1 = self.index(name, g).aggregates(0, 0, n)
+            self.selection_cache[(name, g, n)] = (S_i_r[g][:n], S_i_avg, I2O_1_r[g][:n], I2O_1_avg, A2O_1)
+
+        return self.selection_cache[(name, g, n)]
+
+    def bootstrap_ci(self, name, n, no_resamples=2000, alpha=0.05, seed=1):
+        """ Method to get the bootstrap confidence intervals over the first n instances of all groups (cf. uncertainty_funcs.T2_bootstrap_ci)
+
+            name:           string          - name of the experiment
+            n:              int             - number of instances
+            no_resamples:   int             - number of resamples
+            alpha:          float           - significance level
+            seed:           int or None     - seed of the resamples
+
+            intervals:      tuple           - lower and upper bounds of I2O_1_avg and A2O_1, each of shape (k,)
+        """
+
+        key = ('bootstrap', name, n, no_resamples, alpha, seed)
+        if key not in self.ci_cache:
+            S_i_r, I2O_1_r, _ = self.store(name)
+            if not 0 < n <= S_i_r.shape[1]:
+                raise ValueError(f'Invalid range of instances [0, {n}) of {S_i_r.shape[1]} instances.')
+            self.ci_cache[key] = T2_bootstrap_ci(S_i_r[:, :n], I2O_1_r[:, :n], no_resamples, alpha, seed)
+
+        return self.ci_cache[key]
+
+    def binomial_ci(self, name, alpha=0.05):
+        """ Method to get the confidence intervals over the challenges of all instances (cf. uncertainty_funcs.T2_binomial_ci)
+
+            name:           string          - name of the experiment
+            alpha:          float           - significance level
+
+            intervals:      tuple or None   - lower and upper bounds of the S_j(P)s (k, r, n) and I2O_1(P)s (k, r),
+                                              None if the number of challenges per instance is unknown (converted
+                                              pickles) or varies (simulations with tolerance)
+        """
+
+        key = ('binomial', name, alpha)
+        if key not in self.ci_cache:
+            S_i_r, _, meta = self.store(name)
+            no_Cs = meta.get('N') if meta.get('tolerance') is None else None
+            self.ci_cache[key] = T2_binomial_ci(S_i_r, no_Cs, alpha) if no_Cs else None
+
+        return self.ci_cache[key]
+
+    def selections(self, name, n):
+        """ Method to get the results of Test 2 on the first n instances of all groups
+
+            name:           string          - name of the experiment
+            n:              int             - number of instances
+
+            sel_Test_2_m_insts: list of tuples - list in k/l of returns of simulation_funcs.T2_1_bflip_r_inst
+        """
+
+        return [self.selection(name, g, n) for g in range(self.no_groups(name))]
+
+
+""" SimulationData per folder of the current process, e.g. shared by the figures created by one worker """
+process_data = {}
+
+
+def simulation_data(sub_dir):
+    """ Function to get the SimulationData of a folder, created once per process
+
+        sub_dir:        string          - folder of the simulation results
+
+        data:           SimulationData  - memoized results of the simulations in sub_dir
+    """
+
+    if sub_dir not in process_data:
+        process_data[sub_dir] = SimulationData(sub_dir)
+
+    return process_data[sub_dir]
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+
+""" Functions to aggregate the results of Test 2 over any prefix or contiguous range of instances in constant time.
+
+    The S_j(P)s and I2O_1(P)s of the r instances of each group (k/l) are summed cumulatively over the
+    instances once (in double precision). The aggregates of Test 2 on the instances start, ..., stop-1,
+    i.e. S_i_avg, I2O_1_avg and A2O_1 (cf. simulation_funcs.T2_from_T1_results), then follow from the
+    difference of two prefix sums, e.g. the subselections of the first 10 or 100 instances (cf.
+    simulation_funcs.T2_sel_from_T2_bflip_r_inst), and the convergence curves of A2O_1 and I2O_1_avg
+    over the number of instances 1, ..., r for all groups at once.
+"""
+
+
+class T2PrefixIndex:
+    """ Prefix sums over the instances of the Test 2 results of one or several groups
+
+        S_i_r:          numpy.ndarray   - S_j(P)s of shape (k, r, n), or (r, n) for a single group (e.g. of a store, cf. storage_funcs)
+        I2O_1_r:        numpy.ndarray   - I2O_1(P)s of shape (k, r), or (r,) for a single group
+    """
+
+    def __init__(self, S_i_r, I2O_1_r):
+        S_i_r   = np.asarray(S_i_r)
+        I2O_1_r = np.asarray(I2O_1_r)
+        if S_i_r.ndim == 2:
+            S_i_r, I2O_1_r = S_i_r[np.newaxis], I2O_1_r[np.newaxis]
+
+        no_groups, r, no_bits = S_i_r.shape
+
+        """ Prefix sums with a leading zero, i.e. S_i_prefix[g, m] is the sum over the first m instances """
+        self.S_i_prefix     = np.zeros((no_groups, r + 1, no_bits), dtype=np.float64)
+        self.I2O_1_prefix   = np.zeros((no_groups, r + 1), dtype=np.float64)
+        np.cumsum(S_i_r, axis=1, dtype=np.float64, out=self.S_i_prefix[:, 1:])
+        np.cumsum(I2O_1_r, axis=1, dtype=np.float64, out=self.I2O_1_prefix[:, 1:])
+
+    @classmethod
+    def from_T2_results(cls, Test_2_m_insts):
+        """ Method to create the index of the results of Test 2 in k/l (cf. storage_funcs.load_T2_results)
+
+            Test_2_m_insts: list of tuples  - list in k/l of returns of simulation_funcs.T2_1_bflip_r_inst (same r for all k/l)
+                            tuple           - or a single return
+
+            index:          T2PrefixIndex
+        """
+
+        if isinstance(Test_2_m_insts, tuple):
+            Test_2_m_insts = [Test_2_m_insts]
+
+        return cls(np.stack([np.asarray(Test_2_insts[0]) for Test_2_insts in Test_2_m_insts]),
+                   np.stack([np.asarray(Test_2_insts[2]) for Test_2_insts in Test_2_m_insts]))
+
+    @property
+    def no_groups(self):
+        return self.S_i_prefix.shape[0]
+
+    @property
+    def no_instances(self):
+        return self.S_i_prefix.shape[1] - 1
+
+    def aggregates(self, g=0, start=0, stop=None):
+        """ Method to aggregate Test 2 over the instances start, ..., stop-1 of a group in constant time (per bit position)
+
+            g:              int             - index of the group, e.g. k-1
+            start:          int             - first instance
+            stop:           int or None     - instance after the last one, by default r
+
+            S_i_avg:        numpy.ndarray   - averaged S_j(P)s over the instances (n,)
+            I2O_1_avg:      float           - averaged I2O_1(P)s over the instances
+            A2O_1:          float           - A2O_1 of the instances
+        """
+
+        stop = self.no_instances if stop is None else stop
+        if not 0 <= start < stop <= self.no_instances:
+            raise ValueError(f'Invalid range of instances [{start}, {stop}) of {self.no_instances} instances.')
+
+        S_i_avg     = (self.S_i_prefix[g, stop] - self.S_i_prefix[g, start]) / (stop - start)
+        I2O_1_avg   = (self.I2O_1_prefix[g, stop] - self.I2O_1_prefix[g, start]) / (stop - start)
+        A2O_1       = np.average(np.abs(S_i_avg - 0.5))
+
+        return S_i_avg, I2O_1_avg, A2O_1
+
+    def convergence(self, start=0):
+        """ Method to determine the convergence curves of A2O_1 and I2O_1_avg over the number of instances for all groups at once
+
+            start:          int             - first instance, the curves cover the instances start, ..., start+m-1 for m = 1, ..., r-start
+
+            A2O_1_curve:    numpy.ndarray   - A2O_1 of the first m instances of shape (k, r-start), m = 1, ..., r-start
+            I2O_1_curve:    numpy.ndarray   - I2O_1_avg of the first m instances of shape (k, r-start)
+        """
+
+        no_insts    = np.arange(1, self.no_instances - start + 1, dtype=np.float64)
+
+        S_i_avg     = (self.S_i_prefix[:, start+1:] - self.S_i_prefix[:, start:start+1]) / no_insts[np.newaxis, :, np.newaxis]
+        A2O_1_curve = np.average(np.abs(S_i_avg - 0.5), axis=2)
+        I2O_1_curve = (self.I2O_1_prefix[:, start+1:] - self.I2O_1_prefix[:, start:start+1]) / no_insts[np.newaxis]
+
+        return A2O_1_curve, I2O_1_curve
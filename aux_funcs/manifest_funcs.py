@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import inspect
+import hashlib
+
+from pathlib import Path
+
+
+""" Functions to rebuild only the outputs (figures, tables) whose inputs changed since they were last built.
+
+    The manifest (JSON) records for each output the content hashes of the simulations it was built from
+    and of the code building it (cf. code_digests). An output is rebuilt iff it does not exist or its current dependencies
+    differ from the recorded ones. The content hash of each file is stored with its size and modification
+    time, such that unchanged files are not read again.
+"""
+
+
+def load_manifest(path):
+    """ Function to load the manifest
+
+        path:           string          - path of the JSON manifest
+
+        manifest:       dict            - 'files' (size, mtime and hash per file) and 'outputs' (dependencies per output)
+    """
+
+    if not Path(path).exists():
+        return {'files': {}, 'outputs': {}}
+
+    with open(path) as source_file:
+        return json.load(source_file)
+
+
+def save_manifest(path, manifest):
+    """ Function to save the manifest (atomically, an interrupted run keeps the previous one)
+
+        path:           string          - path of the JSON manifest
+        manifest:       dict            - cf. load_manifest
+    """
+
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+    with open(path + '.tmp', 'w') as target_file:
+        json.dump(manifest, target_file, indent=1, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def file_digest(path, files, chunk_size=2**20):
+    """ Function to determine the content hash of a file, reused if its size and modification time are unchanged
+
+        path:           string          - path of the file
+        files:          dict            - entries of known files (cf. load_manifest), updated in place
+        chunk_size:     int             - no. of bytes read at once
+
+        digest:         string          - SHA-256 of the content
+    """
+
+    stat    = os.stat(path)
+    entry   = files.get(path)
+    if entry is not None and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        return entry['digest']
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source_file:
+        for chunk in iter(lambda: source_file.read(chunk_size), b''):
+            digest.update(chunk)
+
+    files[path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'digest': digest.hexdigest()}
+
+    return files[path]['digest']
+
+
+def input_digest(path, files):
+    """ Function to determine the content hash of an input, i.e. of a file or of all files in a directory (e.g. a store)
+
+        path:           string          - path of the file or directory
+        files:          dict            - entries of known files, cf. file_digest
+
+        digest:         string          - SHA-256 over the relative paths and hashes of the files
+    """
+
+    if os.path.isdir(path):
+        paths = sorted(os.path.join(root, name) for root, _, names in os.walk(path) for name in names if not name.endswith('.tmp'))
+    else:
+        paths = [path]
+
+    digest = hashlib.sha256()
+    for file_path in paths:
+        digest.update(os.path.relpath(file_path, path).encode('utf-8') + b'\0' + file_digest(file_path, files).encode('utf-8') + b'\0')
+
+    return digest.hexdigest()
+
+
+def text_digest(text):
+    """ Function to determine the hash of a text, e.g. the source code of a function """
+
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def code_names(code):
+    """ Function to determine the global names a code object and the code objects nested in it (e.g. lambdas) refer to """
+
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names |= code_names(const)
+
+    return names
+
+
+def code_digests(roots, modules, files, package='aux_funcs'):
+    """ Function to determine the content hashes of the code an output depends on. Starting from the functions
+        creating the output, the functions and classes of the script and of the package they refer to are
+        followed recursively and the source of each is hashed, together with the repr of each constant they
+        read (e.g. a plotting parameter). The given modules are hashed as a whole file instead, and the
+        functions and classes they import from the package are followed.
+
+        roots:          list            - functions creating the output, e.g. its figure function
+        modules:        list of strings - names of the modules hashed as a whole, e.g. ['aux_funcs.plot_funcs']
+        files:          dict            - entries of known files, cf. file_digest
+        package:        string          - name of the package whose functions are followed
+
+        digests:        dict            - content hash per module file, per function/class and per constant ('file:name')
+    """
+
+    def followed(value):
+        return (inspect.isfunction(value) or inspect.isclass(value)) and \
+               (value.__module__ == '__main__' or value.__module__.split('.')[0] == package)
+
+    digests = {}
+    visited = set()
+    pending = list(roots)
+    while pending:
+        obj = pending.pop()
+        if (obj.__module__, obj.__qualname__) in visited:
+            continue
+        visited.add((obj.__module__, obj.__qualname__))
+
+        module  = sys.modules[obj.__module__]
+        path    = os.path.relpath(module.__file__)
+        if obj.__module__ in modules:
+            digests[path] = file_digest(path, files)
+            pending.extend(value for value in vars(module).values() if followed(value) and value.__module__ != obj.__module__)
+            continue
+
+        digests[f'{path}:{obj.__qualname__}'] = text_digest(inspect.getsource(obj))
+        if inspect.isclass(obj):
+            functions = [getattr(value, '__func__', value) for value in vars(obj).values()]
+            names = set().union(*(code_names(function.__code__) for function in functions if inspect.isfunction(function)))
+        else:
+            names = code_names(obj.__code__)
+
+        for name in sorted(names & vars(module).keys()):
+            value = vars(module)[name]
+            if followed(value):
+                pending.append(value)
+            elif isinstance(value, (bool, int, float, str, tuple, list, dict)):
+                digests[f'{path}:{name}'] = text_digest(repr(value))
+
+    return dict(sorted(digests.items()))
+
+
+def stale_outputs(manifest, dependencies):
+    """ Function to determine the outputs to be rebuilt
+
+        manifest:       dict            - cf. load_manifest
+        dependencies:   dict            - current dependencies per output path (JSON serializable)
+
+        stale:          dict            - per output to be rebuilt the reason, 'missing', 'new' or the changed dependencies
+    """
+
+    stale = {}
+    for output, deps in dependencies.items():
+        recorded = manifest['outputs'].get(output)
+        if not os.path.exists(output):
+            stale[output] = 'missing'
+        elif recorded is None:
+            stale[output] = 'new'
+        elif recorded != deps:
+            changed = sorted(key for group in deps for key in deps[group] if recorded.get(group, {}).get(key) != deps[group][key])
+            stale[output] = 'changed ' + ', '.join(changed)
+
+    return stale
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from itertools import combinations
+from numpy.random import default_rng
+from joblib import Parallel, delayed
+
+from aux_funcs.simulation_funcs import det_no_resp_flips, det_resp_flips_batch, select_T1_engine
+from aux_funcs.bitpack_funcs import is_packed, unpack_challenges
+from aux_funcs.challenge_funcs import iter_challenge_chunks
+
+
+""" Functions to implement Tests 1 and 2 for simultaneous flips of two challenge bits, i.e.
+    the n x n matrix of S_{j,k}(P), the probability of a response flip when both challenge
+    bits j and k are flipped, and the second-order score I2O_2(P), the average of
+    |S_{j,k}(P) - 0.5| over all (or the sampled) pairs j < k.
+"""
+
+
+def all_pairs(n):
+    """ Function to list all pairs of bit positions j < k
+
+        n:              int             - challenge length
+
+        pairs:          numpy.ndarray   - int array of shape (n*(n-1)/2, 2)
+    """
+
+    return np.array(list(combinations(range(n), 2)), dtype=np.int64).reshape(-1, 2)
+
+
+def sample_pairs(n, no_pairs, seed):
+    """ Function to sample distinct pairs of bit positions j < k uniformly (for large n)
+
+        n:              int             - challenge length
+        no_pairs:       int             - number of pairs (at most n*(n-1)/2)
+        seed:           int             - seed of the pair selection
+
+        pairs:          numpy.ndarray   - int array of shape (no_pairs, 2), sorted lexicographically
+    """
+
+    pairs = all_pairs(n)
+    sel   = default_rng(seed).choice(len(pairs), size=no_pairs, replace=False)
+
+    return pairs[np.sort(sel)]
+
+
+def det_resp_flips_pairs_xor_arbiter(puf_instance, challenges, pairs, max_rows=2**16):
+    """ Function to determine for pairs of challenge bit positions at once which response bits
+        of a noise-free (XOR) Arbiter PUF are flipped, without re-evaluating the PUF.
+
+        Flipping bits j < k negates Phi_0, ..., Phi_j twice and Phi_{j+1}, ..., Phi_k once, hence
+        with the prefix sums P_lj of simulation_funcs.det_resp_flips_xor_arbiter the flipped delay
+        difference of chain l is D_l(c) - 2 * (P_lk - P_lj).
+
+        puf_instance:   puf object      - pypuf XORArbiterPUF (noisiness 0, default input transformation)
+        challenges:     numpy.ndarray   - all initial challenges (e.g. generated with pypuf.io.random_inputs)
+        pairs:          numpy.ndarray   - int array of shape (P, 2) of pairs j < k
+        max_rows:       int             - maximal number of (challenge, chain) rows processed at once per bit position
+
+        resp_flips:     numpy.ndarray   - boolean array of shape (P, N), True where the response flipped
+    """
+
+    weights = puf_instance.weight_array
+    no_Cs   = challenges.shape[0]
+    k       = weights.shape[0]
+    no_bits = weights.shape[1] - 1
+    chunk   = max(1, max_rows * no_bits // (k * max(1, len(pairs))))
+
+    resp_flips = np.empty((len(pairs), no_Cs), dtype=bool)
+
+    for start in range(0, no_Cs, chunk):
+        challenges_chunk = challenges[start:start+chunk]
+
+        features    = np.cumprod(challenges_chunk[:, ::-1], axis=1, dtype=np.int8)[:, ::-1]
+        prefix      = np.cumsum(features[:, np.newaxis, :] * weights[np.newaxis, :, :-1], axis=2)
+        delay       = prefix[:, :, -1] + weights[:, -1]
+
+        """ Flipped delay differences of shape (N, k, P) """
+        delay_flipped = delay[:, :, np.newaxis] - 2 * (prefix[:, :, pairs[:, 1]] - prefix[:, :, pairs[:, 0]])
+        chain_flips   = (delay[:, :, np.newaxis] > 0) != (delay_flipped > 0)
+
+        resp_flips[:, start:start+chunk] = np.logical_xor.reduce(chain_flips, axis=1).T
+
+    return resp_flips
+
+
+def det_resp_flips_pairs_xor_br(puf_instance, challenges, pairs, max_rows=2**16):
+    """ Function to determine for pairs of challenge bit positions at once which response bits of a
+        (XOR) Bistable Ring PUF are flipped. Flipping bits j and k changes D_l(c) = <w_l, c> + b_l
+        by -2 * (w_lj * c_j + w_lk * c_k) (cf. simulation_funcs.det_chain_flips_xor_br).
+
+        puf_instance:   puf object      - pypuf XORBistableRingPUF
+        challenges:     numpy.ndarray   - all initial challenges (e.g. generated with pypuf.io.random_inputs)
+        pairs:          numpy.ndarray   - int array of shape (P, 2) of pairs j < k
+        max_rows:       int             - maximal number of (challenge, ring) rows processed at once per bit position
+
+        resp_flips:     numpy.ndarray   - boolean array of shape (P, N), True where the response flipped
+    """
+
+    weights = puf_instance.weight_array
+    no_Cs   = challenges.shape[0]
+    k       = weights.shape[0]
+    no_bits = weights.shape[1] - 1
+    chunk   = max(1, max_rows * no_bits // (k * max(1, len(pairs))))
+
+    resp_flips = np.empty((len(pairs), no_Cs), dtype=bool)
+
+    for start in range(0, no_Cs, chunk):
+        challenges_chunk = challenges[start:start+chunk]
+
+        delay   = challenges_chunk @ weights[:, :-1].T + weights[:, -1]
+        summand = weights[np.newaxis, :, :-1] * challenges_chunk[:, np.newaxis, :]
+
+        """ Flipped values of shape (N, k, P) """
+        delay_flipped = delay[:, :, np.newaxis] - 2 * (summand[:, :, pairs[:, 0]] + summand[:, :, pairs[:, 1]])
+        chain_flips   = (delay[:, :, np.newaxis] > 0) != (delay_flipped > 0)
+
+        resp_flips[:, start:start+chunk] = np.logical_xor.reduce(chain_flips, axis=1).T
+
+    return resp_flips
+
+
+def det_no_resp_flips_pairs(puf_instance, challenges, pairs, engine='auto', max_rows=2**16):
+    """ Function to determine for pairs of challenge bit positions how many response bits are
+        flipped when both challenge bits are flipped. The unflipped responses are evaluated once
+        and shared by all pairs.
+
+        puf_instance:   puf object      - from pypuf
+        challenges:     numpy.ndarray   - all initial challenges, in pypuf {-1,1} or packed representation,
+                        ChallengeStream - or a stream of challenge chunks (cf. simulation_funcs.T1_1_bflip_1_inst)
+        pairs:          numpy.ndarray   - int array of shape (P, 2) of pairs j < k, cf. all_pairs and sample_pairs
+        engine:         string          - 'loop' evaluates one flipped challenge set per pair (simulation_funcs.det_no_resp_flips),
+                                          'batched' stacks the flipped challenge sets into slabs (simulation_funcs.det_resp_flips_batch),
+                                          'cumsum' uses the closed form for noise-free (XOR) Arbiter PUFs (det_resp_flips_pairs_xor_arbiter),
+                                          'br' uses the closed form for (XOR) Bistable Ring PUFs (det_resp_flips_pairs_xor_br),
+                                          'auto' selects the fastest applicable engine
+        max_rows:       int             - maximal number of rows processed at once (all engines but 'loop')
+
+        no_resp_flips:  numpy.ndarray   - int array of shape (P,), no. of flipped responses per pair
+    """
+
+    no_bits = puf_instance.challenge_length
+    pairs   = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+
+    if engine == 'auto':
+        engine = select_T1_engine(puf_instance)
+
+    """ The prefix reuse of Feed-Forward Arbiter PUFs is only implemented for single bit flips """
+    if engine == 'ff':
+        engine = 'batched'
+
+    if engine not in ['loop', 'batched', 'cumsum', 'br']:
+        raise ValueError(f'Unknown engine {engine!r} for Test 1 with pairs of bit flips.')
+
+    if engine == 'cumsum' and select_T1_engine(puf_instance) != 'cumsum':
+        raise ValueError('Engine cumsum requires a noise-free XORArbiterPUF with the default input transformation.')
+
+    if engine == 'br' and select_T1_engine(puf_instance) != 'br':
+        raise ValueError('Engine br requires a XORBistableRingPUF.')
+
+    no_resp_flips = np.zeros(len(pairs), dtype=np.int64)
+
+    for challenges_chunk in iter_challenge_chunks(challenges, max_rows):
+        if is_packed(challenges_chunk):
+            challenges_chunk = unpack_challenges(challenges_chunk, no_bits)
+
+        if engine == 'cumsum':
+            no_resp_flips += np.sum(det_resp_flips_pairs_xor_arbiter(puf_instance, challenges_chunk, pairs, max_rows), axis=1)
+            continue
+
+        if engine == 'br':
+            no_resp_flips += np.sum(det_resp_flips_pairs_xor_br(puf_instance, challenges_chunk, pairs, max_rows), axis=1)
+            continue
+
+        responses = puf_instance.eval(challenges_chunk)
+
+        if engine == 'loop':
+            no_resp_flips += np.array([det_no_resp_flips(puf_instance, responses, challenges_chunk, list(pair)) for pair in pairs], dtype=np.int64)
+        else:
+            no_resp_flips += np.sum(det_resp_flips_batch(puf_instance, responses, challenges_chunk, [list(pair) for pair in pairs], max_rows), axis=1)
+
+    return no_resp_flips
+
+
+def T1_2_bflip_1_inst(puf_instance, challenges, pairs=None, engine='auto', max_rows=2**16):
+    """ Function to implement Test 1 for simultaneous flips of two challenge bits
+
+        puf_instance:   puf object      - from pypuf
+        challenges:     numpy.ndarray   - all initial challenges (cf. det_no_resp_flips_pairs)
+                        ChallengeStream
+        pairs:          numpy.ndarray   - pairs j < k to be examined (e.g. from sample_pairs), by default all pairs
+        engine:         string          - engine name, cf. det_no_resp_flips_pairs
+        max_rows:       int             - maximal number of rows processed at once
+
+        S_jk_arr:       numpy.ndarray   - symmetric n x n matrix of the estimated S_{j,k}(P)s, 0 on the diagonal
+                                          (no bit is flipped), NaN for pairs not examined
+        I2O_2:          float           - estimated I2O_2(P), i.e. the average of |S_{j,k}(P) - 0.5| over the examined pairs
+    """
+
+    no_bits = puf_instance.challenge_length
+    no_Cs   = challenges.shape[0]
+    pairs   = all_pairs(no_bits) if pairs is None else np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+
+    S_jk    = det_no_resp_flips_pairs(puf_instance, challenges, pairs, engine, max_rows) / no_Cs
+
+    S_jk_arr = np.full((no_bits, no_bits), np.nan)
+    np.fill_diagonal(S_jk_arr, 0)
+    S_jk_arr[pairs[:, 0], pairs[:, 1]] = S_jk
+    S_jk_arr[pairs[:, 1], pairs[:, 0]] = S_jk
+
+    I2O_2   = np.average(np.abs(S_jk - 0.5))
+
+    return S_jk_arr, I2O_2
+
+
+def T2_2_bflip_r_inst(instances, challenges, pairs=None, n_jobs=1, engine='auto'):
+    """ Function to implement Test 2 for simultaneous flips of two challenge bits
+
+        instances:      list of puf objects - from pypuf
+        challenges:     numpy.ndarray       - all initial challenges (cf. det_no_resp_flips_pairs)
+                        ChallengeStream
+        pairs:          numpy.ndarray       - pairs j < k examined on all instances (e.g. from sample_pairs), by default all pairs
+        n_jobs:         int                 - no. of cores used (parallel evaluation of instances)
+        engine:         string              - engine used for Test 1 on each instance (cf. det_no_resp_flips_pairs)
+
+        S_jk_r:         list of arrays      - estimated r n x n matrices of S_{j,k}(P_i)s from Test 1
+        S_jk_avg:       numpy.ndarray       - estimated n x n matrix of \overline{S}_{j,k}s from Test 2
+        I2O_2_r:        list of float       - estimated r I2O_2(P_i) from Test 1
+        I2O_2_avg:      float               - estimated \overline{I2O}_2 from Test 2
+        A2O_2:          float               - estimated A2O_2 from Test 2, i.e. the average of |\overline{S}_{j,k} - 0.5| over the examined pairs
+    """
+
+    instances_T1 = Parallel(n_jobs=n_jobs)(delayed(T1_2_bflip_1_inst)(instance, challenges, pairs, engine) for instance in instances)
+
+    S_jk_r  = [S_jk_arr for S_jk_arr, I2O_2 in instances_T1]
+    I2O_2_r = [I2O_2 for S_jk_arr, I2O_2 in instances_T1]
+
+    r = len(S_jk_r)
+
+    S_jk_avg    = np.sum(S_jk_r, axis=0) / r
+    I2O_2_avg   = np.sum(I2O_2_r) / r
+
+    """ Examined pairs j < k (not NaN) in the upper triangle """
+    examined    = np.triu(~np.isnan(S_jk_avg), k=1)
+    A2O_2       = np.average(np.abs(S_jk_avg[examined] - 0.5))
+
+    return S_jk_r, S_jk_avg, I2O_2_r, I2O_2_avg, A2O_2
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from joblib import Parallel, delayed
+
+from aux_funcs.simulation_funcs import det_chain_flips_xor_arbiter, det_chain_flips_xor_br, select_T1_engine, T2_from_T1_results
+from aux_funcs.bitpack_funcs import is_packed, unpack_challenges, popcount
+from aux_funcs.challenge_funcs import iter_challenge_chunks, load_challenges
+from aux_funcs.spec_funcs import build_puf_instance
+
+
+""" Functions to implement Test 2 on k-XOR PUFs for all k = 1, ..., K at once (chain-pool mode).
+
+    A pool instance is a K-XOR PUF (e.g. XORArbiterPUF(n, K, seed=i)), whose first k chains form
+    the k-XOR PUF examined for k <= K. The response of a k-XOR PUF flips iff an odd number of its
+    chains flip, hence the flip indicators of the single chains are determined once (packed into bits),
+    and cumulatively XORed over the chains. The whole sweep over k then costs about as much as
+    Test 1 on the K-XOR PUFs alone.
+
+    Note that the k-XOR PUFs are compositions of the pool chains and hence differ from independently
+    constructed instances, e.g. XORArbiterPUF(n, k, seed=i) draws its weights depending on k. For
+    Bistable Ring PUFs with weights default_rng(i).normal(size=(K, n+1)), the first k chains have the
+    weights default_rng(i).normal(size=(k, n+1)).
+"""
+
+
+def det_chain_flips(puf_instance, challenges):
+    """ Function to determine for all challenge bit positions which chains of a noise-free LTF array
+        PUF (e.g. XORArbiterPUF or XORBistableRingPUF) change their sign
+
+        puf_instance:   puf object      - from pypuf, LTFArray with XOR combiner
+        challenges:     numpy.ndarray   - initial challenges (all processed at once)
+
+        chain_flips:    numpy.ndarray   - boolean array of shape (N, k, n), True where chain l changed its sign
+    """
+
+    if select_T1_engine(puf_instance) == 'cumsum':
+        return det_chain_flips_xor_arbiter(puf_instance, challenges)
+
+    if select_T1_engine(puf_instance) == 'br':
+        return det_chain_flips_xor_br(puf_instance, challenges)
+
+    no_Cs, no_bits  = challenges.shape
+    k               = puf_instance.weight_array.shape[0]
+
+    chain_vals  = puf_instance.ltf_eval(puf_instance.transform(challenges, k)) > 0
+    chain_flips = np.empty((no_Cs, k, no_bits), dtype=bool)
+
+    for j in range(no_bits):
+        challenges_flipped = challenges.copy()
+        challenges_flipped[:, j] *= -1
+
+        chain_flips[:, :, j] = chain_vals != (puf_instance.ltf_eval(puf_instance.transform(challenges_flipped, k)) > 0)
+
+    return chain_flips
+
+
+def det_no_resp_flips_chain_pool(puf_instance, challenges, max_rows=2**16):
+    """ Function to determine for every k <= K and every challenge bit position how many responses
+        of the k-XOR PUF formed by the first k chains of a pool instance are flipped
+
+        puf_instance:   puf object      - from pypuf, K-XOR LTF array PUF (noise-free)
+        challenges:     numpy.ndarray   - all initial challenges, in pypuf {-1,1} or packed representation,
+                        ChallengeStream - or a stream of challenge chunks (cf. simulation_funcs.T1_1_bflip_1_inst)
+        max_rows:       int             - maximal number of (challenge, chain) rows processed at once
+
+        no_resp_flips:  numpy.ndarray   - int array of shape (K, n), no. of flipped responses per k and bit position
+    """
+
+    no_bits = puf_instance.challenge_length
+    K       = puf_instance.weight_array.shape[0]
+    chunk   = max(8, max_rows // K)
+
+    no_resp_flips = np.zeros((K, no_bits), dtype=np.int64)
+
+    for challenges_chunk in iter_challenge_chunks(challenges, chunk):
+        if is_packed(challenges_chunk):
+            challenges_chunk = unpack_challenges(challenges_chunk, no_bits)
+
+        """ Packed flip indicators of shape (K, n, ceil(N/8)), XORed cumulatively over the chains """
+        chain_flips = np.packbits(np.transpose(det_chain_flips(puf_instance, challenges_chunk), (1, 2, 0)), axis=-1)
+        resp_flips  = np.bitwise_xor.accumulate(chain_flips, axis=0)
+
+        no_resp_flips += popcount(resp_flips, axis=-1)
+
+    return no_resp_flips
+
+
+def T1_1_bflip_chain_pool(puf_instance, challenges, max_rows=2**16):
+    """ Function to implement Test 1 on the k-XOR PUFs formed by the first k chains of a pool instance
+
+        puf_instance:   puf object      - from pypuf, K-XOR LTF array PUF (noise-free)
+                        dict            - or its spec, cf. spec_funcs.puf_spec
+        challenges:     numpy.ndarray   - all initial challenges (cf. det_no_resp_flips_chain_pool)
+                        ChallengeStream
+                        ChallengeFile   - or a handle of shared challenges, cf. challenge_funcs.share_challenges
+        max_rows:       int             - maximal number of (challenge, chain) rows processed at once
+
+        S_i_arr_k:      numpy.ndarray   - estimated S_j(P)s of shape (K, n), row k-1 for the k-XOR PUF
+        I2O_1_k:        numpy.ndarray   - estimated I2O_1(P)s of shape (K,)
+    """
+
+    puf_instance    = build_puf_instance(puf_instance)
+    challenges      = load_challenges(challenges)
+
+    S_i_arr_k   = det_no_resp_flips_chain_pool(puf_instance, challenges, max_rows) / challenges.shape[0]
+    I2O_1_k     = np.average(np.abs(S_i_arr_k - 0.5), axis=1)
+
+    return S_i_arr_k, I2O_1_k
+
+
+def T2_1_bflip_chain_pool(instances, challenges, n_jobs=1):
+    """ Function to implement Test 2 on the k-XOR PUFs (k = 1, ..., K) formed by the chains of r pool instances
+
+        instances:      list of puf objects - from pypuf, K-XOR LTF array PUFs (or their specs, cf. spec_funcs.puf_spec)
+        challenges:     numpy.ndarray       - all initial challenges (cf. T1_1_bflip_chain_pool)
+                        ChallengeStream
+                        ChallengeFile
+        n_jobs:         int                 - no. of cores used (parallel evaluation of instances)
+
+        Test_2_k_insts: list of tuples      - list in k of returns of simulation_funcs.T2_1_bflip_r_inst
+    """
+
+    instances_T1 = Parallel(n_jobs=n_jobs)(delayed(T1_1_bflip_chain_pool)(instance, challenges) for instance in instances)
+
+    K = instances_T1[0][0].shape[0]
+
+    return [T2_from_T1_results([S_i_arr_k[k] for S_i_arr_k, _ in instances_T1], [I2O_1_k[k] for _, I2O_1_k in instances_T1]) for k in range(K)]
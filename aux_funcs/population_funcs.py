@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from joblib import Parallel, delayed
+
+from aux_funcs.simulation_funcs import select_T1_engine, T2_from_T1_results
+from aux_funcs.bitpack_funcs import is_packed, unpack_challenges
+from aux_funcs.challenge_funcs import iter_challenge_chunks, load_challenges
+from aux_funcs.spec_funcs import build_puf_instance
+
+
+""" Functions to implement Test 2 on a population of r linear threshold PUF instances at once.
+
+    A population stacks the weights of r instances of the same family, i.e. noise-free (XOR) Arbiter
+    PUFs with the default input transformation or (XOR) Bistable Ring PUFs, with the same n and k into
+    one array of shape (r, k, n+1). The delay differences of all r*k chains are then determined for a
+    chunk of challenges with a single matrix product, and the flipped delay differences of all bit
+    positions follow by broadcasting (cf. simulation_funcs.det_chain_flips_xor_arbiter and
+    simulation_funcs.det_chain_flips_xor_br), instead of evaluating every instance in a separate task.
+"""
+
+
+class PUFPopulation:
+    """ Array-backed population of r PUF instances of the same family. Only the stacked weights
+        are stored (and pickled when sent to workers).
+
+        weights:        numpy.ndarray   - weights of shape (r, k, n+1), the bias last
+        engine:         string          - family of the instances, 'cumsum' for (XOR) Arbiter PUFs,
+                                          'br' for (XOR) Bistable Ring PUFs (cf. simulation_funcs.select_T1_engine)
+    """
+
+    def __init__(self, weights, engine):
+        if engine not in ['cumsum', 'br']:
+            raise ValueError(f'Unknown PUF family {engine!r} of a population, expected cumsum or br.')
+
+        self.weights    = np.asarray(weights, dtype=np.float64)
+        self.engine     = engine
+
+    @property
+    def shape(self):
+        return self.weights.shape
+
+    @property
+    def challenge_length(self):
+        return self.weights.shape[2] - 1
+
+    def __len__(self):
+        return self.weights.shape[0]
+
+    def __repr__(self):
+        r, k, n_1 = self.weights.shape
+        return f'PUFPopulation(r={r}, k={k}, n={n_1-1}, engine={self.engine!r})'
+
+
+def is_stackable(instances):
+    """ Function to determine whether instances can be stacked into a population
+
+        instances:      list of puf objects - from pypuf (or their specs, cf. spec_funcs.puf_spec)
+
+        stackable:      bool                - True iff all instances are of the same family with the same shape
+    """
+
+    instances = [build_puf_instance(instance) for instance in instances]
+    if not instances:
+        return False
+
+    engines = {select_T1_engine(instance) for instance in instances}
+    shapes  = {instance.weight_array.shape for instance in instances}
+
+    return len(engines) == 1 and engines <= {'cumsum', 'br'} and len(shapes) == 1
+
+
+def stack_population(instances):
+    """ Function to stack the weights of instances into a population
+
+        instances:      list of puf objects - from pypuf, noise-free XORArbiterPUFs or XORBistableRingPUFs
+                                              with the same n and k (or their specs, cf. spec_funcs.puf_spec)
+
+        population:     PUFPopulation       - population of the r instances in the given order
+    """
+
+    instances = [build_puf_instance(instance) for instance in instances]
+
+    if not is_stackable(instances):
+        raise ValueError('A population requires noise-free XORArbiterPUFs or XORBistableRingPUFs with the same n and k.')
+
+    return PUFPopulation(np.stack([instance.weight_array for instance in instances]), select_T1_engine(instances[0]))
+
+
+def split_population(population, parts):
+    """ Function to split a population into contiguous sub-populations of (almost) equal size
+
+        population:     PUFPopulation   - population of r instances
+        parts:          int             - number of sub-populations
+
+        populations:    list            - list of PUFPopulations, in the order of the instances
+    """
+
+    return [PUFPopulation(weights, population.engine) for weights in np.array_split(population.weights, min(parts, len(population)))]
+
+
+def population_features(population, challenges):
+    """ Function to determine the features of the challenges, i.e. the challenges after the input
+        transformation of the family: Phi_i(c) = prod_{m >= i} c_m for Arbiter PUFs, c itself for
+        Bistable Ring PUFs
+
+        population:     PUFPopulation   - population of r instances
+        challenges:     numpy.ndarray   - challenges of shape (N, n)
+
+        features:       numpy.ndarray   - features of shape (N, n)
+    """
+
+    if population.engine == 'cumsum':
+        return np.cumprod(challenges[:, ::-1], axis=1, dtype=np.int8)[:, ::-1]
+
+    return challenges
+
+
+def population_delays(population, features):
+    """ Function to determine the delay differences of all chains of all instances with a single matrix product
+
+        population:     PUFPopulation   - population of r instances
+        features:       numpy.ndarray   - features of shape (N, n), cf. population_features
+
+        delay:          numpy.ndarray   - delay differences of shape (N, r, k)
+    """
+
+    weights = population.weights
+
+    return np.einsum('ci,rki->crk', features, weights[:, :, :-1], optimize=True) + weights[np.newaxis, :, :, -1]
+
+
+def eval_population(population, challenges):
+    """ Function to evaluate all instances of a population, equivalent to instance.eval(challenges) of pypuf per instance
+
+        population:     PUFPopulation   - population of r instances
+        challenges:     numpy.ndarray   - challenges of shape (N, n) (all processed at once)
+
+        responses:      numpy.ndarray   - responses of shape (r, N) with the dtype of the challenges
+    """
+
+    delay = population_delays(population, population_features(population, challenges))
+
+    return np.sign(np.prod(delay, axis=2)).T.astype(challenges.dtype)
+
+
+def det_chain_flips_population(population, challenges):
+    """ Function to determine for all instances and challenge bit positions at once which chains change their sign
+
+        population:     PUFPopulation   - population of r instances
+        challenges:     numpy.ndarray   - initial challenges of shape (N, n) (all processed at once)
+
+        chain_flips:    numpy.ndarray   - boolean array of shape (N, r, k, n), True where chain l of instance i changed its sign
+    """
+
+    weights     = population.weights[np.newaxis, :, :, :-1]
+    features    = population_features(population, challenges)
+    delay       = population_delays(population, features)[:, :, :, np.newaxis]
+
+    """ Flipping bit j negates Phi_0, ..., Phi_j of an Arbiter PUF (prefix sums), only c_j of a Bistable Ring PUF,
+        i.e. the delay difference D changes to D - 2 * delay_change (computed in place to save temporaries)
+    """
+    delay_change = features[:, np.newaxis, np.newaxis, :] * weights
+    if population.engine == 'cumsum':
+        np.cumsum(delay_change, axis=3, out=delay_change)
+    delay_change *= 2
+
+    """ D - 2 * delay_change > 0 iff D > 2 * delay_change in floating point arithmetic """
+    return np.not_equal(delay > 0, np.greater(delay, delay_change))
+
+
+def population_blocks(population, block_bytes=2**23, min_chunk=64):
+    """ Function to determine the blocks (challenges x instances) evaluated at once, sized by the memory of the flipped
+        delay differences of a block, i.e. chunk * r_block * k * n * 8 bytes (cf. det_chain_flips_population).
+        Large populations (e.g. r = 1000, k = 20) are split into blocks of instances, such that each block still
+        holds at least min_chunk challenges, instead of evaluating a few challenges on all instances at once.
+
+        population:     PUFPopulation   - population of r instances
+        block_bytes:    int             - memory budget of a block, about cache-sized by default
+        min_chunk:      int             - minimal number of challenges of a block
+
+        chunk:          int             - number of challenges of a block
+        r_block:        int             - number of instances of a block
+    """
+
+    r, k, n_1   = population.shape
+    block_rows  = max(1, block_bytes // (k * (n_1 - 1) * 8))
+    chunk       = max(min_chunk, block_rows // r)
+    r_block     = max(1, min(r, block_rows // chunk))
+
+    return chunk, r_block
+
+
+def det_no_resp_flips_population(population, challenges, block_bytes=2**23):
+    """ Function to determine for all instances and challenge bit positions how many responses are flipped
+
+        population:     PUFPopulation   - population of r instances
+        challenges:     numpy.ndarray   - all initial challenges, in pypuf {-1,1} or packed representation,
+                        ChallengeStream - or a stream of challenge chunks (cf. simulation_funcs.T1_1_bflip_1_inst)
+        block_bytes:    int             - memory budget of the blocks of challenges and instances evaluated at once, cf. population_blocks
+
+        no_resp_flips:  numpy.ndarray   - int array of shape (r, n), no. of flipped responses per instance and bit position
+    """
+
+    r, k, _         = population.shape
+    no_bits         = population.challenge_length
+    chunk, r_block  = population_blocks(population, block_bytes)
+    sub_populations = [(start, PUFPopulation(population.weights[start:start+r_block], population.engine)) for start in range(0, r, r_block)]
+
+    no_resp_flips = np.zeros((r, no_bits), dtype=np.int64)
+
+    for challenges_chunk in iter_challenge_chunks(challenges, chunk):
+        if is_packed(challenges_chunk):
+            challenges_chunk = unpack_challenges(challenges_chunk, no_bits)
+
+        for start in range(0, challenges_chunk.shape[0], chunk):
+            for r_start, sub_population in sub_populations:
+                """ The XORed response flips iff an odd number of chains change their sign """
+                resp_flips = det_chain_flips_population(sub_population, challenges_chunk[start:start+chunk])
+                if k > 1:
+                    resp_flips = np.logical_xor.reduce(resp_flips, axis=2)
+
+                no_resp_flips[r_start:r_start+len(sub_population)] += np.count_nonzero(resp_flips.reshape(resp_flips.shape[0], len(sub_population), no_bits), axis=0)
+
+    return no_resp_flips
+
+
+def T1_1_bflip_population(population, challenges, block_bytes=2**23):
+    """ Function to implement Test 1 on all instances of a population
+
+        population:     PUFPopulation   - population of r instances
+        challenges:     numpy.ndarray   - all initial challenges (cf. det_no_resp_flips_population)
+                        ChallengeStream
+                        ChallengeFile   - or a handle of shared challenges, cf. challenge_funcs.share_challenges
+        block_bytes:    int             - memory budget of the blocks evaluated at once, cf. population_blocks
+
+        S_i_r_arr:      numpy.ndarray   - estimated S_j(P)s of shape (r, n)
+        I2O_1_r_arr:    numpy.ndarray   - estimated I2O_1(P)s of shape (r,)
+    """
+
+    challenges = load_challenges(challenges)
+
+    S_i_r_arr   = det_no_resp_flips_population(population, challenges, block_bytes) / challenges.shape[0]
+    I2O_1_r_arr = np.average(np.abs(S_i_r_arr - 0.5), axis=1)
+
+    return S_i_r_arr, I2O_1_r_arr
+
+
+def T2_1_bflip_population(instances, challenges, n_jobs=1, block_bytes=2**23):
+    """ Function to implement Test 2 on a population, split into one sub-population per core
+
+        instances:      PUFPopulation       - population of r instances
+                        list of puf objects - or instances to be stacked, cf. stack_population
+        challenges:     numpy.ndarray       - all initial challenges (cf. T1_1_bflip_population)
+                        ChallengeStream
+                        ChallengeFile
+        n_jobs:         int                 - no. of cores used (parallel evaluation of sub-populations)
+        block_bytes:    int                 - memory budget of the blocks evaluated at once, cf. population_blocks
+
+        Test_2_r_inst:  tuple               - return of simulation_funcs.T2_1_bflip_r_inst, i.e. (S_i_r, S_i_avg, I2O_1_r, I2O_1_avg, A2O_1)
+    """
+
+    population = instances if isinstance(instances, PUFPopulation) else stack_population(instances)
+
+    populations_T1 = Parallel(n_jobs=n_jobs)(delayed(T1_1_bflip_population)(sub_population, challenges, block_bytes) for sub_population in split_population(population, n_jobs))
+
+    S_i_r   = [S_i_arr for S_i_r_arr, _ in populations_T1 for S_i_arr in S_i_r_arr]
+    I2O_1_r = [I2O_1 for _, I2O_1_r_arr in populations_T1 for I2O_1 in I2O_1_r_arr]
+
+    return T2_from_T1_results(S_i_r, I2O_1_r)
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import csv
+import json
+import time
+import resource
+import threading
+import tracemalloc
+
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+
+""" Functions to profile the phases of the simulations (opt-in, cf. run_simulations.py --profile).
+
+    A Profiler collects one record per phase (e.g. challenge creation, instance construction, evaluation)
+    and experiment/group, with wall time, CPU time of the main process, evaluations per second and peak
+    memory. Tasks evaluated by workers report their own timings (instance construction, challenge loading,
+    evaluation and CPU time, cf. schedule_funcs.T1_task), which are summed per group, such that the time spent
+    in joblib IPC and pickling can be estimated as the difference to the wall time of the parallel phase.
+
+    The peak memory is determined with one of the backends
+        'rss':              peak RSS of the main process and its finished children (resource, no overhead),
+        'tracemalloc':      peak of the memory allocated by Python in the main process during the phase,
+        'memory_profiler':  peak RSS of the main process including its children (e.g. joblib workers) during
+                            the phase, sampled by the memory_profiler package in a background thread.
+"""
+
+
+MEMORY_BACKENDS = ['rss', 'tracemalloc', 'memory_profiler']
+
+
+def rss_peak_mb():
+    """ Function to determine the peak RSS of the current process and its finished children
+
+        peak:           float           - peak RSS in MB (the maximum of both)
+    """
+
+    max_rss = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+
+    # ru_maxrss is given in kB on Linux, in bytes on macOS
+    return max_rss / 2**20 if os.uname().sysname == 'Darwin' else max_rss / 2**10
+
+
+class MemorySampler:
+    """ Background thread sampling the RSS of the current process including its children with memory_profiler
+
+        interval:       float           - sampling interval in seconds
+    """
+
+    def __init__(self, interval=0.1):
+        try:
+            from memory_profiler import memory_usage
+        except ImportError as err:
+            raise ImportError('The memory backend memory_profiler requires the memory-profiler package (cf. requirements_full.txt).') from err
+
+        self.memory_usage   = memory_usage
+        self.interval       = interval
+        self.peak           = 0.
+        self.stop_event     = threading.Event()
+        self.thread         = threading.Thread(target=self.sample, daemon=True)
+
+    def sample(self):
+        while not self.stop_event.is_set():
+            usage       = self.memory_usage(-1, interval=self.interval, timeout=self.interval, include_children=True, max_usage=True)
+            self.peak   = max(self.peak, usage)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop_event.set()
+        self.thread.join()
+
+
+class Profiler:
+    """ Collector of the profiling records of a run
+
+        memory:         string          - memory backend, cf. MEMORY_BACKENDS
+    """
+
+    def __init__(self, memory='rss'):
+        if memory not in MEMORY_BACKENDS:
+            raise ValueError(f'Unknown memory backend {memory!r}, expected one of {MEMORY_BACKENDS}.')
+
+        self.memory     = memory
+        self.records    = []
+
+        if memory == 'tracemalloc' and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def record(self, phase, experiment=None, group=None, wall_s=None, cpu_s=None, no_evals=None, peak_mb=None, **extra):
+        """ Method to add a record, e.g. of the timings reported by the workers
+
+            phase:          string          - name of the phase
+            experiment:     int or None     - index of the experiment
+            group:          int or None     - index of the group (k/l) within the experiment
+            wall_s:         float or None   - wall time in seconds
+            cpu_s:          float or None   - CPU time in seconds
+            no_evals:       int or None     - no. of challenge evaluations, to determine evaluations per second
+            peak_mb:        float or None   - peak memory in MB
+            extra:          keyword args    - further values of the record
+        """
+
+        evals_per_s = no_evals / wall_s if (no_evals is not None and wall_s) else None
+
+        self.records.append(dict({'phase': phase, 'experiment': experiment, 'group': group, 'wall_s': wall_s, 'cpu_s': cpu_s,
+                                  'no_evals': no_evals, 'evals_per_s': evals_per_s, 'peak_mb': peak_mb}, **extra))
+
+    @contextmanager
+    def phase(self, phase, experiment=None, group=None, no_evals=None, **extra):
+        """ Context manager to record the wall time, CPU time (main process) and peak memory of a phase.
+            It yields a dict, in which further values of the record (including 'no_evals') may be set within the phase.
+
+            phase:          string          - name of the phase
+            experiment:     int or None     - index of the experiment
+            group:          int or None     - index of the group (k/l) within the experiment
+            no_evals:       int or None     - no. of challenge evaluations of the phase
+            extra:          keyword args    - further values of the record
+        """
+
+        sampler = MemorySampler() if self.memory == 'memory_profiler' else nullcontext()
+        if self.memory == 'tracemalloc':
+            # Peaks of nested phases are not separated before Python 3.9 (no reset_peak)
+            getattr(tracemalloc, 'reset_peak', lambda: None)()
+
+        wall_start  = time.perf_counter()
+        cpu_start   = time.process_time()
+        extra       = dict(extra)
+        with sampler:
+            yield extra
+        wall_s      = time.perf_counter() - wall_start
+        cpu_s       = time.process_time() - cpu_start
+
+        if self.memory == 'tracemalloc':
+            peak_mb = tracemalloc.get_traced_memory()[1] / 2**20
+        elif self.memory == 'memory_profiler':
+            peak_mb = sampler.peak
+        else:
+            peak_mb = rss_peak_mb()
+
+        """ Worker time not spent in tasks (joblib IPC, pickling and idle workers) if the phase ran tasks on n_jobs workers """
+        if 'n_jobs' in extra and 'task_wall_s' in extra:
+            extra['overhead_s'] = extra['n_jobs'] * wall_s - extra['task_wall_s']
+
+        self.record(phase, experiment, group, wall_s, cpu_s, extra.pop('no_evals', no_evals), peak_mb, **extra)
+
+    def save(self, path, experiment_names=None):
+        """ Method to save the records as JSON (path + '.json') and CSV (path + '.csv')
+
+            path:               string          - path of the report without extension
+            experiment_names:   list or None    - names of the experiments, added to the records by index
+        """
+
+        records = [dict(record, experiment_name=experiment_names[record['experiment']] if (experiment_names and record['experiment'] is not None) else None)
+                   for record in self.records]
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        with open(path + '.json', 'w') as target_file:
+            json.dump({'memory_backend': self.memory, 'records': records}, target_file, indent=1)
+
+        fields = list(dict.fromkeys(key for record in records for key in record))
+        with open(path + '.csv', 'w', newline='') as target_file:
+            writer = csv.DictWriter(target_file, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(records)
+
+
+def profile_phase(profiler, phase, experiment=None, group=None, no_evals=None, **extra):
+    """ Function to profile a phase if a profiler is given
+
+        profiler:       Profiler or None    - profiler of the run, None if profiling is disabled
+        phase, ...:                         - cf. Profiler.phase
+
+        context:        context manager     - Profiler.phase, or a no-op (yielding a dict which is discarded) if profiler is None
+    """
+
+    if profiler is None:
+        return nullcontext({})
+
+    return profiler.phase(phase, experiment, group, no_evals, **extra)
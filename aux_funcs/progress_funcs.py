@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import time
+import threading
+import multiprocessing
+import numpy as np
+
+from collections import deque
+from contextlib import nullcontext
+from datetime import timedelta
+from functools import partial
+from joblib import effective_n_jobs
+
+
+""" Functions to report the progress of long simulations with an estimate of the remaining time.
+
+    The tasks to be evaluated are registered with a ProgressReporter, each with its group (experiment
+    and k/l), its estimated cost (cf. schedule_funcs.estimate_T1_cost) and the fraction of an instance
+    it covers. Workers report each finished task with its wall time through a queue of a multiprocessing
+    manager (cf. run_reported), which is consumed by a thread of the main process, hence progress is
+    reported while joblib evaluates the tasks in parallel.
+
+    The remaining time is estimated from the observed wall times: within a group from the observed time
+    per unit of estimated cost, for groups without finished tasks from the growth of the observed times
+    with the estimated cost over the groups of the same experiment (power law fitted to the groups with
+    finished tasks), and from the observed time per unit of estimated cost of all tasks otherwise.
+"""
+
+
+def run_reported(func, report, *args):
+    """ Function to run a task and report its wall time once it is finished (executed by the workers)
+
+        func:           callable        - task, e.g. schedule_funcs.T1_task
+        report:         callable        - called with the wall time of the task, cf. ProgressReporter.callback (None: no report)
+        args:           positional args - arguments of func
+
+        result:         any             - return of func
+    """
+
+    start   = time.perf_counter()
+    result  = func(*args)
+    if report is not None:
+        report(time.perf_counter() - start)
+
+    return result
+
+
+def put_report(queue, task, seconds):
+    """ Function to put the report of a finished task into a queue (cf. ProgressReporter.callback) """
+
+    queue.put((task, seconds))
+
+
+def format_seconds(seconds):
+    """ Function to format a duration as h:mm:ss (or '?' if unknown) """
+
+    return '?' if seconds is None or not np.isfinite(seconds) else str(timedelta(seconds=int(round(seconds))))
+
+
+class ProgressReporter:
+    """ Progress and ETA reporting of tasks evaluated in parallel
+
+        labels:         dict            - label per group key, e.g. {(3, 6): 'Test_2_on_20_1000_XORArbiterPUF_inst k=7'}
+        n_jobs:         int             - no. of cores evaluating the tasks, to convert the remaining work into time
+        interval:       float           - minimal no. of seconds between two progress lines
+        window:         float           - no. of seconds over which the rolling throughput is determined
+        stream:         file object     - stream the progress is written to
+    """
+
+    def __init__(self, labels=None, n_jobs=1, interval=10., window=300., stream=sys.stderr):
+        self.labels     = labels or {}
+        self.n_jobs     = effective_n_jobs(n_jobs)
+        self.interval   = interval
+        self.window     = window
+        self.stream     = stream
+
+        self.groups     = []
+        self.costs      = []
+        self.fractions  = []
+        self.seconds    = {}
+        self.group_done = {}
+        self.group_all  = {}
+        self.finished   = deque()
+        self.queue      = None
+        self.lock       = threading.Lock()
+        self.start      = None
+        self.last_print = None
+
+    def add_task(self, group, cost, fraction=1.):
+        """ Method to register a task
+
+            group:          hashable        - key of the group (e.g. (experiment, group)), cf. labels
+            cost:           float           - estimated cost of the task
+            fraction:       float           - fraction of an instance evaluated by the task (bit chunks)
+
+            task:           int             - index of the task, to be reported when finished
+        """
+
+        self.groups.append(group)
+        self.costs.append(cost)
+        self.fractions.append(fraction)
+
+        tasks, instances        = self.group_all.get(group, (0, 0.))
+        self.group_all[group]   = (tasks + 1, instances + fraction)
+
+        return len(self.groups) - 1
+
+    def callback(self, task):
+        """ Method to create the report function of a task, which can be sent to workers
+
+            task:           int             - index of the task, cf. add_task
+
+            report:         callable        - to be called with the wall time of the task once it is finished
+        """
+
+        if self.queue is None:
+            return partial(self.report, task)
+
+        return partial(put_report, self.queue, task)
+
+    def report(self, task, seconds):
+        """ Method to record a finished task and print the progress (at most once per interval and when a group is finished)
+
+            task:           int             - index of the task, cf. add_task
+            seconds:        float           - wall time of the task
+        """
+
+        with self.lock:
+            self.seconds[task] = seconds
+            now = time.perf_counter()
+            self.finished.append((now, self.fractions[task]))
+            while self.finished and self.finished[0][0] < now - self.window:
+                self.finished.popleft()
+
+            group                   = self.groups[task]
+            tasks, instances        = self.group_done.get(group, (0, 0.))
+            self.group_done[group]  = (tasks + 1, instances + self.fractions[task])
+            group_finished          = self.group_done[group][0] == self.group_all[group][0]
+
+            if group_finished or self.last_print is None or now - self.last_print >= self.interval or len(self.seconds) == len(self.groups):
+                self.print_progress(group, group_finished, now)
+                self.last_print = now
+
+    def predict_seconds(self):
+        """ Method to predict the wall times of all unfinished tasks
+
+            predicted:      dict            - predicted wall time per unfinished task (NaN if no task is finished yet)
+        """
+
+        observed = {}
+        for t, seconds in self.seconds.items():
+            observed.setdefault(self.groups[t], []).append((self.costs[t], seconds))
+
+        """ Observed time per unit of estimated cost per group and in total """
+        rate_group  = {group: sum(s for _, s in obs) / max(sum(c for c, _ in obs), 1e-12) for group, obs in observed.items()}
+        rate_all    = sum(self.seconds.values()) / max(sum(self.costs[t] for t in self.seconds), 1e-12) if self.seconds else np.nan
+
+        """ Growth of the observed times with the estimated cost over the groups of an experiment (groups keyed (e, g)) """
+        growth = {}
+        for group, rate in rate_group.items():
+            if isinstance(group, tuple):
+                mean_cost = np.mean([c for c, _ in observed[group]])
+                growth.setdefault(group[0], []).append((mean_cost, rate * mean_cost))
+
+        fits = {}
+        for experiment, points in growth.items():
+            costs, seconds = np.log([max(c, 1e-12) for c, _ in points]), np.log([max(s, 1e-12) for _, s in points])
+            if len(set(costs)) >= 2:
+                exponent, offset = np.polyfit(costs, seconds, 1)
+            else:
+                exponent, offset = 1., np.mean(seconds - costs)
+            fits[experiment] = (exponent, offset)
+
+        predicted = {}
+        for t, (group, cost) in enumerate(zip(self.groups, self.costs)):
+            if t in self.seconds:
+                continue
+            if group in rate_group:
+                predicted[t] = rate_group[group] * cost
+            elif isinstance(group, tuple) and group[0] in fits:
+                exponent, offset = fits[group[0]]
+                predicted[t] = np.exp(offset + exponent * np.log(max(cost, 1e-12)))
+            else:
+                predicted[t] = rate_all * cost
+
+        return predicted
+
+    def print_progress(self, group, group_finished, now):
+        """ Method to print a progress line for the group of the last finished task and the whole run """
+
+        done, total = self.group_done[group][1], self.group_all[group][1]
+        elapsed     = now - self.start if self.start is not None else np.nan
+        window      = min(self.window, elapsed) if np.isfinite(elapsed) else self.window
+        throughput  = sum(fraction for _, fraction in self.finished) / max(window, 1e-12)
+        remaining   = sum(self.predict_seconds().values()) / self.n_jobs
+
+        label = self.labels.get(group, str(group))
+        state = 'done' if group_finished else 'running'
+        print(f'[{format_seconds(elapsed)}] {label}: {int(done + 1e-9)}/{int(round(total))} instances ({state}) | '
+              f'tasks {len(self.seconds)}/{len(self.groups)} | {60 * throughput:.1f} instances/min | '
+              f'ETA {format_seconds(remaining)}', file=self.stream, flush=True)
+
+    def consume(self):
+        """ Method of the consumer thread, recording the reports put into the queue by the workers """
+
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            self.report(*item)
+
+    def __enter__(self):
+        """ Start of the evaluation: the manager queue and its consumer thread are only created for parallel evaluation """
+
+        self.start = time.perf_counter()
+        self.queue = None
+
+        if self.n_jobs > 1:
+            self.manager    = multiprocessing.Manager()
+            self.queue      = self.manager.Queue()
+            self.thread     = threading.Thread(target=self.consume, daemon=True)
+            self.thread.start()
+
+        return self
+
+    def __exit__(self, *exc):
+        if self.queue is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.manager.shutdown()
+            self.queue = None
+
+
+def progress_context(progress):
+    """ Function to enter a progress reporter if one is given
+
+        progress:       ProgressReporter or None
+
+        context:        context manager - the reporter itself, or a no-op
+    """
+
+    return progress if progress is not None else nullcontext()
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import time
+import pickle
+import tempfile
+import numpy as np
+
+from joblib import Parallel, delayed, effective_n_jobs
+
+from aux_funcs.simulation_funcs import det_no_resp_flips_all, select_T1_engine, T1_1_bflip_1_inst_adaptive, T2_from_T1_results
+from aux_funcs.challenge_funcs import share_challenges, load_challenges
+from aux_funcs.spec_funcs import build_puf_instance, is_puf_spec, spec_key
+from aux_funcs.storage_funcs import shard_path, shard_key, shard_matches, save_shard, load_shard, challenge_digest, cache_key, cache_get, cache_put, cache_evict
+from aux_funcs.profile_funcs import profile_phase, rss_peak_mb
+from aux_funcs.progress_funcs import run_reported, progress_context
+
+
+""" Functions to schedule Test 2 on several experiments at once.
+
+    An experiment is a list of groups (e.g. one group per k or l), each group a list of PUF
+    instances. All (experiment, group, instance, bit-chunk) tasks are flattened into a single
+    queue, ordered by their estimated cost (longest first), and evaluated by one pool of
+    workers. Hence no core waits at a barrier between the groups or experiments.
+    
+    Instances may be given by their specs (cf. spec_funcs), which are sent to the workers instead
+    of the instances, and challenge arrays are stored once in a file memory-mapped by all workers.
+    Instances with identical specs (e.g. the 8 Arbiter PUFs of #01 among the 1-XOR Arbiter PUFs of #04)
+    are evaluated once, and their results are used for all experiments containing them.
+"""
+
+
+def estimate_T1_cost(puf_instance, engine='auto'):
+    """ Function to estimate the relative cost of Test 1 on a PUF instance per challenge
+
+        puf_instance:   puf object      - from pypuf
+        engine:         string          - engine name, cf. simulation_funcs.T1_1_bflip_1_inst
+
+        cost:           float           - estimated cost in multiply-adds per challenge
+    """
+
+    if engine == 'auto':
+        engine = select_T1_engine(puf_instance)
+
+    no_bits     = puf_instance.challenge_length
+    no_chains   = puf_instance.weight_array.shape[0]
+    no_stages   = puf_instance.weight_array.shape[1] - 1
+
+    """ The closed forms need a single pass over all stages, re-evaluation one per flipped bit. """
+    if engine in ['cumsum', 'br']:
+        return no_chains * no_stages
+
+    """ Prefix reuse resumes each flipped challenge at its stage, i.e. after half the stages on average. """
+    if engine == 'ff':
+        return (no_bits / 2 + 1) * no_chains * no_stages
+
+    return (no_bits + 1) * no_chains * no_stages
+
+
+def split_bits(no_bits, bit_chunks):
+    """ Function to split the bit positions into contiguous chunks of (almost) equal size
+
+        no_bits:        int             - challenge length n
+        bit_chunks:     int             - number of chunks
+
+        bits_chunks:    list of lists   - bit positions per chunk
+    """
+
+    return [list(bits) for bits in np.array_split(np.arange(no_bits), min(bit_chunks, no_bits))]
+
+
+def T1_task(puf_instance, challenges, bits, engine='auto', tol=None, target='S_j', path=None, key=None, profile=False):
+    """ Function to evaluate a single task, i.e. Test 1 on one instance for a chunk of bit positions
+
+        puf_instance:   puf object      - from pypuf
+                        dict            - or its spec, cf. spec_funcs.puf_spec
+        challenges:     numpy.ndarray   - challenges, cf. simulation_funcs.T1_1_bflip_1_inst
+                        ChallengeStream
+                        ChallengeFile   - or a handle of shared challenges, cf. challenge_funcs.share_challenges
+        bits:           list of int     - bit positions to be examined
+        engine:         string          - engine name, cf. simulation_funcs.T1_1_bflip_1_inst
+        tol:            float or None   - if given, sequential sampling (all bits at once, cf. T1_1_bflip_1_inst_adaptive)
+        target:         string          - target of the sequential sampling
+        path:           string or None  - if given, the result is additionally stored in this shard file (cf. storage_funcs)
+        key:            string or None  - key of the task stored in the shard, cf. storage_funcs.shard_key
+        profile:        bool            - if True, the timings of the task are returned as well
+
+        S_i_part:       numpy.ndarray   - estimated S_j(P)s for the bit positions in bits
+        no_Cs:          int             - number of challenges used
+        timings:        dict            - only if profile, wall times of the instance construction ('build_s'), challenge
+                                          loading ('load_s') and evaluation ('eval_s'), CPU time ('cpu_s') and peak RSS
+                                          ('worker_peak_mb') of the worker
+    """
+
+    wall_start      = time.perf_counter()
+    cpu_start       = time.process_time()
+
+    puf_instance    = build_puf_instance(puf_instance)
+    build_end       = time.perf_counter()
+    challenges      = load_challenges(challenges)
+    load_end        = time.perf_counter()
+
+    if tol is not None:
+        S_i_arr, _, no_Cs = T1_1_bflip_1_inst_adaptive(puf_instance, challenges, tol, target, engine=engine)
+        S_i_part = S_i_arr[bits]
+    else:
+        no_Cs    = challenges.shape[0]
+        S_i_part = det_no_resp_flips_all(puf_instance, challenges, engine, bits=bits) / no_Cs
+
+    if path is not None:
+        save_shard(path, S_i_part, no_Cs, key)
+
+    if profile:
+        timings = {'build_s': build_end - wall_start, 'load_s': load_end - build_end, 'eval_s': time.perf_counter() - load_end,
+                   'cpu_s': time.process_time() - cpu_start, 'worker_peak_mb': rss_peak_mb()}
+        return S_i_part, no_Cs, timings
+
+    return S_i_part, no_Cs
+
+
+def record_task_timings(profiler, phase_record, tasks, results, task_bytes):
+    """ Function to record the timings reported by the tasks (cf. T1_task), summed per experiment and group
+
+        profiler:       Profiler        - profiler of the run (cf. profile_funcs)
+        phase_record:   dict            - record of the parallel evaluation phase, to which the total number of
+                                          evaluations and the time of the workers not spent in tasks are added
+        tasks:          list of tuples  - evaluated tasks (experiment, group, instance, bits)
+        results:        list of tuples  - returns of T1_task with profile=True, in the order of tasks
+        task_bytes:     list of int     - sizes of the pickled arguments (instance or spec, challenges) of the tasks
+    """
+
+    groups = {}
+    for (e, g, _, bits), (_, no_Cs, timings), no_bytes in zip(tasks, results, task_bytes):
+        group = groups.setdefault((e, g), {'tasks': 0, 'no_evals': 0, 'build_s': 0., 'load_s': 0., 'eval_s': 0., 'cpu_s': 0.,
+                                           'worker_peak_mb': 0., 'task_bytes': 0})
+        group['tasks']          += 1
+        group['no_evals']       += no_Cs * (len(bits) + 1)
+        group['build_s']        += timings['build_s']
+        group['load_s']         += timings['load_s']
+        group['eval_s']         += timings['eval_s']
+        group['cpu_s']          += timings['cpu_s']
+        group['worker_peak_mb'] = max(group['worker_peak_mb'], timings['worker_peak_mb'])
+        group['task_bytes']     += no_bytes
+
+    for (e, g), group in sorted(groups.items()):
+        wall_s = group['build_s'] + group['load_s'] + group['eval_s']
+        profiler.record('tasks', e, g, wall_s, group.pop('cpu_s'), group.pop('no_evals'), group.pop('worker_peak_mb'), **group)
+
+    """ Total evaluations and wall time of the tasks, cf. Profiler.phase for the overhead """
+    phase_record['no_evals']    = sum(no_Cs * (len(bits) + 1) for (_, _, _, bits), (_, no_Cs, _) in zip(tasks, results))
+    phase_record['task_wall_s'] = sum(sum(timings[key] for key in ['build_s', 'load_s', 'eval_s']) for _, _, timings in results)
+
+
+def T2_1_bflip_sched(experiments, challenges, n_jobs=1, engine='auto', bit_chunks=1, tol=None, target='S_j', shard_dirs=None, resume=False, cache_dir=None, cache_max_bytes=None, profiler=None, progress=None):
+    """ Function to implement Test 2 on all groups of instances of several experiments with
+        a single, cost-ordered task queue
+
+        experiments:    list of lists of lists of puf objects - experiments, their groups (e.g. in k/l) and instances
+                                          (or specs of the instances, cf. spec_funcs.puf_spec)
+        challenges:     numpy.ndarray   - challenges, cf. simulation_funcs.T1_1_bflip_1_inst
+                        ChallengeStream
+        n_jobs:         int             - no. of cores used
+        engine:         string          - engine name, cf. simulation_funcs.T1_1_bflip_1_inst
+        bit_chunks:     int             - number of tasks the bit positions of an instance are split into
+                                          (ignored for the engines 'cumsum' and 'br' and for sequential sampling)
+        tol:            float or None   - if given, sequential sampling per instance, cf. T1_1_bflip_1_inst_adaptive
+        target:         string          - target of the sequential sampling
+        shard_dirs:     list of strings - if given, one directory per experiment in which the result of each task is
+                                          stored as a shard as soon as it is finished (cf. storage_funcs)
+        resume:         bool            - if True, tasks whose shards exist already and hold the result of the same
+                                          task (cf. storage_funcs.shard_key) are loaded instead of evaluated
+        cache_dir:      string or None  - if given, directory of the result cache: instances found in the cache are not
+                                          evaluated, the results of all others are added (cf. storage_funcs.cache_key)
+        cache_max_bytes: int or None    - if given, the least recently used cache entries are evicted beyond this size
+        profiler:       Profiler or None - if given, the phases of the scheduler and the timings of the tasks per group
+                                          are recorded (cf. profile_funcs)
+        progress:       ProgressReporter or None - if given, the tasks are registered with the groups (e, g) and reported
+                                          once finished (cf. progress_funcs)
+
+        Test_2_exps:    list of lists of tuples - per experiment and group the return of simulation_funcs.T2_1_bflip_r_inst
+        no_Cs_exps:     list of lists of lists  - per experiment and group the numbers of challenges used per instance
+    """
+
+    """ Instances given by their specs are constructed locally for the cost estimates and cache keys only """
+    with profile_phase(profiler, 'instances'):
+        built = [[[build_puf_instance(instance) for instance in instances] for instances in groups] for groups in experiments]
+
+    """ Instances given by identical specs are evaluated once, duplicates map to their first occurrence """
+    first       = {}
+    duplicates  = {}
+    for e, groups in enumerate(experiments):
+        for g, instances in enumerate(groups):
+            for i, instance in enumerate(instances):
+                if is_puf_spec(instance):
+                    origin = first.setdefault(spec_key(instance), (e, g, i))
+                    if origin != (e, g, i):
+                        duplicates[(e, g, i)] = origin
+
+    """ Look up the instances in the cache """
+    keys = {}
+    hits = {}
+    with profile_phase(profiler if cache_dir is not None else None, 'cache_lookup'):
+        if cache_dir is not None or shard_dirs is not None:
+            challenges_digest = challenge_digest(challenges)
+        if cache_dir is not None:
+            for e, groups in enumerate(built):
+                for g, instances in enumerate(groups):
+                    for i, instance in enumerate(instances):
+                        if (e, g, i) in duplicates:
+                            continue
+                        keys[(e, g, i)] = cache_key(instance, challenges_digest, tol, target)
+                        hit = cache_get(cache_dir, keys[(e, g, i)])
+                        if hit is not None:
+                            hits[(e, g, i)] = hit
+
+    """ Flatten all experiments into tasks (experiment, group, instance, bits) with their estimated costs """
+    tasks = []
+    costs = []
+    for e, groups in enumerate(built):
+        for g, instances in enumerate(groups):
+            for i, instance in enumerate(instances):
+                if (e, g, i) in hits or (e, g, i) in duplicates:
+                    continue
+
+                inst_engine = select_T1_engine(instance) if engine == 'auto' else engine
+                inst_cost   = estimate_T1_cost(instance, inst_engine)
+                no_chunks   = 1 if (inst_engine in ['cumsum', 'br'] or tol is not None) else bit_chunks
+
+                for bits in split_bits(instance.challenge_length, no_chunks):
+                    tasks.append((e, g, i, bits))
+                    costs.append(inst_cost * len(bits) / instance.challenge_length)
+
+    paths       = [None] * len(tasks)
+    shard_keys  = [None] * len(tasks)
+    if shard_dirs is not None:
+        paths       = [shard_path(shard_dirs[e], g, i, bits) for e, g, i, bits in tasks]
+        shard_keys  = [shard_key(built[e][g][i], challenges_digest, bits, tol, target) for e, g, i, bits in tasks]
+
+    """ Load the finished tasks when resuming, evaluate the others with the longest processing time first """
+    done  = [t for t in range(len(tasks)) if resume and paths[t] is not None and shard_matches(paths[t], shard_keys[t])]
+    todo  = sorted(set(range(len(tasks))) - set(done), key=lambda t: costs[t], reverse=True)
+
+    task_ids = {}
+    if progress is not None:
+        for t in todo:
+            e, g, i, bits = tasks[t]
+            task_ids[t] = progress.add_task((e, g), costs[t], len(bits) / built[e][g][i].challenge_length)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        """ Store challenge arrays once to be memory-mapped by the workers instead of sending them with each task """
+        challenges_tasks = challenges
+        if isinstance(challenges, np.ndarray) and n_jobs != 1 and todo:
+            challenges_tasks = share_challenges(challenges, os.path.join(tmp_dir, 'challenges.npy'))
+
+        with profile_phase(profiler, 'evaluation', tasks=len(todo), n_jobs=effective_n_jobs(n_jobs)) as phase_record, progress_context(progress):
+            results = Parallel(n_jobs=n_jobs)(delayed(run_reported)(T1_task, progress.callback(task_ids[t]) if progress is not None else None,
+                                                                    experiments[tasks[t][0]][tasks[t][1]][tasks[t][2]], challenges_tasks, tasks[t][3], engine, tol, target, paths[t], shard_keys[t], profiler is not None)
+                                              for t in todo)
+
+            if profiler is not None:
+                """ Arguments are only pickled when sent to workers """
+                task_bytes = [len(pickle.dumps((experiments[tasks[t][0]][tasks[t][1]][tasks[t][2]], challenges_tasks))) if effective_n_jobs(n_jobs) > 1 else 0
+                              for t in todo]
+                record_task_timings(profiler, phase_record, [tasks[t] for t in todo], results, task_bytes)
+                results = [(S_i_part, no_Cs) for S_i_part, no_Cs, _ in results]
+    results = [load_shard(paths[t]) for t in done] + results
+
+    """ Reassemble the bit chunks per instance, then the instances per group """
+    S_i_parts = {inst: [(0, S_i_arr)] for inst, (S_i_arr, _) in hits.items()}
+    no_Cs_all = {inst: no_Cs for inst, (_, no_Cs) in hits.items()}
+    for t, (S_i_part, no_Cs) in zip(done + todo, results):
+        e, g, i, bits = tasks[t]
+        S_i_parts.setdefault((e, g, i), []).append((bits[0], S_i_part))
+        no_Cs_all[(e, g, i)] = no_Cs
+    for inst, origin in duplicates.items():
+        S_i_parts[inst] = S_i_parts[origin]
+        no_Cs_all[inst] = no_Cs_all[origin]
+
+    Test_2_exps = []
+    no_Cs_exps  = []
+    for e, groups in enumerate(experiments):
+        Test_2_groups = []
+        no_Cs_groups  = []
+        for g, instances in enumerate(groups):
+            S_i_r = [np.concatenate([S_i_part for _, S_i_part in sorted(S_i_parts[(e, g, i)], key=lambda x: x[0])]) for i in range(len(instances))]
+            I2O_1_r = [np.average(np.abs(S_i_arr - 0.5)) for S_i_arr in S_i_r]
+
+            Test_2_groups.append(T2_from_T1_results(S_i_r, I2O_1_r))
+            no_Cs_groups.append([no_Cs_all[(e, g, i)] for i in range(len(instances))])
+            
+            if cache_dir is not None:
+                for i in range(len(instances)):
+                    if (e, g, i) not in hits and (e, g, i) not in duplicates:
+                        cache_put(cache_dir, keys[(e, g, i)], S_i_r[i], no_Cs_all[(e, g, i)])
+
+        Test_2_exps.append(Test_2_groups)
+        no_Cs_exps.append(no_Cs_groups)
+
+    if cache_dir is not None and cache_max_bytes is not None:
+        cache_evict(cache_dir, cache_max_bytes)
+
+    return Test_2_exps, no_Cs_exps
@@ -5,13 +5,28 @@ import copy
 import numpy as np
 
 from collections import Counter
+from statistics import NormalDist
 from joblib import Parallel, delayed
 
+from pypuf.simulation import XORArbiterPUF, XORBistableRingPUF, FeedForwardArbiterPUF
+from pypuf.simulation.base import LTFArray
+
+from aux_funcs.bitpack_funcs import is_packed, unpack_challenges, flip_mask, pack_responses, popcount
+from aux_funcs.challenge_funcs import ChallengeStream, iter_challenge_chunks
+from aux_funcs.progress_funcs import run_reported, progress_context
+from aux_funcs.index_funcs import T2PrefixIndex
+
 
 """ Functions to implement Tests 1 and 2
 """
 
 
+""" Version of the Test 1 estimators, part of the keys of cached results (cf. storage_funcs.cache_key).
+    To be increased whenever a change of the engines alters their results.
+"""
+ENGINE_VERSION = 1
+
+
 def det_no_resp_flips(puf_instance, responses, challenges, flip_pos):
     """ Function to determine how many response bits are flipped when the challenge
         bits at the positions in flip_pos are flipped
@@ -52,35 +67,618 @@ def det_no_resp_flips(puf_instance, responses, challenges, flip_pos):
     return no_resp_flips
 
 
-def T1_1_bflip_1_inst(puf_instance, challenges):
+def det_resp_flips_batch(puf_instance, responses, challenges, flip_pos_list, max_rows=2**16, slab_bytes=2**23):
+    """ Function to determine for a whole list of flip positions at once which response
+        bits are flipped. Instead of copying and evaluating the challenges once per entry
+        of flip_pos_list, the flipped variants of a chunk of challenges are stacked into
+        slabs, each evaluated with a single eval call. The slabs are sized by the memory of
+        the features evaluated by pypuf (about slab_bytes, i.e. cache-sized), such that at
+        small N many variants and at large N (e.g. N = 100000) several variants of a chunk of
+        the challenges are stacked per slab.
+        
+        puf_instance:   puf object      - from pypuf
+        responses:      numpy.ndarray   - initial evaluation results
+        challenges:     numpy.ndarray   - all initial challenges (e.g. generated with pypuf.io.random_inputs)
+        flip_pos_list:  list of lists   - one list of positions of bits to be flipped per variant (cf. det_no_resp_flips)
+        max_rows:       int             - maximal number of stacked challenge rows evaluated per eval call
+        slab_bytes:     int             - memory budget of the features of a slab, i.e. rows * k * (n+1) * 8 bytes
+        
+        resp_flips:     numpy.ndarray   - boolean array of shape (len(flip_pos_list), N), True where the response flipped
+    """
+    
+    no_Cs       = challenges.shape[0]
+    no_vars     = len(flip_pos_list)
+    row_bytes   = 8 * np.prod(np.shape(getattr(puf_instance, 'weight_array', challenges[:1])))
+    slab_rows   = max(1, min(max_rows, slab_bytes // max(1, row_bytes)))
+    chunk       = max(1, min(no_Cs, slab_rows))
+    vars_slab   = max(1, slab_rows // chunk)
+    
+    """ Remove even number of flips from the flip_pos lists, retain uneven ones. """
+    flip_pos_rems = [[flip for flip, count in Counter(flip_pos).items() if count%2 != 0] for flip_pos in flip_pos_list]
+    
+    resp_flips  = np.empty((no_vars, no_Cs), dtype=bool)
+    
+    for c_start in range(0, no_Cs, chunk):
+        challenges_chunk    = challenges[c_start:c_start+chunk]
+        no_Cs_chunk         = challenges_chunk.shape[0]
+        
+        for start in range(0, no_vars, vars_slab):
+            slab_flips = flip_pos_rems[start:start+vars_slab]
+            
+            """ Stack len(slab_flips) copies of the challenge chunk, the s-th copy occupying rows s*chunk to (s+1)*chunk """
+            challenges_flipped = np.tile(challenges_chunk, (len(slab_flips), 1))
+            for s, flip_pos_rem in enumerate(slab_flips):
+                challenges_flipped[s*no_Cs_chunk:(s+1)*no_Cs_chunk, flip_pos_rem] *= -1
+            
+            responses_flipped = puf_instance.eval(challenges_flipped).reshape(len(slab_flips), no_Cs_chunk)
+            
+            resp_flips[start:start+len(slab_flips), c_start:c_start+no_Cs_chunk] = responses_flipped != responses[c_start:c_start+no_Cs_chunk]
+    
+    return resp_flips
+
+
+def det_chain_flips_xor_arbiter(puf_instance, challenges):
+    """ Function to determine for all challenge bit positions at once which arbiter chains of a
+        noise-free (XOR) Arbiter PUF change their sign, without re-evaluating the PUF.
+        
+        In the additive delay model chain l has the delay difference
+            D_l(c) = sum_i w_li * Phi_i(c) + b_l,   Phi_i(c) = prod_{m >= i} c_m,
+        and flipping challenge bit j negates exactly Phi_0, ..., Phi_j. With the prefix sums
+        P_lj = sum_{i <= j} w_li * Phi_i(c) the flipped delay difference is D_l(c) - 2 * P_lj,
+        so one cumulative sum per chain yields all n flipped delays.
+        
+        puf_instance:   puf object      - pypuf XORArbiterPUF (noisiness 0, default input transformation)
+        challenges:     numpy.ndarray   - initial challenges (all processed at once)
+        
+        chain_flips:    numpy.ndarray   - boolean array of shape (N, k, n), True where chain l changed its sign
+    """
+    
+    weights = puf_instance.weight_array
+    
+    """ Phi_i = prod_{m >= i} c_m, i.e. the reversed cumulative product of the challenge bits """
+    features    = np.cumprod(challenges[:, ::-1], axis=1, dtype=np.int8)[:, ::-1]
+    
+    """ Prefix sums P_lj of shape (N, k, n) and the unflipped delay differences of shape (N, k) """
+    prefix      = np.cumsum(features[:, np.newaxis, :] * weights[np.newaxis, :, :-1], axis=2)
+    delay       = prefix[:, :, -1] + weights[:, -1]
+    
+    return (delay[:, :, np.newaxis] > 0) != (delay[:, :, np.newaxis] - 2 * prefix > 0)
+
+
+def det_resp_flips_xor_arbiter(puf_instance, challenges, max_rows=2**16):
+    """ Function to determine for all challenge bit positions at once which response bits
+        of a noise-free (XOR) Arbiter PUF are flipped, without re-evaluating the PUF.
+        The XORed response flips iff an odd number of chains change their sign (cf. det_chain_flips_xor_arbiter).
+        
+        puf_instance:   puf object      - pypuf XORArbiterPUF (noisiness 0, default input transformation)
+        challenges:     numpy.ndarray   - all initial challenges (e.g. generated with pypuf.io.random_inputs)
+        max_rows:       int             - maximal number of (challenge, chain) rows processed at once
+        
+        resp_flips:     numpy.ndarray   - boolean array of shape (n, N), True where the response flipped
+    """
+    
+    weights = puf_instance.weight_array
+    no_Cs   = challenges.shape[0]
+    k       = weights.shape[0]
+    chunk   = max(1, max_rows // k)
+    
+    resp_flips = np.empty((weights.shape[1]-1, no_Cs), dtype=bool)
+    
+    for start in range(0, no_Cs, chunk):
+        chain_flips = det_chain_flips_xor_arbiter(puf_instance, challenges[start:start+chunk])
+        
+        resp_flips[:, start:start+chunk] = np.logical_xor.reduce(chain_flips, axis=1).T
+    
+    return resp_flips
+
+
+def eval_xor_br(puf_instance, challenges):
+    """ Function to evaluate a (XOR) Bistable Ring PUF with NumPy broadcasting, equivalent to
+        puf_instance.eval(challenges) of pypuf. Each ring is modelled by the linear threshold
+        function D_l(c) = <w_l, c> + b_l, the response is the sign of the product of all D_l.
+        
+        puf_instance:   puf object      - pypuf XORBistableRingPUF
+        challenges:     numpy.ndarray   - challenges of shape (N, n) (all processed at once)
+        
+        responses:      numpy.ndarray   - responses of shape (N,) with the dtype of the challenges
+    """
+    
+    weights = puf_instance.weight_array
+    delay   = challenges @ weights[:, :-1].T + weights[:, -1]
+    
+    return np.sign(np.prod(delay, axis=1)).astype(challenges.dtype)
+
+
+def det_chain_flips_xor_br(puf_instance, challenges):
+    """ Function to determine for all challenge bit positions at once which rings of a (XOR)
+        Bistable Ring PUF change their sign, without re-evaluating the PUF.
+        
+        Flipping challenge bit j changes D_l(c) = <w_l, c> + b_l by -2 * w_lj * c_j only, hence all
+        n flipped values of ring l follow from D_l(c) by broadcasting.
+        
+        puf_instance:   puf object      - pypuf XORBistableRingPUF
+        challenges:     numpy.ndarray   - initial challenges (all processed at once)
+        
+        chain_flips:    numpy.ndarray   - boolean array of shape (N, k, n), True where ring l changed its sign
+    """
+    
+    weights = puf_instance.weight_array
+    delay   = challenges @ weights[:, :-1].T + weights[:, -1]
+    
+    delay_flipped = delay[:, :, np.newaxis] - 2 * weights[np.newaxis, :, :-1] * challenges[:, np.newaxis, :]
+    
+    return (delay[:, :, np.newaxis] > 0) != (delay_flipped > 0)
+
+
+def det_resp_flips_xor_br(puf_instance, challenges, max_rows=2**16):
+    """ Function to determine for all challenge bit positions at once which response bits of a
+        (XOR) Bistable Ring PUF are flipped, i.e. where an odd number of rings change their sign
+        (cf. det_chain_flips_xor_br).
+        
+        puf_instance:   puf object      - pypuf XORBistableRingPUF
+        challenges:     numpy.ndarray   - all initial challenges (e.g. generated with pypuf.io.random_inputs)
+        max_rows:       int             - maximal number of (challenge, ring) rows processed at once
+        
+        resp_flips:     numpy.ndarray   - boolean array of shape (n, N), True where the response flipped
+    """
+    
+    no_Cs   = challenges.shape[0]
+    k       = puf_instance.weight_array.shape[0]
+    chunk   = max(1, max_rows // k)
+    
+    resp_flips = np.empty((puf_instance.challenge_length, no_Cs), dtype=bool)
+    
+    for start in range(0, no_Cs, chunk):
+        chain_flips = det_chain_flips_xor_br(puf_instance, challenges[start:start+chunk])
+        
+        resp_flips[:, start:start+chunk] = np.logical_xor.reduce(chain_flips, axis=1).T
+    
+    return resp_flips
+
+
+def validate_xor_br(puf_instance, challenges, bits=None):
+    """ Function to validate the vectorized Bistable Ring PUF evaluation against pypuf on the same
+        challenges, both for the responses and for the response flips of the given bit positions
+        
+        puf_instance:   puf object      - pypuf XORBistableRingPUF
+        challenges:     numpy.ndarray   - challenges of shape (N, n)
+        bits:           list of int     - bit positions to be compared, by default all n
+        
+        valid:          bool            - True iff all responses and response flips agree
+    """
+    
+    bits        = list(range(puf_instance.challenge_length)) if bits is None else list(bits)
+    responses   = puf_instance.eval(challenges)
+    
+    if not np.array_equal(eval_xor_br(puf_instance, challenges), responses):
+        return False
+    
+    resp_flips  = det_resp_flips_batch(puf_instance, responses, challenges, [[i] for i in bits])
+    
+    return np.array_equal(det_resp_flips_xor_br(puf_instance, challenges)[bits], resp_flips)
+
+
+def ff_arbiter_sections(puf_instance):
+    """ Function to determine the sections of a Feed-Forward Arbiter PUF as simulated by pypuf:
+        the stages are split at the arbiter points (sorted), the sign of the delay difference at the
+        end of a section is inserted as the challenge bit of the feed point of its loop.
+        
+        puf_instance:   puf object      - pypuf FeedForwardArbiterPUF
+        
+        sections:       list of tuples  - (start, arbiter point, feed point or None) per section (possibly empty)
+        stage_of_bit:   list of int     - stage of each of the n challenge bits
+    """
+    
+    no_bits     = puf_instance.challenge_length
+    ff          = sorted(puf_instance.ff, key=lambda loop: loop[0])
+    no_stages   = no_bits + len(ff)
+    feed_points = {feed_point for _, feed_point in ff}
+    
+    sections = []
+    start    = 0
+    for arbiter_point, feed_point in ff + [(no_stages, None)]:
+        sections.append((start, arbiter_point, feed_point))
+        start = arbiter_point
+    
+    stage_of_bit = [i for i in range(no_stages) if i not in feed_points]
+    
+    return sections, stage_of_bit
+
+
+def eval_ff_arbiter_sections(puf_instance, section_pufs, sections, ff_challenges, delay_difference, first_section=0):
+    """ Function to continue the simulation of a Feed-Forward Arbiter PUF from the start of a section,
+        with the same arithmetic as pypuf (FeedForwardArbiterPUF.val). The feed points in ff_challenges
+        are overwritten in place once their arbiter points are reached.
+        
+        puf_instance:       puf object      - pypuf FeedForwardArbiterPUF
+        section_pufs:       list            - LTFArray per section with the weights of its stages
+        sections:           list of tuples  - sections, cf. ff_arbiter_sections
+        ff_challenges:      numpy.ndarray   - float array of shape (N, n + no. of loops), challenge bits per stage
+        delay_difference:   numpy.ndarray   - delay differences of shape (N,) at the start of first_section
+        first_section:      int             - index of the section to start with
+        
+        delay_difference:   numpy.ndarray   - delay differences of shape (N,) at the final arbiter
+        section_delays:     list of arrays  - delay differences at the start of each section from first_section on
+    """
+    
+    section_delays = []
+    for (start, arbiter_point, feed_point), section_puf in zip(sections[first_section:], section_pufs[first_section:]):
+        section_delays.append(delay_difference)
+        
+        ff_challenges_section = ff_challenges[:, start:arbiter_point]
+        
+        delay_difference = delay_difference * np.prod(ff_challenges_section, axis=1)
+        delay_difference = delay_difference + section_puf.ltf_eval(puf_instance.transform(ff_challenges_section, 1))[:, 0]
+        
+        if feed_point:
+            ff_challenges[:, feed_point] = np.sign(delay_difference)
+    
+    return delay_difference, section_delays
+
+
+def det_resp_flips_ff_arbiter(puf_instance, challenges, max_rows=2**16, bits=None):
+    """ Function to determine for challenge bit positions which response bits of a noise-free
+        Feed-Forward Arbiter PUF are flipped, reusing the simulation of the unflipped challenges.
+        
+        Flipping challenge bit j cannot change any section before the one containing its stage.
+        Hence the unflipped challenges are simulated once, caching the delay differences at the
+        start of each section and the feed-forward bits, and the flipped variants of all bits of a
+        section are stacked and resumed from that section. Repeated arbiter points (empty sections)
+        and overlapping loops, e.g. from produce_loop_structure, are handled as in pypuf.
+        
+        puf_instance:   puf object      - pypuf FeedForwardArbiterPUF (noisiness 0, default input transformation)
+        challenges:     numpy.ndarray   - all initial challenges (e.g. generated with pypuf.io.random_inputs)
+        max_rows:       int             - maximal number of stacked (challenge, variant) rows processed at once
+        bits:           list of int     - bit positions to be examined, by default all n
+        
+        resp_flips:     numpy.ndarray   - boolean array of shape (len(bits), N), True where the response flipped
+    """
+    
+    no_bits = puf_instance.challenge_length
+    no_Cs   = challenges.shape[0]
+    bits    = list(range(no_bits)) if bits is None else list(bits)
+    chunk   = max(1, max_rows // max(1, len(bits)))
+    
+    sections, stage_of_bit = ff_arbiter_sections(puf_instance)
+    section_pufs = [LTFArray(weight_array=puf_instance.weight_array[:, start:arbiter_point], transform=puf_instance.transform, combiner=puf_instance.combiner)
+                    for start, arbiter_point, _ in sections]
+    
+    """ Group the bit positions by the section containing their stage """
+    bits_in_section = {}
+    for b, bit in enumerate(bits):
+        q = max(q for q, (start, _, _) in enumerate(sections) if start <= stage_of_bit[bit])
+        bits_in_section.setdefault(q, []).append((b, stage_of_bit[bit]))
+    
+    resp_flips = np.empty((len(bits), no_Cs), dtype=bool)
+    
+    for start_Cs in range(0, no_Cs, chunk):
+        challenges_chunk = challenges[start_Cs:start_Cs+chunk]
+        no_Cs_chunk      = challenges_chunk.shape[0]
+        
+        ff_challenges = np.zeros(shape=(no_Cs_chunk, len(stage_of_bit) + len(sections) - 1))
+        ff_challenges[:, stage_of_bit] = challenges_chunk
+        
+        delay_difference, section_delays = eval_ff_arbiter_sections(puf_instance, section_pufs, sections, ff_challenges, np.zeros(shape=(no_Cs_chunk,)))
+        responses = np.sign(delay_difference)
+        
+        for q, bits_q in bits_in_section.items():
+            """ Stack one copy of the chunk per bit of the section, the v-th copy with the stage of the v-th bit flipped """
+            ff_challenges_flipped = np.tile(ff_challenges, (len(bits_q), 1))
+            for v, (_, stage) in enumerate(bits_q):
+                ff_challenges_flipped[v*no_Cs_chunk:(v+1)*no_Cs_chunk, stage] *= -1
+            
+            delay_flipped, _ = eval_ff_arbiter_sections(puf_instance, section_pufs, sections, ff_challenges_flipped, np.tile(section_delays[q], len(bits_q)), q)
+            
+            flips = (np.sign(delay_flipped).reshape(len(bits_q), no_Cs_chunk) != responses)
+            for v, (b, _) in enumerate(bits_q):
+                resp_flips[b, start_Cs:start_Cs+no_Cs_chunk] = flips[v]
+    
+    return resp_flips
+
+
+def det_resp_flips_engine(puf_instance, challenges, engine, max_rows=2**16, bits=None):
+    """ Function to determine the response flips of the given bit positions with one of the engines
+        that do not re-evaluate the PUF with pypuf
+        
+        puf_instance:   puf object      - from pypuf, cf. select_T1_engine
+        challenges:     numpy.ndarray   - all initial challenges (e.g. generated with pypuf.io.random_inputs)
+        engine:         string          - 'cumsum' for (XOR) Arbiter PUFs, 'br' for (XOR) Bistable Ring PUFs,
+                                          'ff' for Feed-Forward Arbiter PUFs
+        max_rows:       int             - maximal number of rows processed at once
+        bits:           list of int     - bit positions to be examined, by default all n
+        
+        resp_flips:     numpy.ndarray   - boolean array of shape (len(bits), N), True where the response flipped
+    """
+    
+    bits = list(range(puf_instance.challenge_length)) if bits is None else list(bits)
+    
+    if engine == 'ff':
+        return det_resp_flips_ff_arbiter(puf_instance, challenges, max_rows, bits)
+    
+    if engine == 'br':
+        return det_resp_flips_xor_br(puf_instance, challenges, max_rows)[bits]
+    
+    return det_resp_flips_xor_arbiter(puf_instance, challenges, max_rows)[bits]
+
+
+def det_no_resp_flips_packed(puf_instance, packed_challenges, engine='batched', max_rows=2**16, bits=None):
+    """ Function to determine for every challenge bit position how many response bits are
+        flipped, with the challenges given in the packed representation (cf. bitpack_funcs).
+        The challenges are unpacked chunk by chunk only for the evaluation with pypuf.
+        Flipped challenge sets are built by XOR-ing bit masks and response flips are counted
+        with popcount over the packed response bit vectors.
+        
+        puf_instance:       puf object      - from pypuf
+        packed_challenges:  numpy.ndarray   - uint64 array of shape (N,), e.g. from bitpack_funcs.random_inputs_packed
+        engine:             string          - 'cumsum', 'br' and 'ff' are applied to the unpacked chunks (det_resp_flips_engine),
+                                              any other engine evaluates the flipped challenge sets with pypuf
+        max_rows:           int             - maximal number of unpacked challenge rows processed at once
+        bits:               list of int     - bit positions to be examined, by default all n
+        
+        no_resp_flips:      numpy.ndarray   - int array of shape (len(bits),), no. of flipped responses per bit position
+    """
+    
+    no_bits = puf_instance.challenge_length
+    no_Cs   = packed_challenges.shape[0]
+    bits    = list(range(no_bits)) if bits is None else list(bits)
+    masks   = np.array([flip_mask([i]) for i in bits], dtype=np.uint64)
+    
+    no_resp_flips = np.zeros(len(bits), dtype=np.int64)
+    
+    for start in range(0, no_Cs, max_rows):
+        packed_chunk = packed_challenges[start:start+max_rows]
+        
+        if engine in ['cumsum', 'br', 'ff']:
+            no_resp_flips += np.sum(det_resp_flips_engine(puf_instance, unpack_challenges(packed_chunk, no_bits), engine, max_rows, bits), axis=1)
+            continue
+        
+        packed_responses = pack_responses(puf_instance.eval(unpack_challenges(packed_chunk, no_bits)))
+        
+        for i, mask in enumerate(masks):
+            challenges_flipped = unpack_challenges(packed_chunk ^ mask, no_bits)
+            responses_flipped  = pack_responses(puf_instance.eval(challenges_flipped))
+            
+            no_resp_flips[i] += popcount(responses_flipped ^ packed_responses)
+    
+    return no_resp_flips
+
+
+def select_T1_engine(puf_instance):
+    """ Function to select the fastest engine of T1_1_bflip_1_inst that is applicable to the PUF instance
+    
+        puf_instance:   puf object      - from pypuf
+        
+        engine:         string          - engine name, cf. T1_1_bflip_1_inst
+    """
+    
+    if isinstance(puf_instance, XORArbiterPUF) \
+       and getattr(puf_instance.transform, '__func__', None) is XORArbiterPUF.transform_atf.__func__ \
+       and puf_instance.sigma_noise == 0:
+        return 'cumsum'
+    
+    if isinstance(puf_instance, XORBistableRingPUF) \
+       and getattr(puf_instance.transform, '__func__', None) is LTFArray.transform_id.__func__ \
+       and getattr(puf_instance.combiner, '__func__', None) is LTFArray.combiner_xor.__func__:
+        return 'br'
+    
+    if isinstance(puf_instance, FeedForwardArbiterPUF) \
+       and getattr(puf_instance.transform, '__func__', None) is XORArbiterPUF.transform_atf.__func__ \
+       and puf_instance.noisiness == 0:
+        return 'ff'
+    
+    return 'batched'
+
+
+def det_no_resp_flips_all(puf_instance, challenges, engine='auto', max_rows=2**16, bits=None):
+    """ Function to determine for every challenge bit position how many response bits are
+        flipped when this single challenge bit is flipped
+        
+        puf_instance:   puf object      - from pypuf
+        challenges:     numpy.ndarray   - all initial challenges (e.g. generated with pypuf.io.random_inputs),
+                                          or packed challenges (e.g. generated with bitpack_funcs.random_inputs_packed),
+                        ChallengeStream - or a stream generating the challenges chunk by chunk (cf. challenge_funcs);
+                                          the flip counts are then accumulated over the chunks
+        engine:         string          - engine name, cf. T1_1_bflip_1_inst
+        max_rows:       int             - maximal number of rows processed at once (all engines but 'loop')
+        bits:           list of int     - bit positions to be examined, by default all n
+        
+        no_resp_flips:  numpy.ndarray   - int array of shape (len(bits),), no. of flipped responses per bit position
+    """
+    
+    no_bits = puf_instance.challenge_length
+    bits    = list(range(no_bits)) if bits is None else list(bits)
+    
+    if engine == 'auto':
+        engine = select_T1_engine(puf_instance)
+    
+    if engine not in ['loop', 'batched', 'cumsum', 'br', 'ff']:
+        raise ValueError(f'Unknown engine {engine!r} for Test 1.')
+    
+    if engine == 'cumsum' and select_T1_engine(puf_instance) != 'cumsum':
+        raise ValueError('Engine cumsum requires a noise-free XORArbiterPUF with the default input transformation.')
+    
+    if engine == 'br' and select_T1_engine(puf_instance) != 'br':
+        raise ValueError('Engine br requires a XORBistableRingPUF.')
+    
+    if engine == 'ff' and select_T1_engine(puf_instance) != 'ff':
+        raise ValueError('Engine ff requires a noise-free FeedForwardArbiterPUF.')
+    
+    if isinstance(challenges, ChallengeStream):
+        no_resp_flips = np.zeros(len(bits), dtype=np.int64)
+        for challenges_chunk in challenges:
+            no_resp_flips += det_no_resp_flips_all(puf_instance, challenges_chunk, engine, max_rows, bits)
+    elif is_packed(challenges):
+        no_resp_flips = det_no_resp_flips_packed(puf_instance, challenges, engine, max_rows, bits)
+    elif engine == 'loop':
+        responses     = puf_instance.eval(challenges)
+        no_resp_flips = [det_no_resp_flips(puf_instance, responses, challenges, [i]) for i in bits]
+    elif engine == 'batched':
+        responses     = puf_instance.eval(challenges)
+        no_resp_flips = np.sum(det_resp_flips_batch(puf_instance, responses, challenges, [[i] for i in bits], max_rows), axis=1)
+    elif engine in ['cumsum', 'br', 'ff']:
+        no_resp_flips = np.sum(det_resp_flips_engine(puf_instance, challenges, engine, max_rows, bits), axis=1)
+    
+    return np.asarray(no_resp_flips, dtype=np.int64)
+
+
+def T1_1_bflip_1_inst(puf_instance, challenges, engine='auto', max_rows=2**16):
     """ Function to implement Test 1
 
         puf_instance:   puf object      - from pypuf
-        challenges:     numpy.ndarray   - all initial challenges (e.g. generated with pypuf.io.random_inputs)
+        challenges:     numpy.ndarray   - all initial challenges (e.g. generated with pypuf.io.random_inputs),
+                                          or packed challenges (e.g. generated with bitpack_funcs.random_inputs_packed),
+                        ChallengeStream - or a stream generating the challenges chunk by chunk (cf. challenge_funcs);
+                                          the flip counts are then accumulated over the chunks
+        engine:         string          - 'loop' evaluates one flipped challenge set per bit position (det_no_resp_flips),
+                                          'batched' stacks the flipped challenge sets into slabs (det_resp_flips_batch),
+                                          'cumsum' uses the closed form for noise-free (XOR) Arbiter PUFs (det_resp_flips_xor_arbiter),
+                                          'br' uses the vectorized evaluation of (XOR) Bistable Ring PUFs (det_resp_flips_xor_br),
+                                          'ff' resumes the simulation of noise-free Feed-Forward Arbiter PUFs at the flipped stage (det_resp_flips_ff_arbiter),
+                                          'auto' selects the fastest applicable engine (select_T1_engine)
+        max_rows:       int             - maximal number of rows processed at once (all engines but 'loop')
         
         S_i_arr:        numpy.ndarray   - estimated n S_j(P)s from Test 1
         I2O_1:          float           - estimated I2O_1(P) from Test 1
     """
 
-    no_bits = puf_instance.challenge_length
     no_Cs   = challenges.shape[0]
     
-    responses = puf_instance.eval(challenges)
+    S_i     = det_no_resp_flips_all(puf_instance, challenges, engine, max_rows)
     
-    S_i     = [det_no_resp_flips(puf_instance, responses, challenges, [i]) for i in range(no_bits)]
-    S_i_arr = np.asarray(S_i) / no_Cs
+    S_i_arr = S_i / no_Cs
     
     I2O_1   = np.average(np.abs(S_i_arr - 0.5))
     
     return S_i_arr, I2O_1
 
 
-def T2_1_bflip_r_inst(instances, challenges, n_jobs=1):
+def binomial_ci(no_flips, no_Cs, alpha=0.05):
+    """ Function to determine Wilson score confidence intervals for response flip probabilities
+    
+        no_flips:       numpy.ndarray   - numbers of flipped responses (e.g. per bit position)
+        no_Cs:          int             - number of challenges the flips were counted on
+        alpha:          float           - significance level, i.e. the intervals have confidence 1-alpha each
+        
+        lower:          numpy.ndarray   - lower interval bounds
+        upper:          numpy.ndarray   - upper interval bounds
+    """
+    
+    z       = NormalDist().inv_cdf(1 - alpha/2)
+    p       = np.asarray(no_flips) / no_Cs
+    
+    center  = (p + z**2 / (2*no_Cs)) / (1 + z**2 / no_Cs)
+    radius  = z / (1 + z**2 / no_Cs) * np.sqrt(p * (1-p) / no_Cs + z**2 / (4*no_Cs**2))
+    
+    lower   = np.clip(center - radius, 0, 1)
+    upper   = np.clip(center + radius, 0, 1)
+    
+    return lower, upper
+
+
+def I2O_1_ci(S_i_lower, S_i_upper, axis=None):
+    """ Function to bound I2O_1 given intervals for all S_j. For S_j in [lower_j, upper_j]
+        the distance |S_j - 0.5| lies between its minimum and maximum over the interval,
+        hence I2O_1 lies between the averages of these extremes.
+    
+        S_i_lower:      numpy.ndarray   - lower bounds of the n S_j
+        S_i_upper:      numpy.ndarray   - upper bounds of the n S_j
+        axis:           int or None     - axis of the bit positions, e.g. -1 for the bounds of several instances (..., n)
+        
+        lower:          float           - lower bound of I2O_1 (numpy.ndarray for several instances)
+        upper:          float           - upper bound of I2O_1
+    """
+    
+    dist_min = np.where((S_i_lower <= 0.5) & (0.5 <= S_i_upper), 0, np.minimum(np.abs(S_i_lower - 0.5), np.abs(S_i_upper - 0.5)))
+    dist_max = np.maximum(np.abs(S_i_lower - 0.5), np.abs(S_i_upper - 0.5))
+    
+    return np.average(dist_min, axis=axis), np.average(dist_max, axis=axis)
+
+
+def T1_1_bflip_1_inst_adaptive(puf_instance, challenges, tol, target='S_j', alpha=0.05, round_size=2**12, engine='auto', max_rows=2**16):
+    """ Function to implement Test 1 with sequential sampling: the challenges are evaluated in
+        rounds of round_size challenges until the confidence intervals are narrow enough.
+        The intervals are Wilson score intervals for all n S_j, Bonferroni corrected to hold
+        simultaneously with confidence 1-alpha. If stopped after N' challenges, the results
+        equal those of T1_1_bflip_1_inst on the first N' challenges.
+        
+        puf_instance:   puf object      - from pypuf
+        challenges:     numpy.ndarray   - all available challenges (cf. T1_1_bflip_1_inst); at most these are used
+                        ChallengeStream
+        tol:            float           - maximal half-width of the confidence intervals
+        target:         string          - 'S_j' requires the intervals of all S_j to be narrow enough,
+                                          'I2O_1' only the resulting interval for I2O_1 (cf. I2O_1_ci)
+        alpha:          float           - significance level of the simultaneous confidence intervals
+        round_size:     int             - number of challenges evaluated per round
+        engine:         string          - engine name, cf. T1_1_bflip_1_inst
+        max_rows:       int             - maximal number of rows processed at once, cf. T1_1_bflip_1_inst
+        
+        S_i_arr:        numpy.ndarray   - estimated n S_j(P)s from Test 1
+        I2O_1:          float           - estimated I2O_1(P) from Test 1
+        no_Cs:          int             - number of challenges actually used
+    """
+    
+    if target not in ['S_j', 'I2O_1']:
+        raise ValueError(f'Unknown target {target!r} for adaptive Test 1.')
+    
+    no_bits = puf_instance.challenge_length
+    S_i     = np.zeros(no_bits, dtype=np.int64)
+    no_Cs   = 0
+    
+    for challenges_chunk in iter_challenge_chunks(challenges, round_size):
+        S_i     += det_no_resp_flips_all(puf_instance, challenges_chunk, engine, max_rows)
+        no_Cs   += challenges_chunk.shape[0]
+        
+        S_i_lower, S_i_upper = binomial_ci(S_i, no_Cs, alpha / no_bits)
+        
+        if target == 'S_j':
+            half_width = np.max(S_i_upper - S_i_lower) / 2
+        else:
+            I2O_1_lower, I2O_1_upper = I2O_1_ci(S_i_lower, S_i_upper)
+            half_width = (I2O_1_upper - I2O_1_lower) / 2
+        
+        if half_width <= tol:
+            break
+    
+    S_i_arr = S_i / no_Cs
+    
+    I2O_1   = np.average(np.abs(S_i_arr - 0.5))
+    
+    return S_i_arr, I2O_1, no_Cs
+
+
+def T2_from_T1_results(S_i_r, I2O_1_r):
+    """ Function to combine the Test 1 results of r instances to the results of Test 2
+    
+        S_i_r:          list of arrays      - estimated r*n S_j(P_k)s from Test 1 for P_ks (list pos. 1 <= k <= r, array pos 1 <= j <= n)
+        I2O_1_r:        list of float       - estimated r I2O_1(P_k) from Test 1 for P_ks
+        
+        Test_2_r_inst:  tuple               - return of T2_1_bflip_r_inst, i.e. (S_i_r, S_i_avg, I2O_1_r, I2O_1_avg, A2O_1)
+    """
+    
+    r = len(S_i_r)
+    
+    # Accumulate in double precision, also for single precision results loaded from a store (cf. storage_funcs)
+    S_i_avg = np.sum(S_i_r, axis=0, dtype=np.float64) / r
+    
+    I2O_1_avg   = np.sum(I2O_1_r) / r
+    
+    A2O_1 = np.average(np.abs(S_i_avg - 0.5))
+    
+    return S_i_r, S_i_avg, I2O_1_r, I2O_1_avg, A2O_1
+
+
+def T2_1_bflip_r_inst(instances, challenges, n_jobs=1, engine='auto', progress=None, progress_group=0):
     """ Function to implement Test 2
 
         instances:      list of puf objects - from pypuf
-        challenges:     numpy.ndarray       - all initial challenges (e.g. generated with pypuf.io.random_inputs)
+        challenges:     numpy.ndarray       - all initial challenges (e.g. generated with pypuf.io.random_inputs),
+                        ChallengeStream     - or a stream of challenge chunks (cf. T1_1_bflip_1_inst)
         n_jobs:         int                 - no. of cores used (parallel evaluation of instances)
+        engine:         string              - engine used for Test 1 on each instance, by default selected per
+                                              instance, e.g. the closed form for (XOR) Arbiter PUFs (cf. T1_1_bflip_1_inst)
+        progress:       ProgressReporter    - if given, each instance is registered as a task of the group progress_group
+                                              and reported once finished (cf. progress_funcs)
+        progress_group: hashable            - key of the group of the instances in progress
         
         S_i_r:          list of arrays      - estimated r*n S_j(P_k)s from Test 1 for P_ks (list pos. 1 <= k <= r, array pos 1 <= j <= n)
         S_i_avg:        numpy.ndarray       - estimated n \overline{S}_js from Test 2
@@ -89,19 +687,211 @@ def T2_1_bflip_r_inst(instances, challenges, n_jobs=1):
         A2O_1:          float               - estimated A2O_1 from Test 2
     """
     
-    r = len(instances)
+    task_ids = [progress.add_task(progress_group, 1.) for _ in instances] if progress is not None else [None] * len(instances)
     
-    instances_T1 = Parallel(n_jobs=n_jobs)(delayed(T1_1_bflip_1_inst)(instance, challenges) for instance in instances)
+    with progress_context(progress):
+        instances_T1 = Parallel(n_jobs=n_jobs)(delayed(run_reported)(T1_1_bflip_1_inst, progress.callback(task_id) if progress is not None else None, instance, challenges, engine)
+                                               for task_id, instance in zip(task_ids, instances))
     
     S_i_r   = [S_i_arr for S_i_arr, I2O_1 in instances_T1]
-    S_i_avg = np.sum(S_i_r, axis=0) / r
+    I2O_1_r = [I2O_1 for S_i_arr, I2O_1 in instances_T1]
     
-    I2O_1_r     = [I2O_1 for S_i_arr, I2O_1 in instances_T1]
-    I2O_1_avg   = np.sum(I2O_1_r) / r
+    return T2_from_T1_results(S_i_r, I2O_1_r)
+
+
+def T2_1_bflip_r_inst_adaptive(instances, challenges, tol, target='S_j', alpha=0.05, round_size=2**12, n_jobs=1, engine='auto'):
+    """ Function to implement Test 2 with sequential sampling per instance (cf. T1_1_bflip_1_inst_adaptive)
+
+        instances:      list of puf objects - from pypuf
+        challenges:     numpy.ndarray       - all available challenges (cf. T1_1_bflip_1_inst_adaptive)
+                        ChallengeStream
+        tol:            float               - maximal half-width of the confidence intervals
+        target:         string              - 'S_j' or 'I2O_1', cf. T1_1_bflip_1_inst_adaptive
+        alpha:          float               - significance level of the simultaneous confidence intervals
+        round_size:     int                 - number of challenges evaluated per round
+        n_jobs:         int                 - no. of cores used (parallel evaluation of instances)
+        engine:         string              - engine used for Test 1 on each instance (cf. T1_1_bflip_1_inst)
+        
+        Test_2_r_inst:  tuple               - return of T2_1_bflip_r_inst, i.e. (S_i_r, S_i_avg, I2O_1_r, I2O_1_avg, A2O_1)
+        no_Cs_r:        list of int         - number of challenges used for each of the r instances
+    """
     
-    A2O_1 = np.average(np.abs(S_i_avg - 0.5))
+    instances_T1 = Parallel(n_jobs=n_jobs)(delayed(T1_1_bflip_1_inst_adaptive)(instance, challenges, tol, target, alpha, round_size, engine) for instance in instances)
     
-    return S_i_r, S_i_avg, I2O_1_r, I2O_1_avg, A2O_1
+    S_i_r   = [S_i_arr for S_i_arr, I2O_1, no_Cs in instances_T1]
+    I2O_1_r = [I2O_1 for S_i_arr, I2O_1, no_Cs in instances_T1]
+    no_Cs_r = [no_Cs for S_i_arr, I2O_1, no_Cs in instances_T1]
+    
+    return T2_from_T1_results(S_i_r, I2O_1_r), no_Cs_r
+
+
+def noise_free_copy(puf_instance):
+    """ Function to create a noise-free copy of a (possibly noisy) PUF instance with the same weights
+    
+        puf_instance:   puf object      - from pypuf
+        
+        puf_nf:         puf object      - deep copy of puf_instance with sigma_noise and noisiness set to 0
+    """
+    
+    puf_nf = copy.deepcopy(puf_instance)
+    
+    if hasattr(puf_nf, 'sigma_noise'):
+        puf_nf.sigma_noise = 0
+    if hasattr(puf_nf, 'noisiness'):
+        puf_nf.noisiness = 0
+    
+    return puf_nf
+
+
+def eval_repeated(puf_instance, challenges, m):
+    """ Function to evaluate each challenge m times with a single eval call on the stacked challenges,
+        i.e. with independent noise for each of the m repetitions of a noisy instance
+    
+        puf_instance:   puf object      - from pypuf
+        challenges:     numpy.ndarray   - challenges of shape (N, n)
+        m:              int             - number of repeated evaluations per challenge
+        
+        responses_m:    numpy.ndarray   - responses of shape (m, N)
+    """
+    
+    return puf_instance.eval(np.tile(challenges, (m, 1))).reshape(m, challenges.shape[0])
+
+
+def aggregate_responses(responses_m, aggregation='majority'):
+    """ Function to aggregate m repeated measurements of responses (along the second to last axis)
+    
+        responses_m:    numpy.ndarray   - responses in {-1,1} of shape (..., m, N)
+        aggregation:    string          - 'majority' for the majority vote with all challenges weighted equally,
+                                          'reliability' for the majority vote with each challenge weighted by
+                                          its reliability |sum of responses| / m
+        
+        responses:      numpy.ndarray   - majority votes in {-1,0,1} of shape (..., N), 0 for ties (even m)
+        weights:        numpy.ndarray   - weights in [0,1] of shape (..., N)
+    """
+    
+    m           = responses_m.shape[-2]
+    resp_sum    = np.sum(responses_m, axis=-2, dtype=np.int64)
+    
+    if aggregation == 'majority':
+        weights = np.ones(resp_sum.shape)
+    elif aggregation == 'reliability':
+        weights = np.abs(resp_sum) / m
+    else:
+        raise ValueError(f'Unknown aggregation {aggregation!r}, expected majority or reliability.')
+    
+    return np.sign(resp_sum), weights
+
+
+def det_no_resp_flips_noisy(puf_instance, challenges, m, aggregation='majority', max_rows=2**16, bits=None):
+    """ Function to determine for each bit position how many aggregated responses of a noisy instance are
+        flipped relative to the aggregated (noisy) reference responses. The m repetitions of the flipped
+        challenge sets of several bit positions are stacked into slabs of at most max_rows rows (but at
+        least one bit position), each evaluated with a single eval call (cf. det_resp_flips_batch).
+        A response pair counts as a flip if the majority votes differ, as half a flip if one of them is a tie,
+        weighted by the product of the weights of both (cf. aggregate_responses).
+    
+        puf_instance:   puf object      - from pypuf, noisy (e.g. XORArbiterPUF(n, k, seed, noisiness=0.1))
+        challenges:     numpy.ndarray   - all initial challenges, in pypuf {-1,1} or packed representation,
+                        ChallengeStream - or a stream of challenge chunks (cf. T1_1_bflip_1_inst)
+        m:              int             - number of repeated evaluations per challenge
+        aggregation:    string          - 'majority' or 'reliability', cf. aggregate_responses
+        max_rows:       int             - maximal number of stacked challenge rows evaluated per eval call
+        bits:           list of int     - bit positions to be examined, by default all n
+        
+        no_resp_flips:  numpy.ndarray   - weighted numbers of flipped responses of shape (len(bits),)
+        weight_sums:    numpy.ndarray   - sums of the weights of shape (len(bits),), the number of challenges for 'majority'
+    """
+    
+    no_bits = puf_instance.challenge_length
+    bits    = list(range(no_bits)) if bits is None else list(bits)
+    chunk   = max(1, max_rows // m)
+    
+    no_resp_flips   = np.zeros(len(bits))
+    weight_sums     = np.zeros(len(bits))
+    
+    for challenges_chunk in iter_challenge_chunks(challenges, chunk):
+        if is_packed(challenges_chunk):
+            challenges_chunk = unpack_challenges(challenges_chunk, no_bits)
+        
+        no_Cs_chunk = challenges_chunk.shape[0]
+        vars_slab   = max(1, max_rows // (no_Cs_chunk * m))
+        
+        responses, weights = aggregate_responses(eval_repeated(puf_instance, challenges_chunk, m), aggregation)
+        
+        for start in range(0, len(bits), vars_slab):
+            slab_bits = bits[start:start+vars_slab]
+            
+            """ Stack m copies of the chunk per bit position, the copies of the s-th bit occupying rows s*m*N to (s+1)*m*N """
+            challenges_flipped = np.tile(challenges_chunk, (len(slab_bits) * m, 1))
+            for s, bit in enumerate(slab_bits):
+                challenges_flipped[s*m*no_Cs_chunk:(s+1)*m*no_Cs_chunk, bit] *= -1
+            
+            responses_flipped, weights_flipped = aggregate_responses(puf_instance.eval(challenges_flipped).reshape(len(slab_bits), m, no_Cs_chunk), aggregation)
+            
+            """ 0 for no flip, 1 for a flip, 1/2 if one of the majority votes is a tie (cf. det_no_resp_flips) """
+            resp_diffs  = (responses * responses_flipped - 1) / (-2)
+            pair_weights = weights * weights_flipped
+            
+            no_resp_flips[start:start+len(slab_bits)]   += np.sum(resp_diffs * pair_weights, axis=1)
+            weight_sums[start:start+len(slab_bits)]     += np.sum(pair_weights, axis=1)
+    
+    return no_resp_flips, weight_sums
+
+
+def T1_1_bflip_1_inst_noisy(puf_instance, challenges, m, aggregation='majority', engine='auto', max_rows=2**16):
+    """ Function to implement Test 1 on a noisy instance, with each challenge evaluated m times
+        (cf. det_no_resp_flips_noisy), alongside Test 1 on its noise-free copy (cf. noise_free_copy)
+    
+        puf_instance:   puf object      - from pypuf, noisy
+        challenges:     numpy.ndarray   - all initial challenges (cf. T1_1_bflip_1_inst)
+                        ChallengeStream
+        m:              int             - number of repeated evaluations per challenge
+        aggregation:    string          - 'majority' or 'reliability', cf. aggregate_responses
+        engine:         string          - engine used for Test 1 on the noise-free copy (cf. T1_1_bflip_1_inst)
+        max_rows:       int             - maximal number of rows processed at once
+        
+        S_i_arr:        numpy.ndarray   - estimated n S_j(P)s relative to the aggregated noisy responses
+        I2O_1:          float           - estimated I2O_1(P) relative to the aggregated noisy responses
+        S_i_arr_nf:     numpy.ndarray   - estimated n S_j(P)s of the noise-free copy
+        I2O_1_nf:       float           - estimated I2O_1(P) of the noise-free copy
+    """
+    
+    no_resp_flips, weight_sums = det_no_resp_flips_noisy(puf_instance, challenges, m, aggregation, max_rows)
+    
+    """ With 'reliability' and an even m, all pairs of a bit position may have weight 0 (all votes tied), leaving S_j undefined """
+    if np.any(weight_sums == 0):
+        raise ValueError(f'All response pairs of the bit positions {list(np.flatnonzero(weight_sums == 0))} have weight 0 with {aggregation!r} '
+                         f'aggregation of {m} repetitions, i.e. their S_j are undefined. Use an odd number of repetitions or more challenges.')
+    
+    S_i_arr = no_resp_flips / weight_sums
+    I2O_1   = np.average(np.abs(S_i_arr - 0.5))
+    
+    S_i_arr_nf, I2O_1_nf = T1_1_bflip_1_inst(noise_free_copy(puf_instance), challenges, engine, max_rows)
+    
+    return S_i_arr, I2O_1, S_i_arr_nf, I2O_1_nf
+
+
+def T2_1_bflip_r_inst_noisy(instances, challenges, m, aggregation='majority', n_jobs=1, engine='auto'):
+    """ Function to implement Test 2 on noisy instances (cf. T1_1_bflip_1_inst_noisy)
+
+        instances:      list of puf objects - from pypuf, noisy
+        challenges:     numpy.ndarray       - all initial challenges (cf. T1_1_bflip_1_inst)
+                        ChallengeStream
+        m:              int                 - number of repeated evaluations per challenge
+        aggregation:    string              - 'majority' or 'reliability', cf. aggregate_responses
+        n_jobs:         int                 - no. of cores used (parallel evaluation of instances)
+        engine:         string              - engine used for Test 1 on the noise-free copies (cf. T1_1_bflip_1_inst)
+        
+        Test_2_r_inst:  tuple               - return of T2_1_bflip_r_inst relative to the aggregated noisy responses
+        Test_2_r_nf:    tuple               - return of T2_1_bflip_r_inst for the noise-free copies
+    """
+    
+    instances_T1 = Parallel(n_jobs=n_jobs)(delayed(T1_1_bflip_1_inst_noisy)(instance, challenges, m, aggregation, engine) for instance in instances)
+    
+    Test_2_r_inst   = T2_from_T1_results([T1[0] for T1 in instances_T1], [T1[1] for T1 in instances_T1])
+    Test_2_r_nf     = T2_from_T1_results([T1[2] for T1 in instances_T1], [T1[3] for T1 in instances_T1])
+    
+    return Test_2_r_inst, Test_2_r_nf
 
 
 def sort_T2_return_by_I2O(S_i_r, S_i_avg, I2O_1_r, I2O_1_avg, A2O_1, order='decreasing'):
@@ -129,25 +919,21 @@ def sort_T2_return_by_I2O(S_i_r, S_i_avg, I2O_1_r, I2O_1_avg, A2O_1, order='decr
 def T2_sel_from_T2_bflip_r_inst(n, Test_2_m_insts):
     """ Function to reduce the elements in the list iterating over k or l for 
         k-XORArbiter/k-XORBistableRing PUFs or l Loop FF Arbiter PUFs from their total
-        number of instances to n instances.
+        number of instances to n instances. The averages follow from the prefix sums of each group
+        (cf. index_funcs.T2PrefixIndex), as the subselections of data_funcs.SimulationData.selection.
         
-        n:                  int             - Number of instances (must be <= #instances for each k/l parameter)
+        n:                  int             - Number of instances (must be <= #instances for each k/l parameter, else ValueError)
         Test_2_m_insts:     list of tuples  - list in k/l of tuples from Test 2 results - Return from T2_1_bflip_r_inst
+                                              (the S_i_r may be (memory-mapped) arrays of a store, cf. storage_funcs.load_T2_results,
+                                              which are sliced without copying)
         
         sel_Test_2_m_insts: list of tuples  - list in k/l of tuples from Test 2 results - Return from T2_1_bflip_r_inst
     """
     
     sel_Test_2_m_insts = []
-    for k, Test_2_insts in enumerate(Test_2_m_insts):
-        S_i_r = Test_2_insts[0][:n]
-        S_i_avg = np.sum(S_i_r, axis=0) / n
-        
-        I2O_1_r     = Test_2_insts[2][:n]
-        I2O_1_avg   = np.sum(I2O_1_r) / n
-        
-        A2O_1 = np.average(np.abs(S_i_avg - 0.5))
-        
-        sel_Test_2_m_insts.append(tuple([S_i_r, S_i_avg, I2O_1_r, I2O_1_avg, A2O_1]))
+    for Test_2_insts in Test_2_m_insts:
+        S_i_avg, I2O_1_avg, A2O_1 = T2PrefixIndex(Test_2_insts[0], Test_2_insts[2]).aggregates(0, 0, n)
+        sel_Test_2_m_insts.append(tuple([Test_2_insts[0][:n], S_i_avg, Test_2_insts[2][:n], I2O_1_avg, A2O_1]))
     
     return sel_Test_2_m_insts
 
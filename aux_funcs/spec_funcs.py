@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+
+from numpy.random import default_rng
+
+from pypuf.simulation import XORArbiterPUF, FeedForwardArbiterPUF, XORBistableRingPUF
+
+
+""" Functions to describe PUF instances by lightweight specs.
+
+    A spec is a dict with the name of the pypuf class under 'puf' and the parameters of the
+    instance, e.g. {'puf': 'XORArbiterPUF', 'n': 64, 'k': 2, 'seed': 0, 'noisiness': 0}.
+    Specs are sent to the workers instead of the instances, which construct the instances
+    locally. Bistable Ring PUFs are given by the seed of their weights, 'weights_seed',
+    the weights being drawn as default_rng(weights_seed).normal(size=(k, n+1)).
+"""
+
+
+PUF_CLASSES = {'XORArbiterPUF': XORArbiterPUF, 'FeedForwardArbiterPUF': FeedForwardArbiterPUF, 'XORBistableRingPUF': XORBistableRingPUF}
+
+
+def puf_spec(puf, **params):
+    """ Function to create the spec of a PUF instance
+
+        puf:            string          - name of the pypuf class, cf. PUF_CLASSES
+        params:         keyword args    - parameters of the instance
+
+        spec:           dict            - spec of the instance
+    """
+
+    if puf not in PUF_CLASSES:
+        raise ValueError(f'Unknown PUF class {puf}, expected one of {list(PUF_CLASSES)}.')
+
+    return dict(params, puf=puf)
+
+
+def is_puf_spec(instance):
+    """ Function to determine whether an instance is given by its spec
+
+        instance:       puf object/dict - pypuf instance or spec
+
+        is_spec:        bool            - True iff instance is a spec
+    """
+
+    return isinstance(instance, dict)
+
+
+def spec_key(spec):
+    """ Function to identify a spec, such that identical instances (e.g. shared by several experiments) are found
+
+        spec:           dict            - spec of the instance, cf. puf_spec
+
+        key:            string          - canonical JSON of the spec (loops given as tuples or lists are identical)
+    """
+
+    return json.dumps(spec, sort_keys=True)
+
+
+def build_puf_instance(spec):
+    """ Function to construct the PUF instance described by a spec (instances are returned unchanged)
+
+        spec:           dict            - spec of the instance, cf. puf_spec
+                        puf object      - or an instance from pypuf
+
+        puf_instance:   puf object      - from pypuf
+    """
+
+    if not is_puf_spec(spec):
+        return spec
+
+    params  = {key: val for key, val in spec.items() if key != 'puf'}
+    Puf_Cls = PUF_CLASSES[spec['puf']]
+
+    if 'weights_seed' in params:
+        weights_seed = params.pop('weights_seed')
+        params['weights'] = default_rng(weights_seed).normal(size=(params.get('k', 1), params['n']+1))
+
+    return Puf_Cls(**params)
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import pickle
+import hashlib
+import numpy as np
+
+from pathlib import Path
+
+from aux_funcs.simulation_funcs import ENGINE_VERSION, T2_from_T1_results
+from aux_funcs.bitpack_funcs import is_packed, pack_challenges
+from aux_funcs.challenge_funcs import iter_challenge_chunks
+
+
+""" Functions to persist simulation results.
+"""
+
+
+""" Checkpoint shards: the result of each task of simulation_funcs/schedule_funcs is
+    stored in its own small file as soon as it is finished, so that an interrupted run
+    can be resumed by computing only the tasks whose shards are missing. Each shard holds
+    the key of its task (the instance, challenges, sampling, ENGINE_VERSION and bit positions,
+    cf. shard_key), shards of another task at the same path (e.g. after editing the grid or
+    the seeds of an experiment) are not resumed but recomputed.
+"""
+
+
+def shard_path(shard_dir, g, i, bits):
+    """ Function to determine the file of the shard of a task
+
+        shard_dir:      string          - directory of the shards of an experiment
+        g:              int             - index of the group of instances (e.g. k-1 or l-1)
+        i:              int             - index of the instance in the group
+        bits:           list of int     - bit positions of the task
+
+        path:           string          - path of the shard file
+    """
+
+    return os.path.join(shard_dir, f'g{g:02d}_i{i:04d}_b{bits[0]:02d}-{bits[-1]:02d}.npz')
+
+
+def shard_key(puf_instance, challenges_digest, bits, tol=None, target='S_j'):
+    """ Function to determine the key of a task, stored in its shard
+
+        puf_instance:       puf object      - from pypuf
+        challenges_digest:  string          - digest of the challenges, cf. challenge_digest
+        bits:               list of int     - bit positions of the task
+        tol:                float or None   - tolerance of the sequential sampling
+        target:             string          - target of the sequential sampling
+
+        key:                string or None  - hex digest, None for noisy instances (whose shards are not resumed, cf. cache_key)
+    """
+
+    instance_key = cache_key(puf_instance, challenges_digest, tol, target)
+    if instance_key is None:
+        return None
+
+    return hashlib.sha256(repr((instance_key, list(bits))).encode()).hexdigest()
+
+
+def save_shard(path, S_i_part, no_Cs, key=None):
+    """ Function to store the result of a task atomically, i.e. a shard file is either
+        complete or does not exist, even if the process is killed while writing.
+
+        path:           string          - path of the shard file, cf. shard_path
+        S_i_part:       numpy.ndarray   - estimated S_j(P)s for the bit positions of the task
+        no_Cs:          int             - number of challenges used
+        key:            string or None  - key of the task, cf. shard_key
+    """
+
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+    path_tmp = path + f'.{os.getpid()}.tmp'
+    with open(path_tmp, 'wb') as target_file:
+        np.savez(target_file, S_i_part=S_i_part, no_Cs=no_Cs, key=np.str_(key or ''))
+
+    os.replace(path_tmp, path)
+
+
+def load_shard(path):
+    """ Function to load the result of a task
+
+        path:           string          - path of the shard file, cf. shard_path
+
+        S_i_part:       numpy.ndarray   - estimated S_j(P)s for the bit positions of the task
+        no_Cs:          int             - number of challenges used
+    """
+
+    with np.load(path) as shard:
+        return shard['S_i_part'], int(shard['no_Cs'])
+
+
+def shard_matches(path, key):
+    """ Function to determine whether a shard exists and holds the result of a task
+
+        path:           string          - path of the shard file, cf. shard_path
+        key:            string or None  - key of the task, cf. shard_key
+
+        matches:        bool            - True iff the shard can be resumed (shards without key, e.g. of earlier versions, never match)
+    """
+
+    if key is None or not os.path.exists(path):
+        return False
+
+    with np.load(path) as shard:
+        return 'key' in shard.files and str(shard['key']) == key
+
+
+""" Result stores: the results of Test 2 on an experiment (a list in k/l of returns of
+    simulation_funcs.T2_1_bflip_r_inst) are stored in a directory <name>.store holding
+        S_i_r.npy       - float32 array of shape (k, r, n) with the S_j(P)s of all instances
+        I2O_1_r.npy     - float64 array of shape (k, r) with the I2O_1(P)s of all instances
+        meta.json       - PUF type, parameters, seeds, number of challenges, ...
+    The arrays can be memory-mapped, hence only the slices actually used are read from disk.
+"""
+
+
+def store_path(path):
+    """ Function to determine the directory of the store belonging to a (pickle) result file
+
+        path:           string          - path of the result file, e.g. ./simulations/Test_2_on_20_1000_XORArbiterPUF_inst
+
+        store_dir:      string          - path of the store directory
+    """
+
+    return path + '.store'
+
+
+def save_T2_store(store_dir, Test_2_m_insts, meta=None):
+    """ Function to save the results of Test 2 on an experiment as a store
+
+        store_dir:      string          - path of the store directory, cf. store_path
+        Test_2_m_insts: list of tuples  - list in k/l of returns of simulation_funcs.T2_1_bflip_r_inst,
+                        tuple           - or a single return (stored with k = 1 and flagged as single in the metadata)
+        meta:           dict or None    - JSON serializable metadata of the experiment
+    """
+
+    single = isinstance(Test_2_m_insts, tuple)
+    if single:
+        Test_2_m_insts = [Test_2_m_insts]
+
+    Path(store_dir).mkdir(parents=True, exist_ok=True)
+
+    arrays = {'S_i_r':      np.array([Test_2_insts[0] for Test_2_insts in Test_2_m_insts], dtype=np.float32),
+              'I2O_1_r':    np.array([Test_2_insts[2] for Test_2_insts in Test_2_m_insts], dtype=np.float64)}
+
+    for name, array in arrays.items():
+        path = os.path.join(store_dir, name + '.npy')
+        with open(path + '.tmp', 'wb') as target_file:
+            np.save(target_file, array)
+        os.replace(path + '.tmp', path)
+
+    meta = dict(meta or {}, single=single, shape=list(arrays['S_i_r'].shape))
+
+    path = os.path.join(store_dir, 'meta.json')
+    with open(path + '.tmp', 'w') as target_file:
+        json.dump(meta, target_file, indent=1)
+    os.replace(path + '.tmp', path)
+
+
+def load_T2_store(store_dir, mmap_mode='r'):
+    """ Function to load a store
+
+        store_dir:      string          - path of the store directory, cf. store_path
+        mmap_mode:      string or None  - memory-map mode of numpy.load, None loads the arrays into memory
+
+        S_i_r:          numpy.ndarray   - S_j(P)s of shape (k, r, n)
+        I2O_1_r:        numpy.ndarray   - I2O_1(P)s of shape (k, r)
+        meta:           dict            - metadata of the experiment
+    """
+
+    S_i_r   = np.load(os.path.join(store_dir, 'S_i_r.npy'), mmap_mode=mmap_mode)
+    I2O_1_r = np.load(os.path.join(store_dir, 'I2O_1_r.npy'), mmap_mode=mmap_mode)
+
+    with open(os.path.join(store_dir, 'meta.json'), 'r') as source_file:
+        meta = json.load(source_file)
+
+    return S_i_r, I2O_1_r, meta
+
+
+def convert_T2_pickle(path, meta=None):
+    """ Function to convert a pickled result file of Test 2 into a store
+
+        path:           string          - path of the pickled result file
+        meta:           dict or None    - JSON serializable metadata of the experiment
+
+        store_dir:      string          - path of the store directory
+    """
+
+    with open(path, 'rb') as source_file:
+        Test_2_m_insts = pickle.load(source_file)
+
+    store_dir = store_path(path)
+    save_T2_store(store_dir, Test_2_m_insts, dict(meta or {}, converted_from=os.path.basename(path)))
+
+    return store_dir
+
+
+def load_T2_results(path, convert=True):
+    """ Function to load the results of Test 2 on an experiment in the structure returned by
+        simulation_funcs.T2_1_bflip_r_inst (single) or a list in k/l thereof. The store is used
+        if it exists, otherwise the pickled result file (which is converted to a store first if convert).
+
+        path:           string          - path of the result file, cf. store_path
+        convert:        bool            - convert a pickled result file without store
+
+        Test_2_m_insts: list of tuples  - list in k/l of returns of simulation_funcs.T2_1_bflip_r_inst
+                        tuple           - or a single return, with the S_i_r being (r, n) views of the memory-mapped store
+    """
+
+    store_dir = store_path(path)
+
+    if not os.path.isdir(store_dir):
+        if not convert:
+            with open(path, 'rb') as source_file:
+                return pickle.load(source_file)
+        convert_T2_pickle(path)
+
+    S_i_r, I2O_1_r, meta = load_T2_store(store_dir)
+
+    Test_2_m_insts = [T2_from_T1_results(S_i_r[k], I2O_1_r[k]) for k in range(S_i_r.shape[0])]
+
+    return Test_2_m_insts[0] if meta['single'] else Test_2_m_insts
+
+
+""" Result cache: the S_j(P)s of Test 1 on a PUF instance are stored under a key derived from the
+    content of the instance (type, weights, loop structure, ...), the challenges and ENGINE_VERSION.
+    Hence results are reused across runs and experiments whenever the same instance is evaluated
+    on the same challenges, while the cache size is bounded by evicting the least recently used entries.
+"""
+
+
+def challenge_digest(challenges, chunk_size=2**16):
+    """ Function to determine a digest of the challenges, identical for all their representations
+
+        challenges:     numpy.ndarray   - challenges in pypuf {-1,1} or packed representation,
+                        ChallengeStream - or a stream of challenge chunks
+        chunk_size:     int             - number of challenges hashed at once
+
+        digest:         string          - hex digest
+    """
+
+    digest = hashlib.sha256()
+    for chunk in iter_challenge_chunks(challenges, chunk_size):
+        """ Hash the packed representation (cf. bitpack_funcs), as far as applicable """
+        if not is_packed(chunk):
+            chunk = pack_challenges(chunk) if chunk.shape[1] <= 64 else np.packbits(chunk == -1, axis=1)
+        digest.update(chunk.tobytes())
+
+    return digest.hexdigest()
+
+
+def cache_key(puf_instance, challenges_digest, tol=None, target='S_j'):
+    """ Function to determine the cache key of Test 1 on a PUF instance
+
+        puf_instance:       puf object      - from pypuf
+        challenges_digest:  string          - digest of the challenges, cf. challenge_digest
+        tol:                float or None   - tolerance of the sequential sampling, cf. simulation_funcs.T1_1_bflip_1_inst_adaptive
+        target:             string          - target of the sequential sampling
+
+        key:                string or None  - hex digest, None for noisy instances (whose results are not reproducible)
+    """
+
+    if getattr(puf_instance, 'sigma_noise', 0) != 0 or getattr(puf_instance, 'noisiness', 0) != 0:
+        return None
+
+    weights = np.ascontiguousarray(puf_instance.weight_array, dtype=np.float64)
+
+    key = hashlib.sha256()
+    key.update(repr((ENGINE_VERSION, type(puf_instance).__name__, puf_instance.challenge_length,
+                     puf_instance.transform.__name__, puf_instance.combiner.__name__, weights.shape,
+                     getattr(puf_instance, 'ff', None), challenges_digest, tol, target if tol is not None else None)).encode())
+    key.update(weights.tobytes())
+
+    return key.hexdigest()
+
+
+def cache_entry_path(cache_dir, key):
+    """ Function to determine the file of a cache entry
+
+        cache_dir:      string          - directory of the cache
+        key:            string          - cache key, cf. cache_key
+
+        path:           string          - path of the entry (in the format of the shards, cf. save_shard)
+    """
+
+    return os.path.join(cache_dir, key[:2], key + '.npz')
+
+
+def cache_get(cache_dir, key):
+    """ Function to look up a cache entry, marking it as recently used
+
+        cache_dir:      string          - directory of the cache
+        key:            string or None  - cache key, cf. cache_key
+
+        result:         tuple or None   - (S_i_arr, no_Cs) on a hit, None otherwise
+    """
+
+    if key is None:
+        return None
+
+    path = cache_entry_path(cache_dir, key)
+    try:
+        result = load_shard(path)
+        os.utime(path)
+    except (OSError, ValueError, KeyError):
+        return None
+
+    return result
+
+
+def cache_put(cache_dir, key, S_i_arr, no_Cs):
+    """ Function to store a cache entry
+
+        cache_dir:      string          - directory of the cache
+        key:            string or None  - cache key, cf. cache_key (nothing is stored for None)
+        S_i_arr:        numpy.ndarray   - estimated S_j(P)s of the instance
+        no_Cs:          int             - number of challenges used
+    """
+
+    if key is not None:
+        save_shard(cache_entry_path(cache_dir, key), S_i_arr, no_Cs)
+
+
+def cache_evict(cache_dir, max_bytes):
+    """ Function to bound the size of the cache by deleting the least recently used entries
+
+        cache_dir:      string          - directory of the cache
+        max_bytes:      int             - maximal total size of all entries
+
+        no_evicted:     int             - number of deleted entries
+    """
+
+    entries = []
+    for path in Path(cache_dir).glob('*/*.npz'):
+        stat = path.stat()
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total_bytes = sum(size for _, size, _ in entries)
+
+    no_evicted = 0
+    for _, size, path in sorted(entries, key=lambda x: x[0]):
+        if total_bytes <= max_bytes:
+            break
+        path.unlink()
+        total_bytes -= size
+        no_evicted  += 1
+
+    return no_evicted
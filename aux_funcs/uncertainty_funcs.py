@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from aux_funcs.simulation_funcs import binomial_ci, I2O_1_ci
+
+
+""" Functions to determine confidence intervals for the results of Test 2.
+
+    Two sources of uncertainty are quantified separately:
+    - over the instances: bootstrap intervals for I2O_1_avg (percentile) and A2O_1 (basic, see
+      T2_bootstrap_ci). All resamples are drawn at once as a matrix of counts (how often each instance is drawn in each resample, i.e. the
+      bincount of an index matrix of shape (no_resamples, r)), such that the resampled averages of all
+      groups (k/l) follow from a single matrix product with the S_j(P)s and I2O_1(P)s.
+    - over the challenges: Wilson score intervals for each S_j(P) of each instance (cf.
+      simulation_funcs.binomial_ci), and the resulting bounds for each I2O_1(P) (cf. simulation_funcs.I2O_1_ci).
+"""
+
+
+def bootstrap_counts(r, no_resamples, seed=None):
+    """ Function to draw the resamples of r instances with replacement
+
+        r:              int             - number of instances
+        no_resamples:   int             - number of resamples
+        seed:           int or None     - seed of the resamples, fixed for reproducible intervals
+
+        counts:         numpy.ndarray   - number of draws of each instance (no_resamples, r), each row sums to r
+    """
+
+    rng = np.random.default_rng(seed)
+
+    return rng.multinomial(r, np.full(r, 1 / r), size=no_resamples)
+
+
+def T2_bootstrap_ci(S_i_r, I2O_1_r, no_resamples=2000, alpha=0.05, seed=1):
+    """ Function to determine bootstrap confidence intervals over the instances for I2O_1_avg and A2O_1
+        of one or several groups (the same resamples are used for all groups)
+
+        S_i_r:          numpy.ndarray   - S_j(P)s of shape (k, r, n), or (r, n) for a single group (e.g. of a store, cf. storage_funcs)
+        I2O_1_r:        numpy.ndarray   - I2O_1(P)s of shape (k, r), or (r,) for a single group
+        no_resamples:   int             - number of resamples
+        alpha:          float           - significance level, i.e. the intervals have confidence 1-alpha each
+        seed:           int or None     - seed of the resamples, cf. bootstrap_counts
+
+        I2O_1_avg_lower: numpy.ndarray  - lower bounds of I2O_1_avg (k,), float for a single group
+        I2O_1_avg_upper: numpy.ndarray  - upper bounds of I2O_1_avg
+        A2O_1_lower:    numpy.ndarray   - lower bounds of A2O_1
+        A2O_1_upper:    numpy.ndarray   - upper bounds of A2O_1
+
+        I2O_1_avg is a mean over the instances, hence the percentile interval is used. A2O_1 averages
+        |S_j - 0.5| of the mean S_j(P)s and is biased upward (Jensen), the more so the closer the S_j are
+        to 0.5: the resampled A2O_1s lie above the estimate, often all of them if the S_j are dominated by
+        the noise over the instances. The percentile interval then excludes the estimate and the true
+        value, so the basic interval [2*A2O_1 - q_(1-alpha/2), 2*A2O_1 - q_(alpha/2)] is used instead, with
+        the lower bound clipped at 0 and the upper bound raised to at least the (upward biased) estimate.
+    """
+
+    S_i_r   = np.asarray(S_i_r, dtype=np.float64)
+    I2O_1_r = np.asarray(I2O_1_r, dtype=np.float64)
+    single  = S_i_r.ndim == 2
+    if single:
+        S_i_r, I2O_1_r = S_i_r[np.newaxis], I2O_1_r[np.newaxis]
+
+    r       = S_i_r.shape[1]
+    counts  = bootstrap_counts(r, no_resamples, seed).astype(np.float64)
+
+    """ Resampled averages of all groups at once: (no_resamples, r) @ (k, r, n) -> (k, no_resamples, n) """
+    S_i_avg_b   = np.matmul(counts, S_i_r) / r
+    A2O_1_b     = np.average(np.abs(S_i_avg_b - 0.5), axis=2)
+    I2O_1_avg_b = np.matmul(I2O_1_r, counts.T) / r
+
+    I2O_1_avg_lower, I2O_1_avg_upper    = np.quantile(I2O_1_avg_b, [alpha/2, 1 - alpha/2], axis=1)
+
+    A2O_1               = np.average(np.abs(np.average(S_i_r, axis=1) - 0.5), axis=1)
+    A2O_1_q_lower, A2O_1_q_upper        = np.quantile(A2O_1_b, [alpha/2, 1 - alpha/2], axis=1)
+    A2O_1_lower         = np.maximum(2 * A2O_1 - A2O_1_q_upper, 0)
+    A2O_1_upper         = np.maximum(2 * A2O_1 - A2O_1_q_lower, A2O_1)
+
+    if single:
+        return I2O_1_avg_lower[0], I2O_1_avg_upper[0], A2O_1_lower[0], A2O_1_upper[0]
+
+    return I2O_1_avg_lower, I2O_1_avg_upper, A2O_1_lower, A2O_1_upper
+
+
+def T2_binomial_ci(S_i_r, no_Cs, alpha=0.05):
+    """ Function to determine confidence intervals over the challenges for the S_j(P)s and I2O_1(P)s of all instances
+
+        S_i_r:          numpy.ndarray   - S_j(P)s of shape (..., n), e.g. (k, r, n) of a store
+        no_Cs:          int             - number of challenges each S_j(P) was estimated on (e.g. N of a store without tolerance)
+        alpha:          float           - significance level; the intervals of the S_j(P)s have confidence 1-alpha each,
+                                          those of the I2O_1(P)s hold for all n S_j(P)s of an instance simultaneously (Bonferroni)
+
+        S_i_lower:      numpy.ndarray   - lower bounds of the S_j(P)s (..., n)
+        S_i_upper:      numpy.ndarray   - upper bounds of the S_j(P)s (..., n)
+        I2O_1_lower:    numpy.ndarray   - lower bounds of the I2O_1(P)s (...)
+        I2O_1_upper:    numpy.ndarray   - upper bounds of the I2O_1(P)s (...)
+    """
+
+    S_i_r   = np.asarray(S_i_r, dtype=np.float64)
+    no_bits = S_i_r.shape[-1]
+
+    S_i_lower, S_i_upper = binomial_ci(S_i_r * no_Cs, no_Cs, alpha)
+
+    I2O_1_lower, I2O_1_upper = I2O_1_ci(*binomial_ci(S_i_r * no_Cs, no_Cs, alpha / no_bits), axis=-1)
+
+    return S_i_lower, S_i_upper, I2O_1_lower, I2O_1_upper
@@ -13,9 +13,13 @@ dname = os.path.dirname(abspath)
 os.chdir(dname)
 
 from aux_funcs.plot_funcs import plot_S_j_by_j, plot_S_j_by_j_box, plot_inst_merit_desc_mult
-from aux_funcs.simulation_funcs import sort_T2_return_by_I2O, T2_sel_from_T2_bflip_r_inst
+from aux_funcs.simulation_funcs import sort_T2_return_by_I2O
+from aux_funcs.data_funcs import simulation_data
+from aux_funcs.storage_funcs import store_path
+from aux_funcs.manifest_funcs import load_manifest, save_manifest, input_digest, code_digests, stale_outputs
 
-import pickle
+import argparse
+import joblib
 import numpy as np
 from pathlib import Path
 from tabulate import tabulate
@@ -25,448 +29,490 @@ import matplotlib.pyplot as plt
 
 sub_dir_simulation  = './simulations/'
 sub_dir_plots       = './plots/'
+manifest_path       = sub_dir_plots + 'manifest.json'
 Path(sub_dir_plots).mkdir(parents=True, exist_ok=True)
 
+# Get no. of cores available:
+no_cpu = joblib.cpu_count()
 
-if __name__ == '__main__':
-    
-    """ Load simulations from the simulation folder
-    """
-    
-    with open(sub_dir_simulation + 'Test_2_on_0008_ArbiterPUF_inst', 'rb') as source_file:
-        Test_2_on_0008_ArbiterPUF_inst = pickle.load(source_file)
-    with open(sub_dir_simulation + 'Test_2_on_0008_FFArbiterPUF_inst', 'rb') as source_file:
-        Test_2_on_0008_FFArbiterPUF_inst = pickle.load(source_file)
-    with open(sub_dir_simulation + 'Test_2_on_0006_BistableRingPUF_inst', 'rb') as source_file:
-        Test_2_on_0006_BistableRingPUF_inst = pickle.load(source_file)
-    
-    with open(sub_dir_simulation + 'Test_2_on_20_1000_XORArbiterPUF_inst', 'rb') as source_file:
-        Test_2_on_20_1000_XORArbiterPUF_inst = pickle.load(source_file)
-    with open(sub_dir_simulation + 'Test_2_on_10_1000_FFArbiterPUF_inst', 'rb') as source_file:
-        Test_2_on_10_1000_FFArbiterPUF_inst = pickle.load(source_file)
-    with open(sub_dir_simulation + 'Test_2_on_20_1000_XORBistableRingPUF_inst', 'rb') as source_file:
-        Test_2_on_20_1000_XORBistableRingPUF_inst = pickle.load(source_file)
-    
-    
-    """ Create sub selections from the extensive simulations
-    """
-    
-    Test_2_on_20_10_XORArbiterPUF_inst  = T2_sel_from_T2_bflip_r_inst(10, Test_2_on_20_1000_XORArbiterPUF_inst)
-    Test_2_on_20_100_XORArbiterPUF_inst = T2_sel_from_T2_bflip_r_inst(100, Test_2_on_20_1000_XORArbiterPUF_inst)
 
-    Test_2_on_10_10_FFArbiterPUF_inst  = T2_sel_from_T2_bflip_r_inst(10, Test_2_on_10_1000_FFArbiterPUF_inst)
-    Test_2_on_10_100_FFArbiterPUF_inst = T2_sel_from_T2_bflip_r_inst(100, Test_2_on_10_1000_FFArbiterPUF_inst)
+""" Set the parameters for the plots
+    sig_fig        : number of significant figures shown
+    glob_font_size : standard font size
+    no_resamples   : number of bootstrap resamples for the confidence intervals in the tables
+    ci_alpha       : significance level of the confidence intervals in the tables
+"""
 
-    Test_2_on_20_10_XORBistableRingPUF_inst  = T2_sel_from_T2_bflip_r_inst(10, Test_2_on_20_1000_XORBistableRingPUF_inst)
-    Test_2_on_20_100_XORBistableRingPUF_inst = T2_sel_from_T2_bflip_r_inst(100, Test_2_on_20_1000_XORBistableRingPUF_inst)
+sig_fig         = 3
+glob_font_size  = 14
+no_resamples    = 2000
+ci_alpha        = 0.05
 
-    
-    """ Set the parameters for the plots
-        img_counter    : track order of plots
-        sig_fig        : number of significant figures shown
-        glob_font_size : standard font size
+
+""" Each figure and table is created by its own function from the lazily loaded simulations (cf. data_funcs),
+    such that only the simulations and subselections (k/l, number of instances) it uses are loaded and computed.
+    The functions are listed in FIGURES in the order of the paper, which determines the numbers of the files.
+"""
+
+
+def save_figure(fig_plot, path):
+    """ Function to save a figure and close it """
+
+    fig_plot.savefig(path, dpi=300, bbox_inches='tight')
+    plt.close()
+
+
+def save_table(table, path):
+    """ Function to write a table to a .txt file """
+
+    with open(path, 'wb') as target_file:
+        target_file.write(table.encode('utf-8'))
+
+
+def plot_S_j_sel(Test_2_insts, no_insts, path, n_cols=None):
+    """ Function to plot S_j dependent on j for the first no_insts instances of a group, ordered by descending I2O_1 scores """
+
+    lines    = Test_2_insts[0][:no_insts]
+    i2o_vals = Test_2_insts[2][:no_insts]
+    i2o_avgs = np.average(i2o_vals)
+
+    """ Order the selection according to descending I2O_1 scores """
+    sorted_list_vals = sorted(zip(lines, i2o_vals), key = lambda x: x[1], reverse=True)
+    lines            = [line for line, _   in sorted_list_vals]
+    i2o_vals         = [val  for _,    val in sorted_list_vals]
+
+    ylim = (-0.04809600000000001, 1.049396)
+
+    """ Create the plot """
+    n_cols_arg  = {'n_cols': n_cols} if n_cols is not None else {}
+    fig_plot    = plot_S_j_by_j(lines, i2o_vals, i2o_avgs, sig_fig, leg1_pos="upper left", leg2_pos="center left", ylim=ylim, font_size=glob_font_size, quarter_yticks=True, **n_cols_arg)
+    save_figure(fig_plot, path)
+
+
+def plot_S_j_box_sel(Test_2_insts, path, feed_forwards=[], ylim=(-0.04809600000000001, 1.049396)):
+    """ Function to plot the box-plot of S_j dependent on j for the instances of a (sub)selection.
+        Add \overline{I2O} score for the instances.
     """
-    
-    img_counter     = 1
-    sig_fig         = 3
-    glob_font_size  = 14
-    
-    
-    
-    """ Arbiter PUF """    
-    
+
+    S_j_bars    = Test_2_insts[1]
+    S_js        = np.transpose(np.concatenate([Test_2_insts[0]], axis=1))
+    i2o_avg     = Test_2_insts[3]
+
+    fig_plot    = plot_S_j_by_j_box(S_js, i2o_avg, sig_fig, feed_forwards=feed_forwards, leg2_pos="upper left", ylim=ylim, font_size=glob_font_size, quarter_yticks=True, bbox_val=(.0,.88), S_j_bars=S_j_bars)
+    save_figure(fig_plot, path)
+
+
+def k_lines_desc(selection):
+    """ Function to create the legend entries of the selected values of k (aligned) """
+
+    lines_desc = []
+    for i, val in enumerate(selection):
+        if 3 < i < 5:
+            lines_desc.append(r'$k = \phantom{0}$' + r'${}$'.format(val+1))
+        else:
+            lines_desc.append(r'$k = {}$'.format(val+1))
+
+    return lines_desc
+
+
+annot_high = r'\begin{tabular}{l} $\mathrm{Largest} \; {\sf  I2O_{1}} \: \mathrm{Score}$ \\ $\mathrm{of} \; \mathrm{all} \; 100 \; \mathrm{instances} $  \end{tabular}'
+annot_low  = r'\begin{tabular}{l} $\mathrm{Smallest} \; {\sf  I2O_{1}} \: \mathrm{Score}$ \\ $\mathrm{of} \; \mathrm{all} \; 100 \; \mathrm{instances} $  \end{tabular}'
+
+
+""" FF Arbiter PUF: loop structure used for the simulation of the 8 instances """
+feed_forwards = [(6, 15), (14, 23), (22, 31), (30, 39), (38,47), (46, 55), (54, 63), (62, 71)]
+
+
+""" Arbiter PUF """
+
+
+def fig_0008_ArbiterPUF(data, path):
     """ Plot S_j dependent on j for 8 instances from file Test_2_on_0008_ArbiterPUF_inst.
         Add legend with I2O scores for the corresponding colours.
         Add \overline{I2O} score for the 8 instances.
     """
-    
+
     """ Sort according to I2O scores """
-    Test_2_on_0008_ArbiterPUF_inst_sorted = sort_T2_return_by_I2O(*Test_2_on_0008_ArbiterPUF_inst)
-    
+    Test_2_on_0008_ArbiterPUF_inst_sorted = sort_T2_return_by_I2O(*data.group('Test_2_on_0008_ArbiterPUF_inst'))
+
     """ Now select plot items and round \overline{I2O} to sig_fig. """
     lines    = Test_2_on_0008_ArbiterPUF_inst_sorted[0]
     i2o_vals = Test_2_on_0008_ArbiterPUF_inst_sorted[2]
     i2o_avgs = Test_2_on_0008_ArbiterPUF_inst_sorted[3]
-    
+
     ylim = (-0.04809600000000001, 1.049396)
-    
+
     """ Create the plot """
     fig_plot    = plot_S_j_by_j(lines, i2o_vals, i2o_avgs, sig_fig, ylim=ylim, n_cols=4, font_size=glob_font_size, quarter_yticks=True)
-    fig_plot.savefig(sub_dir_plots + '{:02d}'.format(img_counter) + '_Test_2_on_0008_ArbiterPUF_inst.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    img_counter += 1
-    
-    
+    save_figure(fig_plot, path)
+
+
+def fig_0100_ArbiterPUF_box(data, path):
     """ Plot box-plot of S_j for 100 Arbiter PUF instances dependent on j.
         Add \overline{I2O} score for the 100 instances.
     """
     # k=1, i.e. first subselection [0]
-    S_j_bars    = Test_2_on_20_100_XORArbiterPUF_inst[0][1]
-    S_js        = np.transpose(np.concatenate([Test_2_on_20_100_XORArbiterPUF_inst[0][0]], axis=1))
-    i2o_avg     = Test_2_on_20_100_XORArbiterPUF_inst[0][3]
-    
-    ylim = (-0.04809600000000001, 1.049396)
-    
-    fig_plot    = plot_S_j_by_j_box(S_js, i2o_avg, sig_fig, leg2_pos="upper left", ylim=ylim, font_size=glob_font_size, quarter_yticks=True, bbox_val=(.0,.88), S_j_bars=S_j_bars)
-    fig_plot.savefig(sub_dir_plots + '{:02d}'.format(img_counter) + '_Test_2_on_0100_ArbiterPUF_inst_box.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    img_counter += 1
-    
-    
-    """ 2-XOR Arbiter PUF """
-    
+    plot_S_j_box_sel(data.selection('Test_2_on_20_1000_XORArbiterPUF_inst', 0, 100), path)
+
+
+""" 2-XOR Arbiter PUF """
+
+
+def fig_0008_2XORArbiterPUF(data, path):
     """ Select 8 suitable 2-XOR Arbiter PUF instances to plot """
     # k=2, i.e. first subselection [1]
-    Test_2_on_0008_2XORArbiterPUF_inst = Test_2_on_20_100_XORArbiterPUF_inst[1]
-    
-    lines    = Test_2_on_0008_2XORArbiterPUF_inst[0][:8]
-    i2o_vals = Test_2_on_0008_2XORArbiterPUF_inst[2][:8]
-    i2o_avgs = np.average(i2o_vals) 
-    
-    """ Order the selection according to descending I2O_1 scores """
-    sorted_list_vals = sorted(zip(lines, i2o_vals), key = lambda x: x[1], reverse=True)
-    lines            = [line for line, _   in sorted_list_vals]
-    i2o_vals         = [val  for _,    val in sorted_list_vals]
-    
-    ylim = (-0.04809600000000001, 1.049396)
-    
-    """ Create the plot """
-    fig_plot    = plot_S_j_by_j(lines, i2o_vals, i2o_avgs, sig_fig, leg1_pos="upper left", leg2_pos="center left", ylim=ylim, n_cols=4, font_size=glob_font_size, quarter_yticks=True)
-    fig_plot.savefig(sub_dir_plots + '{:02d}'.format(img_counter) + '_Test_2_on_0008_2XORArbiterPUF_inst.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    img_counter += 1
+    plot_S_j_sel(data.selection('Test_2_on_20_1000_XORArbiterPUF_inst', 1, 100), 8, path, n_cols=4)
 
 
+def fig_0100_2XORArbiterPUF_box(data, path):
     """ Plot box-plot of S_j for 100 2-XOR Arbiter PUF instances dependent on j. """
     # k=2, i.e. first subselection [1]
-    S_j_bars    = Test_2_on_20_100_XORArbiterPUF_inst[1][1]
-    S_js        = np.transpose(np.concatenate([Test_2_on_20_100_XORArbiterPUF_inst[1][0]], axis=1))
-    i2o_avg     = Test_2_on_20_100_XORArbiterPUF_inst[1][3]
-    
-    ylim = (-0.04809600000000001, 1.049396)
-    
-    fig_plot    = plot_S_j_by_j_box(S_js, i2o_avg, sig_fig, leg2_pos="upper left", ylim=ylim, font_size=glob_font_size, quarter_yticks=True, bbox_val=(.0,.88), S_j_bars=S_j_bars)
-    fig_plot.savefig(sub_dir_plots + '{:02d}'.format(img_counter) + '_Test_2_on_0100_2XORArbiterPUF_inst_box.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    img_counter += 1
-    
-    
-    """ 3-XOR Arbiter PUF """
-    
+    plot_S_j_box_sel(data.selection('Test_2_on_20_1000_XORArbiterPUF_inst', 1, 100), path)
+
+
+""" 3-XOR Arbiter PUF """
+
+
+def fig_0008_3XORArbiterPUF(data, path):
     """ Select 8 suitable 3-XOR Arbiter PUF instances to plot """
     # k=3, i.e. first subselection [2]
-    Test_2_on_0008_3XORArbiterPUF_inst = Test_2_on_20_100_XORArbiterPUF_inst[2]
-    
-    lines    = Test_2_on_0008_3XORArbiterPUF_inst[0][:8]
-    i2o_vals = Test_2_on_0008_3XORArbiterPUF_inst[2][:8]
-    i2o_avgs = np.average(i2o_vals) 
-    
-    """ Order the selection according to descending I2O_1 scores """
-    sorted_list_vals = sorted(zip(lines, i2o_vals), key = lambda x: x[1], reverse=True)
-    lines            = [line for line, _   in sorted_list_vals]
-    i2o_vals         = [val  for _,    val in sorted_list_vals]
-    
-    ylim = (-0.04809600000000001, 1.049396)
-    
-    """ Create the plot """
-    fig_plot    = plot_S_j_by_j(lines, i2o_vals, i2o_avgs, sig_fig, leg1_pos="upper left", leg2_pos="center left", ylim=ylim, n_cols=4, font_size=glob_font_size, quarter_yticks=True)
-    fig_plot.savefig(sub_dir_plots + '{:02d}'.format(img_counter) + '_Test_2_on_0008_3XORArbiterPUF_inst.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    img_counter += 1
-    
-    
+    plot_S_j_sel(data.selection('Test_2_on_20_1000_XORArbiterPUF_inst', 2, 100), 8, path, n_cols=4)
+
+
+def fig_0100_3XORArbiterPUF_box(data, path):
     """ Plot box-plot of S_j for 100 3-XOR Arbiter PUF instances dependent on j. """
     # k=3, i.e. first subselection [2]
-    S_j_bars    = Test_2_on_20_100_XORArbiterPUF_inst[2][1]
-    S_js        = np.transpose(np.concatenate([Test_2_on_20_100_XORArbiterPUF_inst[2][0]], axis=1))
-    i2o_avg     = Test_2_on_20_100_XORArbiterPUF_inst[2][3]
-    
-    ylim = (-0.04809600000000001, 1.049396)
-    
-    fig_plot    = plot_S_j_by_j_box(S_js, i2o_avg, sig_fig, leg2_pos="upper left", ylim=ylim, font_size=glob_font_size, quarter_yticks=True, bbox_val=(.0,.88), S_j_bars=S_j_bars)
-    fig_plot.savefig(sub_dir_plots + '{:02d}'.format(img_counter) + '_Test_2_on_0100_3XORArbiterPUF_inst_box.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    img_counter += 1
-    
-    
+    plot_S_j_box_sel(data.selection('Test_2_on_20_1000_XORArbiterPUF_inst', 2, 100), path)
+
+
+def fig_0100_kXORArbiterPUF_I2O_dot(data, path):
     """ Plot of descending I2O_1 scores of 100 k-XOR Arbiter PUF instances for selected values of k
     """
-    
-    """ Order by descending I2O_1 socres and select ks """
-    Test_2_on_20_100_XORArbiterPUF_inst_sorted = [sort_T2_return_by_I2O(*ele, order='decreasing') for ele in Test_2_on_20_100_XORArbiterPUF_inst]
+
     # selection for k = 1, 2, 3, 5, 8, 12
     selection = [0, 1, 2, 4, 7, 11]
-    
+
+    """ Order by descending I2O_1 socres for the selected ks """
     lines = []
     for i in selection:
-        lines.append(Test_2_on_20_100_XORArbiterPUF_inst_sorted[i][2])
-    
-    lines_desc = []
-    for i, val in enumerate(selection):
-        if 3 < i < 5:
-            lines_desc.append(r'$k = \phantom{0}$' + r'${}$'.format(val+1))
-        else:
-            lines_desc.append(r'$k = {}$'.format(val+1))
-    
+        lines.append(sort_T2_return_by_I2O(*data.selection('Test_2_on_20_1000_XORArbiterPUF_inst', i, 100), order='decreasing')[2])
+
+    lines_desc = k_lines_desc(selection)
+
     pos_high = (64,70)
     pos_low  = (-64,75)
-    annot_high = r'\begin{tabular}{l} $\mathrm{Largest} \; {\sf  I2O_{1}} \: \mathrm{Score}$ \\ $\mathrm{of} \; \mathrm{all} \; 100 \; \mathrm{instances} $  \end{tabular}'
-    annot_low  = r'\begin{tabular}{l} $\mathrm{Smallest} \; {\sf  I2O_{1}} \: \mathrm{Score}$ \\ $\mathrm{of} \; \mathrm{all} \; 100 \; \mathrm{instances} $  \end{tabular}'
-    
+
     ylim = (-0.02, .522680407)
-    
+
     fig_plot    = plot_inst_merit_desc_mult(lines, lines_desc, annot_high, annot_low, pos_high, pos_low, leg1_pos='upper right', ylim=ylim, n_cols=3, box_back=['#fcfcfc'])
-    fig_plot.savefig(sub_dir_plots + '{:02d}'.format(img_counter) + '_Test_2_on_0100_kXORArbiterPUF_inst_I2O_dot.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    img_counter += 1
-    
-    
-    """ FF Arbiter PUF """    
-    
-    """ Define the loop structure used for the simulation """
-    feed_forwards = [(6, 15), (14, 23), (22, 31), (30, 39), (38,47), (46, 55), (54, 63), (62, 71)]
-    
+    save_figure(fig_plot, path)
+
+
+""" FF Arbiter PUF """
+
+
+def fig_0008_FFArbiterPUF(data, path):
     """ Plot S_j dependent on j for 8 instances from file Test_2_on_0008_FFArbiterPUF_inst.
         Add legend with I2O scores for the corresponding colours.
         Add \overline{I2O} score for the 8 instances.
         Add vertical lines at the starting positions of the loops
             (in challenge bit representation - NOT stage representation!)
     """
-    
+
     """ Sort according to I2O scores """
-    Test_2_on_0008_FFArbiterPUF_inst = sort_T2_return_by_I2O(*Test_2_on_0008_FFArbiterPUF_inst)
-    
+    Test_2_on_0008_FFArbiterPUF_inst = sort_T2_return_by_I2O(*data.group('Test_2_on_0008_FFArbiterPUF_inst'))
+
     """ Now select plot items and round \overline{I2O} to 5 sig_fig. """
     lines    = Test_2_on_0008_FFArbiterPUF_inst[0]
     i2o_vals = Test_2_on_0008_FFArbiterPUF_inst[2]
     i2o_avgs = Test_2_on_0008_FFArbiterPUF_inst[3]
-    
+
     ylim = (-0.04809600000000001, 1.120396)
-    
+
     """ Create the plot """
     fig_plot    = plot_S_j_by_j(lines, i2o_vals, i2o_avgs, sig_fig, leg2_pos=6, feed_forwards=feed_forwards, ylim=ylim, n_cols=4, font_size=glob_font_size, quarter_yticks=True, bbox_leg_1_val=(-0.00,1), bbox_leg_2_val=(-0.00,.665), alpha=.3)
-    fig_plot.savefig(sub_dir_plots + '{:02d}'.format(img_counter) + '_Test_2_on_0008_FFArbiterPUF_inst.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    
-    img_counter += 1
-    
-    
+    save_figure(fig_plot, path)
+
+
+def fig_0100_FFArbiterPUF_box(data, path):
     """ Plot box-plot of S_j for 100 FF Arbiter PUF instances with l=8 dependent on j.
     """
-    Test_2_on_10_100_FFArbiterPUF_inst[7][0]
     # l=8, i.e. first subselection [7]
-    S_j_bars    = Test_2_on_10_100_FFArbiterPUF_inst[7][1]
-    S_js        = np.transpose(np.concatenate([Test_2_on_10_100_FFArbiterPUF_inst[7][0]], axis=1))
-    i2o_avg     = Test_2_on_10_100_FFArbiterPUF_inst[7][3]
-    
-    ylim = (-0.04809600000000001, 1.120396)
-    
-    fig_plot    = plot_S_j_by_j_box(S_js, i2o_avg, sig_fig, feed_forwards=feed_forwards, leg2_pos="upper left", ylim=ylim, font_size=glob_font_size, quarter_yticks=True, bbox_val=(.0,.88), S_j_bars=S_j_bars)
-    fig_plot.savefig(sub_dir_plots + '{:02d}'.format(img_counter) + '_Test_2_on_0100_FFArbiterPUF_inst_box.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    img_counter += 1
-    
-    
+    plot_S_j_box_sel(data.selection('Test_2_on_10_1000_FFArbiterPUF_inst', 7, 100), path, feed_forwards=feed_forwards, ylim=(-0.04809600000000001, 1.120396))
+
+
+def fig_0100_lLoopFFArbiterPUFs_dot(data, path):
     """ Plot of descending I2O_1 scores of 100 l-loop FF Arbiter PUF instances for selected values of l
     """
-    
-    """ Order by descending I2O_1 socres and select ls """
-    Test_2_on_12_100_FFArbiterPUF_inst_sorted = [sort_T2_return_by_I2O(*ele, order='decreasing') for ele in Test_2_on_10_100_FFArbiterPUF_inst]
+
     # selection for l = 3, 4, 5, 8
     selection = [2, 3, 4, 7]
-    
+
+    """ Order by descending I2O_1 socres for the selected ls """
     lines = []
     for i in selection:
-        lines.append(Test_2_on_12_100_FFArbiterPUF_inst_sorted[i][2])
-    
+        lines.append(sort_T2_return_by_I2O(*data.selection('Test_2_on_10_1000_FFArbiterPUF_inst', i, 100), order='decreasing')[2])
+
     lines_desc = []
     for _, val in enumerate(selection):
         lines_desc.append(r'$l = {}$'.format(val+1))
-    
+
     pos_high = (64,57)
     pos_low  = (-64,-48)
-    annot_high = r'\begin{tabular}{l} $\mathrm{Largest} \; {\sf  I2O_{1}} \: \mathrm{Score}$ \\ $\mathrm{of} \; \mathrm{all} \; 100 \; \mathrm{instances} $  \end{tabular}'
-    annot_low  = r'\begin{tabular}{l} $\mathrm{Smallest} \; {\sf  I2O_{1}} \: \mathrm{Score}$ \\ $\mathrm{of} \; \mathrm{all} \; 100 \; \mathrm{instances} $  \end{tabular}'
-    
+
     ylim = (-0.02, .522680407)
-    
+
     fig_plot    = plot_inst_merit_desc_mult(lines, lines_desc, annot_high, annot_low, pos_high, pos_low, leg1_pos='upper right', ylim=ylim, n_cols=2, box_back=['#fcfcfc'], ff_special_col=True)
-    fig_plot.savefig(sub_dir_plots + '{:02d}'.format(img_counter) + '_Test_2_on_0100_lLoopFFArbiterPUFs_inst_dot.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    img_counter += 1
-    
-    
-    """ Bistable Ring PUF """    
-    
+    save_figure(fig_plot, path)
+
+
+""" Bistable Ring PUF """
+
+
+def fig_0006_BistableRingPUF(data, path):
     """ Plot S_j dependent on j for 8 instances from file Test_2_on_0006_BistableRingPUF_inst.
         Add legend with I2O scores for the corresponding colours.
         Add \overline{I2O} score for the 8 instances.
     """
-    
+
     """ Sort according to I2O scores """
-    Test_2_on_0006_BistableRingPUF_inst = sort_T2_return_by_I2O(*Test_2_on_0006_BistableRingPUF_inst)
-    
+    Test_2_on_0006_BistableRingPUF_inst = sort_T2_return_by_I2O(*data.group('Test_2_on_0006_BistableRingPUF_inst'))
+
     """ Now select plot items and round \overline{I2O} to sig_fig. """
     lines    = Test_2_on_0006_BistableRingPUF_inst[0]
     i2o_vals = Test_2_on_0006_BistableRingPUF_inst[2]
     i2o_avgs = Test_2_on_0006_BistableRingPUF_inst[3]
-    
+
     ylim = (-0.04809600000000001, 1.049396)
-    
+
     """ Create the plot """
     fig_plot    = plot_S_j_by_j(lines, i2o_vals, i2o_avgs, sig_fig, leg1_pos="upper left", leg2_pos="center left", ylim=ylim, n_cols=3, font_size=glob_font_size, quarter_yticks=True)
-    fig_plot.savefig(sub_dir_plots + '{:02d}'.format(img_counter) + '_Test_2_on_0006_BistableRingPUF_inst.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    img_counter += 1
-    
-    
+    save_figure(fig_plot, path)
+
+
+def fig_0100_BistableRingPUF_box(data, path):
     """ Plot box-plot of S_j for 100 Bistable Ring PUF instances dependent on j.
         Add \overline{I2O} score for the 100 instances.
     """
     # k=1, i.e. first subselection [0]
-    S_j_bars    = Test_2_on_20_100_XORBistableRingPUF_inst[0][1]
-    S_js        = np.transpose(np.concatenate([Test_2_on_20_100_XORBistableRingPUF_inst[0][0]], axis=1))
-    i2o_avg     = Test_2_on_20_100_XORBistableRingPUF_inst[0][3]
-    
-    ylim = (-0.04809600000000001, 1.049396)
-    
-    fig_plot    = plot_S_j_by_j_box(S_js, i2o_avg, sig_fig, leg2_pos="upper left", ylim=ylim, font_size=glob_font_size, quarter_yticks=True, bbox_val=(.0,.88), S_j_bars=S_j_bars)
-    fig_plot.savefig(sub_dir_plots + '{:02d}'.format(img_counter) + '_Test_2_on_0100_BistableRingPUF_inst_box.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    img_counter += 1
-    
-    
-    """ 4-XOR Bistable Ring PUF """
-    
+    plot_S_j_box_sel(data.selection('Test_2_on_20_1000_XORBistableRingPUF_inst', 0, 100), path)
+
+
+""" 4-XOR Bistable Ring PUF """
+
+
+def fig_0006_4XORBistableRingPUF(data, path):
     """ Select 6 suitable 4-XOR Bistable Ring instances to plot """
     # k=4, i.e. first subselection [3]
-    Test_2_on_0006_4XORBistableRingPUF_inst = Test_2_on_20_100_XORBistableRingPUF_inst[3]
-    
-    lines    = Test_2_on_0006_4XORBistableRingPUF_inst[0][:6]
-    i2o_vals = Test_2_on_0006_4XORBistableRingPUF_inst[2][:6]
-    i2o_avgs = np.average(i2o_vals) 
-    
-    """ Order the selection according to descending I2O_1 scores """
-    sorted_list_vals = sorted(zip(lines, i2o_vals), key = lambda x: x[1], reverse=True)
-    lines            = [line for line, _   in sorted_list_vals]
-    i2o_vals         = [val  for _,    val in sorted_list_vals]
-    
-    ylim = (-0.04809600000000001, 1.049396)
-    
-    """ Create the plot """
-    fig_plot    = plot_S_j_by_j(lines, i2o_vals, i2o_avgs, sig_fig, leg1_pos="upper left", leg2_pos="center left", ylim=ylim, font_size=glob_font_size, quarter_yticks=True)
-    fig_plot.savefig(sub_dir_plots + '{:02d}'.format(img_counter) + '_Test_2_on_0006_4XORBistableRingPUF_inst.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    img_counter += 1
-    
-    
+    plot_S_j_sel(data.selection('Test_2_on_20_1000_XORBistableRingPUF_inst', 3, 100), 6, path)
+
+
+def fig_0100_4XORBistableRingPUF_box(data, path):
     """ Plot box-plot of S_j for 100 4-XOR Bistable Ring PUF instances dependent on j. """
     # k=4, i.e. first subselection [3]
-    S_j_bars    = Test_2_on_20_100_XORBistableRingPUF_inst[3][1]
-    S_js        = np.transpose(np.concatenate([Test_2_on_20_100_XORBistableRingPUF_inst[3][0]], axis=1))
-    i2o_avg     = Test_2_on_20_100_XORBistableRingPUF_inst[3][3]
-    
-    ylim = (-0.04809600000000001, 1.049396)
-    
-    fig_plot    = plot_S_j_by_j_box(S_js, i2o_avg, sig_fig, leg2_pos="upper left", ylim=ylim, font_size=glob_font_size, quarter_yticks=True, bbox_val=(.0,.88), S_j_bars=S_j_bars)
-    fig_plot.savefig(sub_dir_plots + '{:02d}'.format(img_counter) + '_Test_2_on_0100_4XORBistableRingPUF_inst_box.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    img_counter += 1
-    
+    plot_S_j_box_sel(data.selection('Test_2_on_20_1000_XORBistableRingPUF_inst', 3, 100), path)
+
+
+def fig_0100_kXORBistableRingPUF_I2O_dot(data, path):
     """ Plot of descending I2O_1 scores of 100 k-XOR Bistable Ring PUF instances for selected values of k
     """
-    
-    """ Order by descending I2O_1 socres and select ks """
-    Test_2_on_20_100_XORBistableRingPUF_inst_sorted = [sort_T2_return_by_I2O(*ele, order='decreasing') for ele in Test_2_on_20_100_XORBistableRingPUF_inst]
+
     # selection for k = 1, 2, 3, 5, 8, 12
     selection = [0, 1, 2, 4, 7, 11]
-    
+
+    """ Order by descending I2O_1 socres for the selected ks """
     lines = []
     for i in selection:
-        lines.append(Test_2_on_20_100_XORBistableRingPUF_inst_sorted[i][2])
-    
-    lines_desc = []
-    for i, val in enumerate(selection):
-        if 3 < i < 5:
-            lines_desc.append(r'$k = \phantom{0}$' + r'${}$'.format(val+1))
-        else:
-            lines_desc.append(r'$k = {}$'.format(val+1))
-    
+        lines.append(sort_T2_return_by_I2O(*data.selection('Test_2_on_20_1000_XORBistableRingPUF_inst', i, 100), order='decreasing')[2])
+
+    lines_desc = k_lines_desc(selection)
+
     pos_high = (64,21)
     pos_low  = (-64,-187)
-    annot_high = r'\begin{tabular}{l} $\mathrm{Largest} \; {\sf  I2O_{1}} \: \mathrm{Score}$ \\ $\mathrm{of} \; \mathrm{all} \; 100 \; \mathrm{instances} $  \end{tabular}'
-    annot_low  = r'\begin{tabular}{l} $\mathrm{Smallest} \; {\sf  I2O_{1}} \: \mathrm{Score}$ \\ $\mathrm{of} \; \mathrm{all} \; 100 \; \mathrm{instances} $  \end{tabular}'
-    
+
     ylim = (-0.07, .578180407)
-    
+
     fig_plot    = plot_inst_merit_desc_mult(lines, lines_desc, annot_high, annot_low, pos_high, pos_low, leg1_pos='upper right', ylim=ylim, n_cols=3, box_back=['#fcfcfc'], font_size=13)
-    fig_plot.savefig(sub_dir_plots + '{:02d}'.format(img_counter) + '_Test_2_on_0100_kXORBistableRingPUF_inst_I2O_dot.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    img_counter += 1
-    
-    
-    """ Produce \overline{I2O}_1 values used in the tables and write them to .txt files in the plot folder """
+    save_figure(fig_plot, path)
 
-    
+
+""" Produce \overline{I2O}_1 values used in the tables and write them to .txt files in the plot folder """
+
+
+def I2O_table(data, name, path):
+    """ Function to tabulate the \overline{I2O}_1 values of the first 10, 100 and all 1000 instances per k/l,
+        followed by the bootstrap confidence intervals over the instances of \overline{I2O}_1, the A2O_1 values
+        next to their bootstrap confidence intervals, and the uncertainty over the challenges (cf. uncertainty_funcs):
+
+        mean_inst_I2O_1_Cs_CI_half_width: half-width of the confidence interval over the challenges of each I2O_1(P),
+                                          averaged over all instances. The interval of an I2O_1(P) follows from the
+                                          Wilson score intervals of its n S_j(P)s (Bonferroni), hence the column stands
+                                          in for the per-S_j intervals, which are not tabulated; n/a if the number of
+                                          challenges per instance is unknown
+    """
+
+    bootstrap_cis   = [data.bootstrap_ci(name, n, no_resamples, ci_alpha) for n in [10, 100, 1000]]
+    binomial_cis    = data.binomial_ci(name, ci_alpha)
+
+    I2O_List = []
+    for k in range(data.no_groups(name)):
+        A2O_1s = [data.selection(name, k, 10)[4], data.selection(name, k, 100)[4], data.group(name, k)[4]]
+        I2O_List.append([f'{k+1:2d}', f'{data.selection(name, k, 10)[3]:.5f}',
+                         f'{data.selection(name, k, 100)[3]:.5f}',
+                         f'{data.group(name, k)[3]:.5f}'] +
+                        [f'[{I2O_1_avg_lower[k]:.5f}, {I2O_1_avg_upper[k]:.5f}]' for I2O_1_avg_lower, I2O_1_avg_upper, _, _ in bootstrap_cis] +
+                        [value for A2O_1, (_, _, A2O_1_lower, A2O_1_upper) in zip(A2O_1s, bootstrap_cis)
+                         for value in [f'{A2O_1:.5f}', f'[{A2O_1_lower[k]:.5f}, {A2O_1_upper[k]:.5f}]']] +
+                        [f'{np.average(binomial_cis[3][k] - binomial_cis[2][k]) / 2:.5f}' if binomial_cis is not None else 'n/a']
+                        )
+    I2O_table = tabulate(I2O_List, headers=['k', '10_inst_I2O', '100_inst_I2O', '1000_inst_I2O',
+                                            '10_inst_I2O_CI', '100_inst_I2O_CI', '1000_inst_I2O_CI',
+                                            '10_inst_A2O', '10_inst_A2O_CI', '100_inst_A2O', '100_inst_A2O_CI',
+                                            '1000_inst_A2O', '1000_inst_A2O_CI', 'mean_inst_I2O_1_Cs_CI_half_width'], tablefmt='psql', floatfmt=".5f")
+
+    save_table(I2O_table, path)
+
+
+def table_I2O_kXORArbiterPUF(data, path):
     """ k-XOR Arbiter PUF """
-    
-    kXORArbiterPUF_I2O_List = []
-    for k in range(20):
-        kXORArbiterPUF_I2O_List.append([f'{k+1:2d}', f'{Test_2_on_20_10_XORArbiterPUF_inst[k][3]:.5f}', 
-                                        f'{Test_2_on_20_100_XORArbiterPUF_inst[k][3]:.5f}', 
-                                        f'{Test_2_on_20_1000_XORArbiterPUF_inst[k][3]:.5f}']
-                                       )
-    kXORArbiter_I2O_table = tabulate(kXORArbiterPUF_I2O_List, headers=['k', '10_inst_I2O', '100_inst_I2O', '1000_inst_I2O'], tablefmt='psql', floatfmt=".5f")
-    
-    with open(sub_dir_plots + '{:02d}'.format(img_counter) + '_I2O_Values_kXORArbiterPUF.txt', 'wb') as target_file:
-        target_file.write(kXORArbiter_I2O_table.encode('utf-8'))
-    
-    img_counter += 1
+    I2O_table(data, 'Test_2_on_20_1000_XORArbiterPUF_inst', path)
 
-    
+
+def table_I2O_lLoopFFArbiterPUF(data, path):
     """ l Loop FF Arbiter PUF """
+    I2O_table(data, 'Test_2_on_10_1000_FFArbiterPUF_inst', path)
 
-    lLoopFFARbiterPUF_I2O_List = []
-    for k in range(10):
-        lLoopFFARbiterPUF_I2O_List.append([f'{k+1:2d}', f'{Test_2_on_10_10_FFArbiterPUF_inst[k][3]:.5f}', 
-                                           f'{Test_2_on_10_100_FFArbiterPUF_inst[k][3]:.5f}', 
-                                           f'{Test_2_on_10_1000_FFArbiterPUF_inst[k][3]:.5f}']
-                                          )
-    lLoopFFArbiter_I2O_table = tabulate(lLoopFFARbiterPUF_I2O_List, headers=['k', '10_inst_I2O', '100_inst_I2O', '1000_inst_I2O'], tablefmt='psql', floatfmt=".5f")
-    
-    with open(sub_dir_plots + '{:02d}'.format(img_counter) + '_I2O_Values_lLoopFFArbiterPUF.txt', 'wb') as target_file:
-        target_file.write(lLoopFFArbiter_I2O_table.encode('utf-8'))
-    
-    img_counter += 1
-    
-    
+
+def table_I2O_kXORBistableRingPUF(data, path):
     """ k-XOR Bistable Ring PUF """
+    I2O_table(data, 'Test_2_on_20_1000_XORBistableRingPUF_inst', path)
+
+
+""" Figures and tables in the order of the paper (img_counter = position + 1) with the names of their files and the simulations they use """
+FIGURES = [('Test_2_on_0008_ArbiterPUF_inst.png',                    fig_0008_ArbiterPUF,                     ['Test_2_on_0008_ArbiterPUF_inst']),
+           ('Test_2_on_0100_ArbiterPUF_inst_box.png',                fig_0100_ArbiterPUF_box,                 ['Test_2_on_20_1000_XORArbiterPUF_inst']),
+           ('Test_2_on_0008_2XORArbiterPUF_inst.png',                fig_0008_2XORArbiterPUF,                 ['Test_2_on_20_1000_XORArbiterPUF_inst']),
+           ('Test_2_on_0100_2XORArbiterPUF_inst_box.png',            fig_0100_2XORArbiterPUF_box,             ['Test_2_on_20_1000_XORArbiterPUF_inst']),
+           ('Test_2_on_0008_3XORArbiterPUF_inst.png',                fig_0008_3XORArbiterPUF,                 ['Test_2_on_20_1000_XORArbiterPUF_inst']),
+           ('Test_2_on_0100_3XORArbiterPUF_inst_box.png',            fig_0100_3XORArbiterPUF_box,             ['Test_2_on_20_1000_XORArbiterPUF_inst']),
+           ('Test_2_on_0100_kXORArbiterPUF_inst_I2O_dot.png',        fig_0100_kXORArbiterPUF_I2O_dot,         ['Test_2_on_20_1000_XORArbiterPUF_inst']),
+           ('Test_2_on_0008_FFArbiterPUF_inst.png',                  fig_0008_FFArbiterPUF,                   ['Test_2_on_0008_FFArbiterPUF_inst']),
+           ('Test_2_on_0100_FFArbiterPUF_inst_box.png',              fig_0100_FFArbiterPUF_box,               ['Test_2_on_10_1000_FFArbiterPUF_inst']),
+           ('Test_2_on_0100_lLoopFFArbiterPUFs_inst_dot.png',        fig_0100_lLoopFFArbiterPUFs_dot,         ['Test_2_on_10_1000_FFArbiterPUF_inst']),
+           ('Test_2_on_0006_BistableRingPUF_inst.png',               fig_0006_BistableRingPUF,                ['Test_2_on_0006_BistableRingPUF_inst']),
+           ('Test_2_on_0100_BistableRingPUF_inst_box.png',           fig_0100_BistableRingPUF_box,            ['Test_2_on_20_1000_XORBistableRingPUF_inst']),
+           ('Test_2_on_0006_4XORBistableRingPUF_inst.png',           fig_0006_4XORBistableRingPUF,            ['Test_2_on_20_1000_XORBistableRingPUF_inst']),
+           ('Test_2_on_0100_4XORBistableRingPUF_inst_box.png',       fig_0100_4XORBistableRingPUF_box,        ['Test_2_on_20_1000_XORBistableRingPUF_inst']),
+           ('Test_2_on_0100_kXORBistableRingPUF_inst_I2O_dot.png',   fig_0100_kXORBistableRingPUF_I2O_dot,    ['Test_2_on_20_1000_XORBistableRingPUF_inst']),
+           ('I2O_Values_kXORArbiterPUF.txt',                         table_I2O_kXORArbiterPUF,                ['Test_2_on_20_1000_XORArbiterPUF_inst']),
+           ('I2O_Values_lLoopFFArbiterPUF.txt',                      table_I2O_lLoopFFArbiterPUF,             ['Test_2_on_10_1000_FFArbiterPUF_inst']),
+           ('I2O_Values_kXORBistableRingPUF.txt',                    table_I2O_kXORBistableRingPUF,           ['Test_2_on_20_1000_XORBistableRingPUF_inst'])]
+
+
+def select_figures(selection):
+    """ Function to select figures by their numbers or (parts of) their file names
+
+        selection:      list of strings - e.g. ['7', 'FFArbiterPUF'], None for all figures
+
+        img_counters:   list of int     - numbers of the selected figures, ascending
+    """
+
+    if not selection:
+        return list(range(1, len(FIGURES) + 1))
+
+    img_counters = set()
+    for item in selection:
+        matches = [c for c, (file_name, _, _) in enumerate(FIGURES, start=1) if (item.isdigit() and int(item) == c) or (not item.isdigit() and item in file_name)]
+        if not matches:
+            raise ValueError(f'No figure matches {item!r}, expected a number in 1..{len(FIGURES)} or a part of a file name.')
+        img_counters.update(matches)
+
+    return sorted(img_counters)
+
+
+def output_path(img_counter):
+    """ Function to determine the path of a figure or table """
+
+    return sub_dir_plots + '{:02d}'.format(img_counter) + '_' + FIGURES[img_counter - 1][0]
 
-    kXORBistableRingPUF_I2O_List = []
-    for k in range(20):
-        kXORBistableRingPUF_I2O_List.append([f'{k+1:2d}', f'{Test_2_on_20_10_XORBistableRingPUF_inst[k][3]:.5f}', 
-                                             f'{Test_2_on_20_100_XORBistableRingPUF_inst[k][3]:.5f}', 
-                                             f'{Test_2_on_20_1000_XORBistableRingPUF_inst[k][3]:.5f}']
-                                            )
-    kXORArbiter_I2O_table = tabulate(kXORBistableRingPUF_I2O_List, headers=['k', '10_inst_I2O', '100_inst_I2O', '1000_inst_I2O'], tablefmt='psql', floatfmt=".5f")
-    
-    with open(sub_dir_plots + '{:02d}'.format(img_counter) + '_I2O_Values_kXORBistableRingPUF.txt', 'wb') as target_file:
-        target_file.write(kXORArbiter_I2O_table.encode('utf-8'))
-    
-    img_counter += 1
 
+""" Modules computing the plotted values, whose files are part of the dependencies of each output as a whole """
+CODE_MODULES = ['aux_funcs.plot_funcs', 'aux_funcs.data_funcs', 'aux_funcs.index_funcs', 'aux_funcs.uncertainty_funcs']
+
+
+def output_dependencies(img_counter, simulation_digests, files):
+    """ Function to determine the dependencies of a figure or table: the content hashes of the simulations it uses
+        and of the code creating it, i.e. of its figure function and the helpers it calls, of the parameters they
+        read, of the modules in CODE_MODULES and of the functions of aux_funcs these import (cf. manifest_funcs.code_digests)
+
+        img_counter:        int         - number of the figure, cf. FIGURES
+        simulation_digests: dict        - content hash per simulation, cf. manifest_funcs.input_digest
+        files:              dict        - entries of known files, cf. manifest_funcs.file_digest
+
+        dependencies:       dict        - 'inputs' and 'code', cf. manifest_funcs.stale_outputs
+    """
+
+    _, create_figure, simulations = FIGURES[img_counter - 1]
+
+    return {'inputs': {name: simulation_digests[name] for name in simulations},
+            'code':   code_digests([create_figure, simulation_data], CODE_MODULES, files)}
+
+
+def render_figure(img_counter):
+    """ Function to create one figure or table, i.e. one job of a worker (the simulations are loaded once per worker)
+
+        img_counter:    int             - number of the figure, cf. FIGURES
+    """
+
+    _, create_figure, _ = FIGURES[img_counter - 1]
+    create_figure(simulation_data(sub_dir_simulation), output_path(img_counter))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    # Default: Create all figures and tables, otherwise those given by their numbers or (parts of) their file names,
+    # e.g. --figures 7 FFArbiterPUF
+    parser.add_argument('--figures', nargs='+', default=None, type=str)
+    # Default: Render the figures on all cores, one figure per job
+    parser.add_argument('--cpus', default=max(1,no_cpu), type=int, choices=range(1, no_cpu+1))
+    # Default: Only rebuild the figures and tables whose simulations or code (their figure functions, helpers and parameters,
+    # and the modules computing the plotted values) changed since the last run (cf. plots/manifest.json), --force rebuilds all selected ones
+    parser.add_argument('--force', action='store_true')
+
+    args = parser.parse_args()
+    try:
+        img_counters = select_figures(args.figures)
+    except ValueError as err:
+        parser.error(str(err))
+
+    """ Load simulations from the simulation folder on first use. The stores written by run_simulations.py are
+        memory-mapped, pickled result files of earlier versions are converted to stores once, before the
+        figures are distributed to the workers.
+    """
+    data        = simulation_data(sub_dir_simulation)
+    simulations = sorted({name for img_counter in img_counters for name in FIGURES[img_counter - 1][2]})
+    for name in simulations:
+        """ The figures show independent instances, k-XOR PUFs derived from shared chains (cf. pool_funcs) differ from them """
+        if 'chain_pool' in data.store(name)[2]:
+            parser.error(f'{name} holds k-XOR PUFs derived in chain-pool mode (cf. run_simulations.py --chain-pool), not independent instances.')
+
+    """ Determine the outputs whose dependencies changed since they were built (cf. manifest_funcs) """
+    manifest            = load_manifest(manifest_path)
+    simulation_digests  = {name: input_digest(store_path(sub_dir_simulation + name), manifest['files']) for name in simulations}
+    dependencies        = {output_path(img_counter): output_dependencies(img_counter, simulation_digests, manifest['files']) for img_counter in img_counters}
+    
+    stale = stale_outputs(manifest, dependencies) if not args.force else {output: 'forced' for output in dependencies}
+    for output, reason in stale.items():
+        print(f'Building {output} ({reason})')
+    print(f'{len(stale)} of {len(img_counters)} figures and tables out of date')
+    
+    """ Each figure is an independent job, the outputs do not depend on the order or the worker.
+        img_counter: track order of plots
+    """
+    stale_counters = [img_counter for img_counter in img_counters if output_path(img_counter) in stale]
+    joblib.Parallel(n_jobs=max(1, min(args.cpus, len(stale_counters))))(joblib.delayed(render_figure)(img_counter) for img_counter in stale_counters)
+    
+    """ Record the dependencies of the built outputs """
+    for output in stale:
+        manifest['outputs'][output] = dependencies[output]
+    save_manifest(manifest_path, manifest)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+""" Python Version: 3.8.13
+    pypuf Version:  3.2.1
+    Also cf. requirements_full.txt
+"""
+
+import os
+
+abspath = os.path.abspath(__file__)
+dname = os.path.dirname(abspath)
+os.chdir(dname)
+
+from aux_funcs.benchmark_funcs import BENCH_FUNCS, BENCH_FAMILIES, benchmark_grid, run_benchmark_case_isolated, case_id, \
+                                      run_info, load_history, save_history, find_baseline, compare_results
+
+import sys
+import argparse
+
+sub_dir_benchmarks  = './benchmarks/'
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    # Default: Time all functions for all PUF families
+    parser.add_argument('--funcs', nargs='+', default=BENCH_FUNCS, choices=BENCH_FUNCS)
+    parser.add_argument('--families', nargs='+', default=BENCH_FAMILIES, choices=BENCH_FAMILIES)
+    # Default: n = 64, N = 10^4, k (no. of loops for FF) in {1, 4}, 1 core and 8 instances for Test 2
+    parser.add_argument('--n', nargs='+', default=[64], type=int)
+    parser.add_argument('--N', nargs='+', default=[10000], type=int)
+    parser.add_argument('--k', nargs='+', default=[1, 4], type=int)
+    parser.add_argument('--n-jobs', nargs='+', default=[1], type=int)
+    parser.add_argument('--r', default=8, type=int)
+    parser.add_argument('--engine', default='auto', choices=['auto', 'loop', 'batched', 'cumsum', 'br', 'ff'])
+    # Default: Report the best time of 3 repetitions per case
+    parser.add_argument('--repeat', default=3, type=int)
+    # Optional: Label of the run in the history, e.g. the name of a change
+    parser.add_argument('--label', default=None, type=str)
+    parser.add_argument('--history', default=sub_dir_benchmarks + 'history.json', type=str)
+    # Optional: Compare to the latest run (or the latest run with the given label/commit) in the history,
+    # cases slower by more than the factor --threshold are reported as regressions (exit code 1)
+    parser.add_argument('--compare', nargs='?', const='', default=None, type=str)
+    parser.add_argument('--threshold', default=1.1, type=float)
+    # Optional: Do not append the run to the history
+    parser.add_argument('--no-save', action='store_true')
+
+    args = parser.parse_args()
+
+    cases = benchmark_grid(args.funcs, args.families, args.n, args.N, args.k, args.n_jobs, args.r, args.engine, args.repeat)
+
+    """ Run each case in a fresh process and report its throughput and peak RSS """
+    results = []
+    for c, case in enumerate(cases):
+        result = run_benchmark_case_isolated(case)
+        results.append(result)
+        print(f'[{c+1}/{len(cases)}] {case_id(result)}: {result["seconds"]:.3f} s, '
+              f'{result["evals_per_s"]:.3e} evals/s, peak RSS {result["peak_rss_mb"]:.0f} MB', flush=True)
+
+    history = load_history(args.history)
+
+    """ Compare to the baseline before the run is added to the history """
+    regressions = []
+    if args.compare is not None:
+        baseline = find_baseline(history, args.compare or None)
+        if baseline is None:
+            print(f'No baseline run {args.compare!r} found in {args.history}.')
+        else:
+            print(f'\nComparison to {baseline["info"]["label"] or baseline["info"]["commit"]} ({baseline["info"]["time"]}):')
+            for cid, seconds, base_seconds, ratio, regression in compare_results(results, baseline['results'], args.threshold):
+                print(f'{cid}: {base_seconds:.3f} s -> {seconds:.3f} s ({ratio:.2f}x)' + (' REGRESSION' if regression else ''))
+                if regression:
+                    regressions.append(cid)
+
+    if not args.no_save:
+        history.append({'info': run_info(args.label), 'results': results})
+        save_history(args.history, history)
+
+    sys.exit(1 if regressions else 0)
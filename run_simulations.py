@@ -8,26 +8,31 @@
 
 import os
 
+cwd = os.getcwd()
 abspath = os.path.abspath(__file__)
 dname = os.path.dirname(abspath)
 os.chdir(dname)
 
-from aux_funcs.simulation_funcs import T2_1_bflip_r_inst, produce_loop_structure
-
+from aux_funcs.simulation_funcs import T2_1_bflip_r_inst_noisy
+from aux_funcs.schedule_funcs import T2_1_bflip_sched
+from aux_funcs.bitpack_funcs import random_inputs_packed
+from aux_funcs.challenge_funcs import ChallengeStream
+from aux_funcs.storage_funcs import store_path, save_T2_store
+from aux_funcs.spec_funcs import build_puf_instance
+from aux_funcs.pool_funcs import T2_1_bflip_chain_pool
+from aux_funcs.population_funcs import is_stackable, T2_1_bflip_population
+from aux_funcs.profile_funcs import MEMORY_BACKENDS, Profiler, profile_phase
+from aux_funcs.progress_funcs import ProgressReporter, progress_context, run_reported
+from aux_funcs.config_funcs import load_config, plan_experiments, challenge_sets, challenge_set, estimate_plan, print_plan
+
+import sys
 import argparse
 import pickle
 import joblib
 from pathlib import Path
-from functools import partial
-
-from numpy.random import default_rng
 
-from pypuf.simulation import XORArbiterPUF, FeedForwardArbiterPUF, XORBistableRingPUF
 from pypuf.io import random_inputs
 
-sub_dir_simulation  = './simulations/'
-Path(sub_dir_simulation).mkdir(parents=True, exist_ok=True)
-
 # Get no. of cores available:
 no_cpu = joblib.cpu_count()
 
@@ -36,138 +41,201 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     # Default: Use all cores for simulation
     parser.add_argument('--cpus', default=max(1,no_cpu), type=int, choices=range(1, no_cpu+1))
-    # Default: Use 10^5 challenges
-    parser.add_argument('--challenges', default=100000, type=int)
+    # Default: Evaluate the experiments of experiments.json in the repository (cf. aux_funcs/config_funcs.py),
+    # otherwise those of the given config (relative to the current directory)
+    parser.add_argument('--config', default=None, type=str)
+    # Default: Use the no. of challenges of the config (10^5), if given for all experiments
+    parser.add_argument('--challenges', default=None, type=int)
+    # Default: Select the fastest applicable Test 1 engine per PUF instance
+    parser.add_argument('--engine', default='auto', choices=['auto', 'loop', 'batched', 'cumsum', 'br', 'ff'])
+    # Optional: Hold the challenges in the bit-packed representation (one uint64 per challenge)
+    # or generate them chunk by chunk in each worker (constant memory regardless of --challenges)
+    challenge_repr = parser.add_mutually_exclusive_group()
+    challenge_repr.add_argument('--packed', action='store_true')
+    challenge_repr.add_argument('--stream', action='store_true')
+    # Default: Chunks of 2^16 challenges when streaming
+    parser.add_argument('--chunk-size', default=2**16, type=int)
+    # Optional: Stop early per instance once the confidence intervals (S_j or I2O_1) have at most this half-width
+    parser.add_argument('--tolerance', default=None, type=float)
+    parser.add_argument('--target', default='S_j', choices=['S_j', 'I2O_1'])
+    # Default: One task per PUF instance, more chunks split the bit positions of an instance into several tasks
+    parser.add_argument('--bit-chunks', default=1, type=int)
+    # Optional: Skip the tasks whose results were already stored as shards by a previous (interrupted) run
+    parser.add_argument('--resume', action='store_true')
+    # Optional: Reuse the results of instances evaluated on the same challenges by earlier runs,
+    # keeping the cache (relative to the current directory) below --cache-size MB by evicting the least recently used results
+    parser.add_argument('--cache-dir', default=None, type=str)
+    parser.add_argument('--cache-size', default=1024, type=int)
+    # Optional: Derive the k-XOR PUFs of #04 and #06 for all k from the chains of r pools of 20-XOR PUFs
+    parser.add_argument('--chain-pool', action='store_true')
+    # Optional: Evaluate each group of (XOR) Arbiter/Bistable Ring PUF instances as one population (stacked weights)
+    parser.add_argument('--population', action='store_true')
+    # Optional: Additionally evaluate the instances of #01 and #02 with this noisiness, each challenge --repetitions times,
+    # the repeated responses aggregated by majority vote or weighted by their reliability
+    parser.add_argument('--noisiness', default=0, type=float)
+    parser.add_argument('--repetitions', default=11, type=int)
+    parser.add_argument('--aggregation', default='majority', choices=['majority', 'reliability'])
+    # Optional: Record wall/CPU time, evaluations per second and peak memory (measured with the given backend, default rss)
+    # per phase, experiment and k/l in simulations/profile_<run>.json/.csv
+    parser.add_argument('--profile', nargs='?', const='rss', default=None, choices=MEMORY_BACKENDS)
+    # Optional: Report the progress per experiment and k/l with the throughput and the estimated remaining time
+    # at most every given no. of seconds (default 60)
+    parser.add_argument('--progress', nargs='?', const=60., default=None, type=float)
+    # Optional: Only print the plan, i.e. the experiments with their no. of instances (evaluated once if shared)
+    # and the wall time estimated from Test 1 on the first instance of each group for --calibration challenges
+    parser.add_argument('--dry-run', action='store_true')
+    parser.add_argument('--calibration', default=2000, type=int)
 
     args = parser.parse_args()
+    if args.chain_pool and args.tolerance is not None:
+        parser.error('--chain-pool evaluates all challenges and cannot be combined with --tolerance')
+    if args.population and args.tolerance is not None:
+        parser.error('--population evaluates all challenges and cannot be combined with --tolerance')
     parallel_jobs = args.cpus
     no_challenges = args.challenges
-
-    """ Choose challenge length 64 and create the challenges. """
-    n_bits = 64
-    # Use seed for challenge creation
-    Challenges_C = random_inputs(n=n_bits, N=no_challenges, seed=1)
-    
-    """ The first three simulations are expected to be fast, while the
-        last three are rather extensive - they will be used to create
-        smaller subsets of simulations for the graphics shown in the paper.
-    """
-    
-    
-    """ #01 Test 2 on 8 ArbiterPUF instances """
-    r = 8
-    # Use Partial to later only adapt ArbiterPUF
-    Puf_Func = partial(XORArbiterPUF, n=n_bits, k=1, noisiness=0)
-    
-    # Use seed to allow for reproducibility
-    instances = [Puf_Func(seed=i) for i in range(r)]
-    
-    Test_2_on_0008_ArbiterPUF_inst = T2_1_bflip_r_inst(instances, Challenges_C, parallel_jobs)
-    
-    with open(sub_dir_simulation + 'Test_2_on_0008_ArbiterPUF_inst', 'wb') as target_file:
-        pickle.dump(Test_2_on_0008_ArbiterPUF_inst, target_file)
-
-
-    """ #02 Test 2 on 8 FFArbiterPUF instances """
-    r = 8
-    # Use Partial to later only adapt FFArbiterPUF
-    feed_forwards = [(6, 15), (14, 23), (22, 31), (30, 39), (38,47), (46, 55), (54, 63), (62, 71)]
-    Puf_Func = partial(FeedForwardArbiterPUF, n=n_bits, ff=feed_forwards, noisiness=0)
-    
-    # Use seed to allow for reproducibility
-    instances = [Puf_Func(seed=i) for i in range(r)]
-    
-    Test_2_on_0008_FFArbiterPUF_inst = T2_1_bflip_r_inst(instances, Challenges_C, parallel_jobs)
-    
-    with open(sub_dir_simulation + 'Test_2_on_0008_FFArbiterPUF_inst', 'wb') as target_file:
-        pickle.dump(Test_2_on_0008_FFArbiterPUF_inst, target_file)
-
-
-    """ #03 Test 2 on 6 BistableRingPUF instances """
-    r = 6
-    # Use Partial to later only adapt BistableRingPUF
-    Puf_Func = partial(XORBistableRingPUF, n=n_bits, k=1)
-    
-    # Use seed to allow for reproducibility
-    instances = [Puf_Func(weights=default_rng(i).normal(size=(1, n_bits+1))) for i in range(r)]
-
-    Test_2_on_0006_BistableRingPUF_inst = T2_1_bflip_r_inst(instances, Challenges_C, parallel_jobs)
-    
-    with open(sub_dir_simulation + 'Test_2_on_0006_BistableRingPUF_inst', 'wb') as target_file:
-        pickle.dump(Test_2_on_0006_BistableRingPUF_inst, target_file)
-    
-    
-    """ #04 Test 2 on 20*1000 k-XORArbiterPUF instances """
-    r = 1000
-    # Use Partial to later only adapt further properties
-    Puf_Func = partial(XORArbiterPUF, n=n_bits, noisiness=0)
-    
-    """ Create a list of lists of instances. Outer list indexed by k,
-        inner contains the results for the r=1000 instances.
-    """
-    instances_in_k = [[Puf_Func(k=k, seed=i) for i in range(r)] for k in range(1,20+1)]
-
-    Test_2_on_20_1000_XORArbiterPUF_inst = []
-    for _, instances in enumerate(instances_in_k):
-        Test_2_on_20_1000_XORArbiterPUF_inst.append(T2_1_bflip_r_inst(instances, Challenges_C, parallel_jobs))
-    
-    with open(sub_dir_simulation + 'Test_2_on_20_1000_XORArbiterPUF_inst', 'wb') as target_file:
-        pickle.dump(Test_2_on_20_1000_XORArbiterPUF_inst, target_file)
-    
-    
-    """ #05 Test 2 on 12*1000 FFArbiterPUF instances with different loop_structure"""
-    r = 1000
-    """ For the above example with loop structure
-        feed_forwards = [(6, 15), (14, 23), (22, 31), (30, 39), (38,47), (46, 55), (54, 63), (62, 71)]
-        the last loop determines stage 72, hence it ends after 71.
-        
-        Since all loops are required to have the same length, the length of the last loop determines the length.
-        
-        All previous loops are required to overlap with their respective next loop by 1.
-        
-        Hence we provide a tuple comprising of the last loop and the number of loops in total in last_loops_no below.
+    engine        = args.engine
+    packed        = args.packed
+    stream        = args.stream
+    chunk_size    = args.chunk_size
+    tolerance     = args.tolerance
+    target        = args.target
+    bit_chunks    = args.bit_chunks
+    resume        = args.resume
+    cache_dir     = os.path.join(cwd, args.cache_dir) if args.cache_dir is not None else None
+    cache_size    = args.cache_size
+    chain_pool    = args.chain_pool
+    population    = args.population
+    noisiness     = args.noisiness
+    repetitions   = args.repetitions
+    aggregation   = args.aggregation
+    profiler      = Profiler(args.profile) if args.profile is not None else None
+    progress      = args.progress
+    dry_run       = args.dry_run
+
+    """ The experiments are described in the config (cf. config_funcs and experiments.json): the first three
+        simulations are expected to be fast, while the last three are rather extensive - they will be used
+        to create smaller subsets of simulations for the graphics shown in the paper.
         
-        From these we construct the individual loop structures examined using the produce_loop_structure function.
+        All experiments are first expanded and then evaluated together with a single task queue per challenge
+        set (cf. T2_1_bflip_sched), such that no cores idle between the experiments or the values of k/l within
+        an experiment, and instances occurring in several experiments are evaluated once.
+        The instances are given by their specs (cf. spec_funcs), which are sent to the workers instead of the
+        instances themselves. experiments collects the groups of instances of each experiment (one group per
+        value of k/l), names the corresponding output files, single whether the experiment consists of a single
+        group only, metas the PUF type, parameters and seeds stored with the results and pools the pool instances
+        of experiments in chain-pool mode (cf. pool_funcs), which are evaluated separately (their experiments
+        have no groups).
     """
-    last_loops_no = [((65,73),10), ((64,72),9), ((62,71),8), ((60,70),7), ((57,69),6), ((54,68),5), ((50,67),4), ((44,66),3), ((33,65),2), ((2,64),1)]
-    last_loops_no.reverse()
-    
-    loops_in_l = [produce_loop_structure(ele) for ele in last_loops_no]
-    
-    """ Create a list of lists of instances. Outer list indexed by l, starting with 1,
-        inner contains the r=1000 instances.
+    config  = load_config(os.path.join(cwd, args.config) if args.config is not None else 'experiments.json')
+    plan    = plan_experiments(config, chain_pool, no_challenges)
+    
+    experiments = [expanded['groups'] for expanded in plan]
+    names       = [expanded['name'] for expanded in plan]
+    single      = [expanded['single'] for expanded in plan]
+    metas       = [expanded['meta'] for expanded in plan]
+    pools       = [expanded['pool'] for expanded in plan]
+    
+    sub_dir_simulation = os.path.join(config['output_dir'], '')
+    Path(sub_dir_simulation).mkdir(parents=True, exist_ok=True)
+    
+    """ Print the plan with the estimated wall times (from a calibration run per group) without evaluating it """
+    if dry_run:
+        print_plan(plan, estimate_plan(plan, engine, parallel_jobs, args.calibration, noisiness, repetitions))
+        sys.exit(0)
+    
+    """ Create each challenge set once """
+    sets = challenge_sets(plan)
+    Challenges_sets = {}
+    # Use seed for challenge creation
+    with profile_phase(profiler, 'challenges'):
+        for n_bits, N_set, challenge_seed in sets:
+            if packed:
+                Challenges_C = random_inputs_packed(n=n_bits, N=N_set, seed=challenge_seed)
+            elif stream:
+                Challenges_C = ChallengeStream(n=n_bits, N=N_set, seed=challenge_seed, chunk_size=chunk_size)
+            else:
+                Challenges_C = random_inputs(n=n_bits, N=N_set, seed=challenge_seed)
+            Challenges_sets[(n_bits, N_set, challenge_seed)] = Challenges_C
+    Challenges_exps = [Challenges_sets[challenge_set(expanded)] for expanded in plan]
+    
+    
+    """ In population mode, the groups of all experiments whose instances can be stacked (cf. population_funcs)
+        are evaluated as populations, one group after the other, instead of in the task queue.
     """
-    instances_in_l = []
-    for l in range(len(loops_in_l)):
-        feed_forwards   = loops_in_l[l]
-        # Use Partial to later only adapt further properties
-        Puf_Func        = partial(FeedForwardArbiterPUF, n=n_bits, ff=feed_forwards, noisiness=0)
-        instances       = [Puf_Func(seed=i) for i in range(r)]
-        
-        instances_in_l.append(instances)
-
-    Test_2_on_10_1000_FFArbiterPUF_inst = []
-    for _, instances in enumerate(instances_in_l):
-        Test_2_on_10_1000_FFArbiterPUF_inst.append(T2_1_bflip_r_inst(instances, Challenges_C, parallel_jobs))
-    
-    with open(sub_dir_simulation + 'Test_2_on_10_1000_FFArbiterPUF_inst', 'wb') as target_file:
-        pickle.dump(Test_2_on_10_1000_FFArbiterPUF_inst, target_file)
+    populations = [None] * len(experiments)
+    if population:
+        for e, groups in enumerate(experiments):
+            if groups and all(is_stackable(instances) for instances in groups):
+                populations[e]  = groups
+                experiments[e]  = []
     
     
-    """ #06 Test 2 on 20*1000 k-XORBistableRingPUF instances """
-    r = 1000
-    # Use Partial to later only adapt further properties
-    Puf_Func = partial(XORBistableRingPUF, n=n_bits)
-
-    """ Create a list of lists of instances. Outer list indexes by k,
-        inner contains the r=1000 instances.
+    """ The result of each task is stored as a shard as soon as it is finished, together with the key of
+        the task (instance, challenges, sampling, cf. storage_funcs.shard_key). Only shards of the same
+        tasks are resumed, shards of edited experiments (grid, seeds) are recomputed.
     """
-    instances_in_k = [[Puf_Func(k=k, weights=default_rng(i).normal(size=(k, n_bits+1))) for i in range((k-1)*r,k*r)] for k in range(1,20+1)]
-
-    Test_2_on_20_1000_XORBistableRingPUF_inst = []
-    for _, instances in enumerate(instances_in_k):
-        Test_2_on_20_1000_XORBistableRingPUF_inst.append(T2_1_bflip_r_inst(instances, Challenges_C, parallel_jobs))
-    
-    with open(sub_dir_simulation + 'Test_2_on_20_1000_XORBistableRingPUF_inst', 'wb') as target_file:
-        pickle.dump(Test_2_on_20_1000_XORBistableRingPUF_inst, target_file)
-
+    tol_id = f'_tol{tolerance}_{target}' if tolerance is not None else ''
+    run_id = f'N{no_challenges or config["N"]}' + tol_id
+    shard_dirs = [sub_dir_simulation + 'shards/' + f'N{expanded["N"]}' + tol_id + '/' + expanded['name'] for expanded in plan]
+    
+    """ Progress is reported per experiment and group, labelled by k or the number of loops l """
+    group_labels = {(e, g): f'#{e+1:02d} ' + (f'k={params["k"]}' if 'k' in params else f'l={len(params["ff"])}')
+                    for e, meta in enumerate(metas) for g, params in enumerate(meta['params'])}
+    
+    """ Evaluate all experiments on the same challenges with a single task queue, longest tasks first """
+    Test_2_exps = [[] for _ in plan]
+    no_Cs_exps  = [[] for _ in plan]
+    for key, exps in sets.items():
+        reporter = ProgressReporter(group_labels, parallel_jobs, progress) if progress is not None else None
+        Test_2_set, no_Cs_set = T2_1_bflip_sched([groups if e in exps else [] for e, groups in enumerate(experiments)], Challenges_sets[key], parallel_jobs, engine, bit_chunks,
+                                                 tolerance, target, shard_dirs, resume, cache_dir, cache_size * 2**20, profiler, reporter)
+        for e in exps:
+            Test_2_exps[e], no_Cs_exps[e] = Test_2_set[e], no_Cs_set[e]
+    
+    """ Evaluate the experiments in chain-pool mode, all k at once per pool instance """
+    for e, pool in enumerate(pools):
+        if pool is not None:
+            with profile_phase(profiler, 'chain_pool', e, no_evals=len(pool) * plan[e]['N'] * (plan[e]['n'] + 1)):
+                Test_2_exps[e] = T2_1_bflip_chain_pool(pool, Challenges_exps[e], parallel_jobs)
+    
+    """ Evaluate the experiments in population mode, each group with a few large array operations per core """
+    reporter = ProgressReporter(group_labels, 1, progress) if progress is not None else None
+    population_tasks = {(e, g): reporter.add_task((e, g), len(instances) * instances[0].get('k', 1), len(instances))
+                        for e, groups in enumerate(populations) if (groups is not None and reporter is not None) for g, instances in enumerate(groups)}
+    with progress_context(reporter):
+        for e, groups in enumerate(populations):
+            if groups is not None:
+                Test_2_exps[e] = []
+                for g, instances in enumerate(groups):
+                    report = reporter.callback(population_tasks[(e, g)]) if reporter is not None else None
+                    with profile_phase(profiler, 'population', e, g, no_evals=len(instances) * plan[e]['N'] * (plan[e]['n'] + 1)):
+                        Test_2_exps[e].append(run_reported(T2_1_bflip_population, report, instances, Challenges_exps[e], parallel_jobs))
+    
+    """ Evaluate the instances of the noisy experiments (#01 and #02) with noise, relative to the aggregated noisy responses.
+        The stores hold two groups, the results relative to the noisy responses and those of the noise-free instances.
+    """
+    if noisiness > 0:
+        for e in [e for e, expanded in enumerate(plan) if expanded['noisy']]:
+            instances = [build_puf_instance(dict(spec, noisiness=noisiness)) for spec in (populations[e] or experiments[e])[0]]
+            
+            with profile_phase(profiler, 'noisy', len(Test_2_exps), no_evals=len(instances) * plan[e]['N'] * (plan[e]['n'] + 1) * repetitions):
+                Test_2_exps.append(list(T2_1_bflip_r_inst_noisy(instances, Challenges_exps[e], repetitions, aggregation, parallel_jobs, engine)))
+            names.append(names[e] + f'_noisy{noisiness}_m{repetitions}_{aggregation}')
+            single.append(False)
+            metas.append(dict(metas[e], groups=['noisy', 'noise-free'], noisiness=noisiness, repetitions=repetitions, aggregation=aggregation))
+            plan.append(plan[e])
+    
+    """ Merge the shards into one store per experiment (cf. storage_funcs), as read by create_plots.py """
+    for e, (name, is_single, meta, Test_2_exp) in enumerate(zip(names, single, metas, Test_2_exps)):
+        meta = dict(meta, n=plan[e]['n'], N=plan[e]['N'], challenge_seed=plan[e]['challenge_seed'], tolerance=tolerance, target=target)
+        with profile_phase(profiler, 'store', e):
+            save_T2_store(store_path(sub_dir_simulation + name), Test_2_exp[0] if is_single else Test_2_exp, meta)
+    
+    # Numbers of challenges used per instance (list in k/l of lists) in case of sequential sampling
+    if tolerance is not None:
+        no_Cs_used = dict(zip(names, no_Cs_exps))
+        with open(sub_dir_simulation + 'No_challenges_used', 'wb') as target_file:
+            pickle.dump(no_Cs_used, target_file)
+    
+    if profiler is not None:
+        profiler.save(sub_dir_simulation + 'profile_' + run_id, names)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+""" Equivalence of the Test 1 engines with the reference evaluation of pypuf, i.e. one eval call per
+    flipped bit position on a copy of the challenges (cf. simulation_funcs.det_no_resp_flips).
+    Run from the root of the repository with: python -m pytest
+"""
+
+import numpy as np
+import pytest
+
+from pypuf.io import random_inputs
+
+from aux_funcs.spec_funcs import puf_spec, build_puf_instance
+from aux_funcs.simulation_funcs import det_no_resp_flips_all
+from aux_funcs.bitpack_funcs import random_inputs_packed
+from aux_funcs.challenge_funcs import ChallengeStream
+
+
+n           = 64
+N           = 500
+SEEDS       = [0, 1, 2]
+FF_LOOPS    = [(6, 15), (14, 23), (22, 31), (30, 39), (38, 47), (46, 55), (54, 63), (62, 71)]
+
+""" Engines per PUF family, besides 'loop' and 'batched' which apply to all families """
+FAMILIES    = {'XORArbiterPUF':         ('cumsum',  lambda seed: puf_spec('XORArbiterPUF', n=n, k=3, seed=seed, noisiness=0)),
+               'XORBistableRingPUF':    ('br',      lambda seed: puf_spec('XORBistableRingPUF', n=n, k=3, weights_seed=seed)),
+               'FeedForwardArbiterPUF': ('ff',      lambda seed: puf_spec('FeedForwardArbiterPUF', n=n, ff=FF_LOOPS, seed=seed, noisiness=0))}
+
+
+def reference_no_resp_flips(puf_instance, challenges):
+    """ Function to count the flipped responses per bit position with one pypuf eval call per bit position """
+
+    responses = puf_instance.eval(challenges)
+
+    no_resp_flips = np.zeros(challenges.shape[1], dtype=np.int64)
+    for j in range(challenges.shape[1]):
+        challenges_flipped          = challenges.copy()
+        challenges_flipped[:, j]    *= -1
+        no_resp_flips[j]            = np.count_nonzero(puf_instance.eval(challenges_flipped) != responses)
+
+    return no_resp_flips
+
+
+@pytest.fixture(scope='module')
+def challenges():
+    return random_inputs(n=n, N=N, seed=1)
+
+
+@pytest.fixture(scope='module')
+def references(challenges):
+    return {(family, seed): reference_no_resp_flips(build_puf_instance(spec(seed)), challenges)
+            for family, (_, spec) in FAMILIES.items() for seed in SEEDS}
+
+
+@pytest.mark.parametrize('family', list(FAMILIES))
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('engine', ['loop', 'batched', 'closed form'])
+def test_engine(family, seed, engine, challenges, references):
+    engine          = FAMILIES[family][0] if engine == 'closed form' else engine
+    puf_instance    = build_puf_instance(FAMILIES[family][1](seed))
+
+    assert np.array_equal(det_no_resp_flips_all(puf_instance, challenges, engine, max_rows=2**10), references[(family, seed)])
+
+
+@pytest.mark.parametrize('family', list(FAMILIES))
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('engine', ['batched', 'closed form'])
+def test_packed(family, seed, engine, references):
+    engine          = FAMILIES[family][0] if engine == 'closed form' else engine
+    puf_instance    = build_puf_instance(FAMILIES[family][1](seed))
+
+    assert np.array_equal(det_no_resp_flips_all(puf_instance, random_inputs_packed(n=n, N=N, seed=1), engine, max_rows=2**7), references[(family, seed)])
+
+
+@pytest.mark.parametrize('family', list(FAMILIES))
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('engine', ['batched', 'closed form'])
+def test_stream(family, seed, engine, references):
+    engine          = FAMILIES[family][0] if engine == 'closed form' else engine
+    puf_instance    = build_puf_instance(FAMILIES[family][1](seed))
+
+    assert np.array_equal(det_no_resp_flips_all(puf_instance, ChallengeStream(n=n, N=N, seed=1, chunk_size=96), engine), references[(family, seed)])
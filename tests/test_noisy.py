@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+""" Test 1 on noisy instances with repeated measurements (cf. simulation_funcs.T1_1_bflip_1_inst_noisy).
+    Run from the root of the repository with: python -m pytest
+"""
+
+import numpy as np
+import pytest
+
+from pypuf.io import random_inputs
+from pypuf.simulation import XORArbiterPUF
+
+from aux_funcs.simulation_funcs import T1_1_bflip_1_inst_noisy, T1_1_bflip_1_inst
+
+
+class TiedPUF:
+    """ Stand-in for a fully unreliable instance: each of the repeated evaluations of a challenge set
+        (consecutive blocks of N rows) alternates between the responses 1 and -1, i.e. all votes of an even
+        number of repetitions are tied
+    """
+
+    challenge_length = 16
+
+    def __init__(self, N):
+        self.N = N
+
+    def eval(self, challenges):
+        return np.where((np.arange(challenges.shape[0]) // self.N) % 2 == 0, 1, -1)
+
+
+def test_all_votes_tied():
+    with pytest.raises(ValueError, match='weight 0'):
+        T1_1_bflip_1_inst_noisy(TiedPUF(100), random_inputs(n=16, N=100, seed=1), 2, 'reliability')
+
+
+@pytest.mark.parametrize('aggregation', ['majority', 'reliability'])
+def test_noise_free(aggregation):
+    challenges      = random_inputs(n=16, N=200, seed=1)
+    puf_instance    = XORArbiterPUF(n=16, k=2, seed=3, noisiness=0)
+
+    S_i_arr, I2O_1, S_i_arr_nf, I2O_1_nf = T1_1_bflip_1_inst_noisy(puf_instance, challenges, 3, aggregation)
+
+    assert np.array_equal(S_i_arr, S_i_arr_nf) and I2O_1 == I2O_1_nf
+    assert np.array_equal(S_i_arr, T1_1_bflip_1_inst(puf_instance, challenges, 'loop')[0])
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+""" Confidence intervals over the instances of Test 2 (cf. uncertainty_funcs.T2_bootstrap_ci).
+    Run from the root of the repository with: python -m pytest
+"""
+
+import numpy as np
+import pytest
+
+from aux_funcs.index_funcs import T2PrefixIndex
+from aux_funcs.uncertainty_funcs import T2_bootstrap_ci, bootstrap_counts
+
+
+k           = 20
+r           = 100
+n           = 64
+
+
+def synthetic_T2_results(offset, seed):
+    """ Function to draw S_j(P)s of k groups of r instances around 0.5 +- offset, with a noise over the instances of 0.03 """
+
+    rng     = np.random.default_rng(seed)
+    S_i_r   = 0.5 + offset * rng.choice([-1, 1], size=(k, 1, n)) + rng.normal(0, 0.03, size=(k, r, n))
+    I2O_1_r = np.max(np.abs(S_i_r - 0.5), axis=2)
+
+    return S_i_r, I2O_1_r
+
+
+@pytest.mark.parametrize('offset', [0, 0.002, 0.05])
+@pytest.mark.parametrize('seed', [0, 1])
+def test_intervals_cover_estimates(offset, seed):
+    S_i_r, I2O_1_r  = synthetic_T2_results(offset, seed)
+    cis             = T2_bootstrap_ci(S_i_r, I2O_1_r, no_resamples=500)
+    index           = T2PrefixIndex(S_i_r, I2O_1_r)
+
+    for g in range(k):
+        _, I2O_1_avg, A2O_1 = index.aggregates(g)
+        assert cis[0][g] <= I2O_1_avg <= cis[1][g]
+        assert 0 <= cis[2][g] <= A2O_1 <= cis[3][g]
+
+
+def test_basic_interval():
+    """ Intervals of A2O_1 with a clear signal are the unclipped basic intervals of the resamples """
+
+    S_i_r, I2O_1_r  = synthetic_T2_results(0.05, 2)
+    counts          = bootstrap_counts(r, 500, seed=1)
+
+    for g in range(k):
+        A2O_1       = np.average(np.abs(np.average(S_i_r[g], axis=0) - 0.5))
+        A2O_1_b     = np.average(np.abs(counts @ S_i_r[g] / r - 0.5), axis=1)
+        q_lower, q_upper = np.quantile(A2O_1_b, [0.025, 0.975])
+
+        assert np.allclose(T2_bootstrap_ci(S_i_r[g], I2O_1_r[g], no_resamples=500)[2:], (2 * A2O_1 - q_upper, 2 * A2O_1 - q_lower))